@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Check that the app's hot Cypher queries still plan as index seeks
+
+EXPLAINs every query in cypher_queries.HOT_QUERY_PLANS (the same constants the
+app runs) and exits non-zero if any plan falls back to a node scan. Run it after
+schema or query changes, or from CI against a seeded database.
+"""
+
+from neo4j import GraphDatabase
+import logging
+import sys
+
+from config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, NEO4J_DATABASE
+from cypher_queries import find_scan_plans
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main():
+    """Report scanning query plans; exit status 1 if there are any"""
+    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+    try:
+        with driver.session(database=NEO4J_DATABASE) as session:
+            problems = find_scan_plans(session)
+    finally:
+        driver.close()
+
+    for query_name, operator_type, label in problems:
+        logger.error(f"❌ The {query_name} query plan uses {operator_type} on :{label}. "
+                     f"Run `CREATE CONSTRAINT {label.lower()}_name IF NOT EXISTS FOR (n:{label}) REQUIRE n.name IS UNIQUE` "
+                     "to restore index lookups.")
+    if not problems:
+        logger.info("✅ All hot queries use index lookups")
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
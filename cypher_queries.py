@@ -0,0 +1,80 @@
+"""
+Hot Cypher queries shared by the Streamlit app and check_query_plans.py
+
+The app runs these constants directly, so the plan check always EXPLAINs the
+queries that are actually served. Nothing here imports Streamlit.
+"""
+
+from typing import List, Tuple
+
+# Targets of one drug (drug details page)
+DRUG_TARGETS_QUERY = """
+    MATCH (d:Drug {name: $drug_name})-[:TARGETS]->(t:Target)
+    RETURN t.name as target
+    ORDER BY t.name
+"""
+
+# Drugs of one target with their classification properties (target details page);
+# callers append "LIMIT $drug_limit" when they cap the list
+TARGET_DRUGS_QUERY = """
+    MATCH (t:Target {name: $target_name})<-[r:TARGETS]-(d:Drug)
+    RETURN
+        t.name as target_name,
+        d.name as drug_name,
+        d.moa as drug_moa,
+        d.phase as drug_phase,
+        r.relationship_type as relationship_type,
+        r.target_class as target_class,
+        r.target_subclass as target_subclass,
+        r.mechanism as mechanism,
+        r.confidence as confidence,
+        r.reasoning as reasoning,
+        r.classified as is_classified
+    ORDER BY d.name
+"""
+
+# Drugs sharing the most targets with one drug
+SIMILAR_DRUGS_QUERY = """
+    MATCH (d1:Drug {name: $drug_name})-[:TARGETS]->(t:Target)<-[:TARGETS]-(d2:Drug)
+    WHERE d2.name <> $drug_name
+    WITH d2, count(t) as common_targets
+    ORDER BY common_targets DESC
+    LIMIT 15
+    RETURN d2.name as drug, d2.moa as moa, d2.phase as phase, common_targets
+"""
+
+# A drug's targets with how many other drugs hit each one
+THERAPEUTIC_PATHWAYS_QUERY = """
+    MATCH (d:Drug {name: $drug_name})-[:TARGETS]->(t:Target)
+    WITH d, t, COUNT { (t)<-[:TARGETS]-(o:Drug) WHERE o <> d } as other_drugs
+    RETURN d.moa as moa, t.name as target, other_drugs
+    ORDER BY other_drugs DESC
+"""
+
+# Hot name-lookup queries (query, anchored label) whose plans should start from an index seek
+HOT_QUERY_PLANS = {
+    'drug targets': (DRUG_TARGETS_QUERY, 'Drug'),
+    'target drugs': (TARGET_DRUGS_QUERY, 'Target'),
+    'drug similarity': (SIMILAR_DRUGS_QUERY, 'Drug'),
+    'therapeutic pathways': (THERAPEUTIC_PATHWAYS_QUERY, 'Drug')
+}
+
+# Plan operators that mean a name lookup is no longer using an index
+SCAN_OPERATORS = ('AllNodesScan', 'NodeByLabelScan')
+
+
+def find_scan_plans(session) -> List[Tuple[str, str, str]]:
+    """EXPLAIN every HOT_QUERY_PLANS query; (query name, scan operator, label) for each that scans"""
+    problems = []
+    for query_name, (query, label) in HOT_QUERY_PLANS.items():
+        plan = session.run("EXPLAIN " + query, drug_name="", target_name="").consume().plan
+        # Walk the plan tree looking for scan operators
+        stack = [plan] if plan else []
+        while stack:
+            operator = stack.pop()
+            operator_type = operator.get('operatorType', '').split('@')[0]
+            if operator_type in SCAN_OPERATORS:
+                problems.append((query_name, operator_type, label))
+                break
+            stack.extend(operator.get('children', []))
+    return problems
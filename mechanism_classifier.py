@@ -9,6 +9,7 @@ Drug-Target Mechanism Classification System
 import google.generativeai as genai
 import json
 import logging
+import threading
 import time
 from datetime import datetime
 from neo4j import GraphDatabase
@@ -20,6 +21,22 @@ from dataclasses import dataclass
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Process-wide count of stored classifications. Every session has its own classifier,
+# but the app's st.cache_data entries are shared, so they key on this rather than on
+# anything per instance. Stores run from worker threads, hence the lock.
+_store_version = 0
+_store_version_lock = threading.Lock()
+
+def classification_store_version() -> int:
+    """How many classifications this process has stored; changes whenever one is written"""
+    return _store_version
+
+def _bump_store_version() -> None:
+    """Record that a classification was stored"""
+    global _store_version
+    with _store_version_lock:
+        _store_version += 1
+
 @dataclass
 class MechanismClassification:
     """Data class for mechanism classification results"""
@@ -294,6 +311,7 @@ JSON Response:"""
                 updated_count = result.single()['updated_count']
                 if updated_count > 0:
                     logger.info(f"Successfully stored classification for {drug_name} -> {target_name}")
+                    _bump_store_version()
                     return True
                 else:
                     logger.warning(f"No relationship found to update: {drug_name} -> {target_name}")
@@ -333,6 +351,39 @@ JSON Response:"""
             logger.error(f"Error checking existing classification: {e}")
             return None
 
+    def get_existing_classifications(self, drug_name: str, target_names: List[str]) -> Dict[str, Dict]:
+        """Existing classifications for many targets of one drug, keyed by target name"""
+        
+        if not self.driver or not target_names:
+            return {}
+        
+        try:
+            with self.driver.session(database=self.database) as session:
+                result = session.run("""
+                    MATCH (d:Drug {name: $drug_name})-[r:TARGETS]->(t:Target)
+                    WHERE t.name IN $target_names AND r.classified = true
+                    RETURN t.name as target_name,
+                           r.relationship_type as relationship_type,
+                           r.target_class as target_class,
+                           r.target_subclass as target_subclass,
+                           r.mechanism as mechanism,
+                           r.confidence as confidence,
+                           r.reasoning as reasoning,
+                           r.classification_source as source,
+                           r.classification_timestamp as timestamp,
+                           r.classified as classified
+                """, drug_name=drug_name, target_names=list(target_names))
+                
+                classifications = {}
+                for record in result:
+                    classification = dict(record)
+                    classifications[classification.pop('target_name')] = classification
+                return classifications
+                
+        except Exception as e:
+            logger.error(f"Error checking existing classifications: {e}")
+            return {}
+
     def classify_and_store(self, drug_name: str, target_name: str, 
                           additional_context: str = "", force_reclassify: bool = False) -> Optional[Dict]:
         """Complete workflow: check existing, classify if needed, store results"""
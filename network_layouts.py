@@ -0,0 +1,187 @@
+"""
+Network data and layouts shared by the Streamlit app and precompute_layouts.py
+
+Nothing here imports Streamlit, so the precompute script can build the global
+network layouts without starting the app. Query helpers raise on Neo4j errors;
+the app reports them.
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+LAYOUT_DIR = "layouts"  # Precomputed network layouts (see precompute_layouts.py)
+LAYOUT_MAX_AGE = 7 * 24 * 3600  # Seconds before a precomputed layout is considered stale
+
+# Neo4j driver pool settings shared by every long-lived app driver
+DRIVER_POOL_CONFIG = {
+    'max_connection_pool_size': 20,
+    'connection_acquisition_timeout': 30
+}
+
+
+def layout_is_current(layout: Dict[str, Any], database: str) -> bool:
+    """Whether a precomputed layout was written for this database within LAYOUT_MAX_AGE"""
+    generated_at = layout.get('generated_at')
+    if layout.get('database') != database or not isinstance(generated_at, (int, float)):
+        return False
+    return time.time() - generated_at <= LAYOUT_MAX_AGE
+
+
+def fast_spring_layout(n: int, edge_src: np.ndarray, edge_dst: np.ndarray,
+                       iters: int = 50, k: float = 1.0, seed: Optional[int] = None) -> np.ndarray:
+    """Vectorised Fruchterman-Reingold layout (same scheme as nx.spring_layout).
+
+    Repulsion is computed for all node pairs in one broadcast; attraction only
+    along the edge index arrays. Positions are rescaled to [-1, 1].
+    """
+    if n == 0:
+        return np.zeros((0, 2), dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    pos = rng.random((n, 2), dtype=np.float32)
+    # Cooling schedule: start at 10% of the initial layout extent
+    t = max(float(np.ptp(pos[:, 0])), float(np.ptp(pos[:, 1]))) * 0.1
+    dt = t / (iters + 1)
+    for _ in range(iters):
+        delta = pos[:, None, :] - pos[None, :, :]
+        dist = np.maximum(np.linalg.norm(delta, axis=-1), 0.01)
+        # Repulsive force k^2/d along each pair's unit vector
+        displacement = np.einsum('ijk,ij->ik', delta, (k * k) / (dist * dist))
+        # Attractive force d^2/k along edges, applied to both endpoints
+        edge_delta = pos[edge_src] - pos[edge_dst]
+        attraction = edge_delta * (np.linalg.norm(edge_delta, axis=-1) / k)[:, None]
+        np.add.at(displacement, edge_src, -attraction)
+        np.add.at(displacement, edge_dst, attraction)
+        length = np.linalg.norm(displacement, axis=-1)
+        length = np.where(length < 0.01, 0.1, length)
+        pos += displacement * (t / length)[:, None]
+        t -= dt
+    pos -= pos.mean(axis=0)
+    lim = np.abs(pos).max()
+    if lim > 0:
+        pos /= lim
+    return pos.astype(np.float32)
+
+
+def query_network_data(driver, database: str, limit: int = 50) -> Dict[str, Any]:
+    """Drug/target nodes and edges for the global network overview"""
+    with driver.session(database=database, fetch_size=-1) as session:
+        # Get sample drugs and their targets with mechanism details
+        result = session.run("""
+            MATCH (d:Drug)-[r:TARGETS]->(t:Target)
+            RETURN d.name as drug, d.moa as moa, d.phase as phase, 
+                   t.name as target, count(t) as target_count,
+                   r.mechanism as mechanism,
+                   r.relationship_type as relationship_type,
+                   r.target_class as target_class,
+                   r.confidence as confidence,
+                   r.classified as is_classified
+            ORDER BY target_count DESC
+            LIMIT $limit
+        """, limit=limit)
+        data = result.data()
+        # Create nodes and edges for network
+        nodes = []
+        edges = []
+        drug_ids = {}
+        target_ids = {}
+        for i, record in enumerate(data):
+            drug_name = record['drug']
+            target_name = record['target']
+            # Add drug node if not exists
+            if drug_name not in drug_ids:
+                drug_ids[drug_name] = len(nodes)
+                nodes.append({
+                    'id': len(nodes),
+                    'label': drug_name,
+                    'type': 'drug',
+                    'moa': record['moa'],
+                    'phase': record['phase']
+                })
+            # Add target node if not exists
+            if target_name not in target_ids:
+                target_ids[target_name] = len(nodes)
+                nodes.append({
+                    'id': len(nodes),
+                    'label': target_name,
+                    'type': 'target'
+                })
+            # Add edge
+            edges.append({
+                'source': drug_ids[drug_name],
+                'target': target_ids[target_name],
+                'type': 'targets'
+            })
+        return {
+            'nodes': nodes,
+            'edges': edges,
+            'drug_ids': drug_ids,
+            'target_ids': target_ids
+        }
+
+
+def query_3d_network_data(driver, database: str, limit: int = 30) -> Dict[str, Any]:
+    """Drug/target columns with 3D placement for the 3D network view"""
+    with driver.session(database=database, fetch_size=-1) as session:
+        # Get sample drugs and their targets with 3D positioning.
+        # Targets are collected per drug on the server so each drug's
+        # name/moa/phase crosses the wire once instead of once per edge.
+        result = session.run("""
+            MATCH (d:Drug)-[:TARGETS]->(t:Target)
+            WITH d, t
+            LIMIT $limit
+            WITH d, collect(DISTINCT t.name) as targets
+            RETURN d.name as drug, d.moa as moa, d.phase as phase, targets
+        """, limit=limit)
+        # Stream records and unpack each one once (no intermediate list of dicts)
+        data = [(r['drug'], r['moa'], r['phase'], r['targets']) for r in result]
+        # Build node and edge columns (struct-of-arrays); node ids are list positions
+        labels = []
+        types = []
+        moas = []
+        phases = []
+        edges_src = []
+        edges_dst = []
+        drug_ids = {}
+        target_ids = {}
+        for drug_name, moa, phase, targets in data:
+            # Add drug node if not exists (single hash probe per lookup)
+            drug_idx = drug_ids.get(drug_name)
+            if drug_idx is None:
+                drug_idx = drug_ids[drug_name] = len(labels)
+                labels.append(drug_name)
+                types.append('drug')
+                moas.append(moa)
+                phases.append(phase)
+            for target_name in targets:
+                # Add target node if not exists
+                target_idx = target_ids.get(target_name)
+                if target_idx is None:
+                    target_idx = target_ids[target_name] = len(labels)
+                    labels.append(target_name)
+                    types.append('target')
+                    moas.append(None)
+                    phases.append(None)
+                # Add edge
+                edges_src.append(drug_idx)
+                edges_dst.append(target_idx)
+        # Drugs go on an outer sphere, targets on an inner one
+        n_nodes = len(labels)
+        is_drug = np.fromiter((t == 'drug' for t in types), dtype=bool, count=n_nodes)
+        angles = np.arange(n_nodes) * (2 * np.pi / (limit * 2))
+        radius = np.where(is_drug, 2.0, 1.0)
+        z = np.where(is_drug, np.random.uniform(-1, 1, n_nodes), np.random.uniform(-0.5, 0.5, n_nodes))
+        return {
+            'x': (radius * np.cos(angles)).astype(np.float32),
+            'y': (radius * np.sin(angles)).astype(np.float32),
+            'z': z.astype(np.float32),
+            'labels': labels,
+            'types': types,
+            'moas': moas,
+            'phases': phases,
+            'edges_src': np.asarray(edges_src, dtype=np.int32),
+            'edges_dst': np.asarray(edges_dst, dtype=np.int32),
+            'drug_ids': drug_ids,
+            'target_ids': target_ids
+        }
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Precompute global network layouts for the Streamlit app
+
+Writes layouts/global_100.json (2D force-directed layout) and
+layouts/global3d_{size}.json (3D placement) so the app can render the global
+networks without running the layout on first load. Each file records the
+database it was built from and when; the app ignores files for another
+database or older than LAYOUT_MAX_AGE, so re-run after the graph data changes.
+"""
+
+from neo4j import GraphDatabase
+import numpy as np
+import logging
+import json
+import time
+import os
+
+from config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, NEO4J_DATABASE
+from network_layouts import (DRIVER_POOL_CONFIG, LAYOUT_DIR, fast_spring_layout,
+                             query_network_data, query_3d_network_data)
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+GLOBAL_NETWORK_SIZE = 100
+NETWORK_3D_SIZES = [10, 30, 50, 100]
+
+def write_layout(name, data):
+    """Serialize a layout to LAYOUT_DIR/<name>.json (NumPy arrays become lists)"""
+    data['database'] = NEO4J_DATABASE
+    data['generated_at'] = time.time()
+    os.makedirs(LAYOUT_DIR, exist_ok=True)
+    path = os.path.join(LAYOUT_DIR, f"{name}.json")
+    with open(path, 'w') as f:
+        json.dump(data, f, default=lambda o: o.tolist())
+    logger.info(f"✅ Wrote {path}")
+
+def precompute_global_layout(driver):
+    """2D force-directed layout for the global network overview"""
+    network_data = query_network_data(driver, NEO4J_DATABASE, GLOBAL_NETWORK_SIZE)
+    if not network_data:
+        logger.error("❌ No global network data returned")
+        return
+
+    nodes = network_data['nodes']
+    edges = network_data['edges']
+    index = {node['id']: i for i, node in enumerate(nodes)}
+    edge_src = np.array([index[edge['source']] for edge in edges], dtype=np.intp)
+    edge_dst = np.array([index[edge['target']] for edge in edges], dtype=np.intp)
+    pos = fast_spring_layout(len(nodes), edge_src, edge_dst, iters=50, k=1.0, seed=42)
+
+    for node, (x, y) in zip(nodes, pos.tolist()):
+        node['x'] = x
+        node['y'] = y
+    write_layout(f"global_{GLOBAL_NETWORK_SIZE}", network_data)
+
+def precompute_3d_layouts(driver):
+    """3D placements for the common 3D network sizes"""
+    for size in NETWORK_3D_SIZES:
+        network_data = query_3d_network_data(driver, NEO4J_DATABASE, size)
+        if not network_data:
+            logger.error(f"❌ No 3D network data returned for size {size}")
+            continue
+        write_layout(f"global3d_{size}", network_data)
+
+def main():
+    """Connect to Neo4j and write all layouts"""
+    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD), **DRIVER_POOL_CONFIG)
+    try:
+        precompute_global_layout(driver)
+        precompute_3d_layouts(driver)
+    finally:
+        driver.close()
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,10 @@ import streamlit as st
 
 
 
+import streamlit.components.v1 as components
+
+
+
 import pandas as pd
 
 
@@ -14,6 +18,10 @@ import plotly.graph_objects as go
 
 
 
+import plotly.io as pio
+
+
+
 from neo4j import GraphDatabase
 
 
@@ -26,15 +34,19 @@ import numpy as np
 
 
 
-import math
+import os
 
 
 
-import os
+import json
 
 
 
-import json
+import html
+
+
+
+import re
 
 
 
@@ -50,6 +62,14 @@ import threading
 
 
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+
+from functools import lru_cache
+
+
+
 import csv
 
 
@@ -60,6 +80,16 @@ import time
 
 from typing import List, Dict, Any
 
+
+
+from cypher_queries import DRUG_TARGETS_QUERY, TARGET_DRUGS_QUERY, SIMILAR_DRUGS_QUERY, THERAPEUTIC_PATHWAYS_QUERY
+
+
+
+from network_layouts import (LAYOUT_DIR, DRIVER_POOL_CONFIG, fast_spring_layout, layout_is_current,
+
+                             query_network_data, query_3d_network_data)
+
 # Import vis.js network component
 try:
     from neovis_component_fixed import create_visjs_network_component
@@ -79,12 +109,121 @@ CACHE_DIR = "network_cache"
 
 FEEDBACK_DIR = "feedback_data"
 
+MAX_3D_LABELS = 15  # Text labels drawn in the 3D network (highest-degree nodes only)
+
+CLASSIFY_MAX_WORKERS = 4  # Concurrent Gemini classification requests
+
+CLASSIFY_MIN_INTERVAL = 0.5  # Seconds between Gemini classification request starts, across all sessions
+
+MMFF_MIN_HEAVY_ATOMS = 50  # Molecules above this size get a force-field pass (MMFF, else UFF) after ETKDG embedding
+
+MAX_GLOW_NODES = 50  # Drug network rings larger than this skip the node and edge glow traces
+
+MAX_HOVER_NODES = 200  # Drug network rings larger than this turn hover off (centre via the form instead)
+
+MAX_ANNOTATED_NODES = 100  # Above this, drug network target labels are WebGL text rather than SVG annotations
+
 os.makedirs(CACHE_DIR, exist_ok=True)
 
 os.makedirs(FEEDBACK_DIR, exist_ok=True)
 
 
 
+# SMILES for the demo molecules offered when a drug has no usable structure
+
+DEMO_MOLECULES = {
+
+    "Aspirin": "CC(=O)OC1=CC=CC=C1C(=O)O",
+
+    "Caffeine": "CN1C=NC2=C1C(=O)N(C(=O)N2C)C",
+
+    "Morphine": "CN1CC[C@]23c4c5ccc(O)c4O[C@H]2[C@@H](O)C=C[C@H]3[C@H]1C5",
+
+    "Glucose": "C([C@@H]1[C@H]([C@@H]([C@H]([C@H](O1)O)O)O)O)O",
+
+    "Benzene": "c1ccccc1"
+
+}
+
+
+
+# Drug network edge/node styling per relationship type:
+# (edge colour, edge width, legend label, node colour, glow colour)
+
+EFFECT_STYLES = {
+
+    'Primary/On-Target': ('#27AE60', 4, 'Primary Effect', '#2ECC71', 'rgba(46, 204, 113, 0.2)'),
+
+    'Secondary/Off-Target': ('#E67E22', 3, 'Secondary Effect', '#F39C12', 'rgba(243, 156, 18, 0.2)'),
+
+}
+
+DEFAULT_EFFECT_STYLE = ('#7F8C8D', 2, 'Under Analysis', '#95A5A6', 'rgba(149, 165, 166, 0.2)')  # Unknown or Unclassified
+
+# Ring node styling per relationship type: (fill colour, border colour, glow colour)
+
+NODE_STYLES = {
+
+    'Primary/On-Target': ('#2ECC71', '#27AE60', 'rgba(46, 204, 113, 0.3)'),
+
+    'Secondary/Off-Target': ('#F39C12', '#E67E22', 'rgba(243, 156, 18, 0.3)'),
+
+}
+
+DEFAULT_NODE_STYLE = ('#95A5A6', '#7F8C8D', 'rgba(149, 165, 166, 0.3)')
+
+
+# Ring order for the drug network: rank per relationship type (anything else is unclassified)
+
+RELATIONSHIP_RANKS = {'Primary/On-Target': 0, 'Secondary/Off-Target': 1, 'Unknown': 2}
+
+RING_GROUP_TYPES = ('primary', 'secondary', 'unknown', 'unclassified')
+
+
+# Stand-in relationship for a drug on the target-centred ring that has no classification yet, by clinical phase
+
+PHASE_FALLBACK_RELATIONSHIPS = {'Approved': 'Primary/On-Target', 'Phase 4': 'Primary/On-Target',
+
+                                'Phase 1': 'Secondary/Off-Target', 'Phase 2': 'Secondary/Off-Target', 'Phase 3': 'Secondary/Off-Target'}
+
+
+# Drug network hover templates. Plotly fills %{customdata[i]} per point; the edge templates are
+# formatted once per effect group (str.format) for the colour and label shared by the group
+
+TARGET_EDGE_HOVER = ('<b style="font-size:16px; color:{color}">%{{customdata[0]}}</b><br>'
+
+                     '<b>Effect Type:</b> <span style="color:{color}">{priority}</span><br>'
+
+                     '<b>Mechanism:</b> <span style="color:white">%{{customdata[1]}}</span><br>'
+
+                     '<b>Confidence:</b> <span style="color:gold">%{{customdata[2]:.0%}}</span><br>'
+
+                     '<b>Target Class:</b> <span style="color:lightblue">%{{customdata[3]}}</span><extra></extra>')
+
+DRUG_EDGE_HOVER = ('<b style="font-size:16px; color:{color}">%{{customdata[0]}}</b><br>'
+
+                   '<b>Effect Type:</b> <span style="color:{color}">{priority}</span><br>'
+
+                   '<b>MOA:</b> <span style="color:white">%{{customdata[1]}}</span><br>'
+
+                   '<b>Phase:</b> <span style="color:gold">%{{customdata[2]}}</span><br>'
+
+                   '<b>Confidence:</b> <span style="color:gold">%{{customdata[3]:.0%}}</span><extra></extra>')
+
+TARGET_NODE_HOVER = ('%{customdata[0]}<br>Effect Type: %{customdata[1]}<br>Mechanism: %{customdata[2]}<br>'
+
+                     'Confidence: %{customdata[3]:.0%}<br>Target Class: %{customdata[4]}<extra></extra>')
+
+DRUG_NODE_HOVER = ('<b style="font-size:18px; color:%{customdata[1]}">%{customdata[0]}</b><br>'
+
+                   '<b>MOA:</b> <span style="color:white">%{customdata[2]}</span><br>'
+
+                   '<b>Phase:</b> <span style="color:gold">%{customdata[3]}</span><br>'
+
+                   '<b>Effect Type:</b> <span style="color:%{customdata[1]}">%{customdata[4]}</span><extra></extra>')
+
+
+
 def get_cache_key(drug_name: str, target_name: str = None) -> str:
 
     """Generate a unique cache key for drug-target classification"""
@@ -327,43 +466,35 @@ except (ImportError, FileNotFoundError, UnicodeDecodeError, Exception):
 
 
 
-# Try to import chemical visualization libraries
-
-
-
-try:
-
-
-
-    from rdkit import Chem
+import importlib.util
 
 
 
-    from rdkit.Chem import AllChem, Descriptors
+# Check for chemical visualization libraries without importing them; RDKit and
 
 
 
-    import stmol
+# py3Dmol are imported where the 3D structure views are rendered
 
 
 
-    RDKIT_AVAILABLE = True
+_missing_chem_libs = [name for name in ('rdkit', 'py3Dmol') if importlib.util.find_spec(name) is None]
 
 
 
-except ImportError as e:
+RDKIT_AVAILABLE = not _missing_chem_libs
 
 
 
-    RDKIT_AVAILABLE = False
+if not RDKIT_AVAILABLE:
 
 
 
-    RDKIT_ERROR = str(e)
+    RDKIT_ERROR = f"No module named '{_missing_chem_libs[0]}'"
 
 
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 
 
@@ -371,10 +502,6 @@ import os
 
 
 
-import networkx as nx
-
-
-
 import numpy as np
 
 
@@ -403,7 +530,7 @@ try:
 
 
 
-    from mechanism_classifier import DrugTargetMechanismClassifier
+    from mechanism_classifier import DrugTargetMechanismClassifier, classification_store_version
 
 
 
@@ -423,6 +550,18 @@ except ImportError:
 
 
 
+    def classification_store_version() -> int:
+
+
+
+        """Without the classifier nothing is ever stored, so the version never moves"""
+
+
+
+        return 0
+
+
+
 
 
 
@@ -2601,12 +2740,18 @@ class DrugTargetGraphApp:
 
             st.session_state.background_threads = {}
 
+        if 'background_attempted' not in st.session_state:
+
+            st.session_state.background_attempted = set()
+
             
 
         self._classification_cache = st.session_state.classification_cache
 
         self._background_threads = st.session_state.background_threads
 
+        self._background_attempted = st.session_state.background_attempted
+
 
 
         self.classifier = st.session_state.classifier
@@ -2617,6 +2762,46 @@ class DrugTargetGraphApp:
 
 
 
+    @property
+
+
+
+    def connection_key(self) -> str:
+
+
+
+        """Server URI plus database of this connection, the key for the process-wide st.cache_data helpers
+
+
+
+        
+
+
+
+        Sessions connected manually to different servers can share a database name ("neo4j"),
+
+
+
+        so the database alone would let them read each other's cached results.
+
+
+
+        """
+
+
+
+        uri = st.session_state.get('neo4j_uri')  # None when connected from config.py
+
+
+
+        return hashlib.md5(f"{uri}/{self.database}".encode()).hexdigest()
+
+
+
+        
+
+
+
     def connect_to_neo4j(self):
 
 
@@ -2641,7 +2826,7 @@ class DrugTargetGraphApp:
 
 
 
-                self.driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+                self.driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD), **DRIVER_POOL_CONFIG)
 
 
 
@@ -2925,14 +3110,6 @@ class DrugTargetGraphApp:
 
 
 
-                        import time
-
-
-
-                        
-
-
-
                         if "neo4j+s://" in uri:
 
 
@@ -2943,15 +3120,11 @@ class DrugTargetGraphApp:
 
                             time.sleep(2)  # Brief delay for Aura
 
-
-
-                            test_driver = GraphDatabase.driver(uri, auth=basic_auth(user, password))
+                            test_driver = GraphDatabase.driver(uri, auth=basic_auth(user, password), **DRIVER_POOL_CONFIG)
 
                         else:
 
-
-
-                            test_driver = GraphDatabase.driver(uri, auth=(user, password))
+                            test_driver = GraphDatabase.driver(uri, auth=(user, password), **DRIVER_POOL_CONFIG)
 
 
 
@@ -3247,91 +3420,91 @@ class DrugTargetGraphApp:
 
 
 
-            with self.driver.session(database=self.database) as session:
+            return query_network_data(self.driver, self.database, limit)
 
 
 
-                # Get sample drugs and their targets with mechanism details
+        except Exception as e:
 
 
 
-                result = session.run("""
+            st.error(f"Error getting network data: {e}")
 
 
 
-                    MATCH (d:Drug)-[r:TARGETS]->(t:Target)
+            return None
 
 
 
-                    RETURN d.name as drug, d.moa as moa, d.phase as phase, 
+    
 
 
 
-                           t.name as target, count(t) as target_count,
+    def get_drug_network(self, drug_name: str, depth: int = 1) -> Dict[str, Any]:
 
 
 
-                           r.mechanism as mechanism,
+        """Get network around a specific drug"""
 
 
 
-                           r.relationship_type as relationship_type,
+        if not self.driver:
 
 
 
-                           r.target_class as target_class,
+            return None
 
 
 
-                           r.confidence as confidence,
+            
 
 
 
-                           r.classified as is_classified
+        try:
 
 
 
-                    ORDER BY target_count DESC
+            with self.driver.session(database=self.database) as session:
 
 
 
-                    LIMIT $limit
+                # Get drug's targets and similar drugs
 
 
 
-                """, limit=limit)
+                result = session.run("""
 
 
 
-                
+                    MATCH (d:Drug {name: $drug_name})-[:TARGETS]->(t:Target)
 
 
 
-                data = result.data()
+                    OPTIONAL MATCH (t)<-[:TARGETS]-(other:Drug)
 
 
 
-                
+                    WHERE other.name <> $drug_name
 
 
 
-                # Create nodes and edges for network
+                    RETURN d.name as drug, d.moa as moa, d.phase as phase,
 
 
 
-                nodes = []
+                           t.name as target, other.name as other_drug, 
 
 
 
-                edges = []
+                           other.moa as other_moa, other.phase as other_phase
 
 
 
-                drug_ids = {}
+                    LIMIT 100
 
 
 
-                target_ids = {}
+                """, drug_name=drug_name)
 
 
 
@@ -3339,403 +3512,167 @@ class DrugTargetGraphApp:
 
 
 
-                for i, record in enumerate(data):
+                data = result.data()
 
 
 
-                    drug_name = record['drug']
+                
 
 
 
-                    target_name = record['target']
+                # Create network data
 
 
 
-                    
+                nodes = []
 
 
 
-                    # Add drug node if not exists
+                edges = []
 
 
 
-                    if drug_name not in drug_ids:
+                node_ids = {}
 
 
 
-                        drug_ids[drug_name] = len(nodes)
+                
 
 
 
-                        nodes.append({
+                # Add central drug
 
 
 
-                            'id': len(nodes),
+                node_ids[drug_name] = 0
 
 
 
-                            'label': drug_name,
+                nodes.append({
 
 
 
-                            'type': 'drug',
+                    'id': 0,
 
 
 
-                            'moa': record['moa'],
+                    'label': drug_name,
 
 
 
-                            'phase': record['phase']
+                    'type': 'central_drug',
 
 
 
-                        })
+                    'moa': data[0]['moa'] if data else '',
 
 
 
-                    
+                    'phase': data[0]['phase'] if data else ''
 
 
 
-                    # Add target node if not exists
+                })
 
 
 
-                    if target_name not in target_ids:
+                
 
 
 
-                        target_ids[target_name] = len(nodes)
+                # Add targets and other drugs
 
 
 
-                        nodes.append({
+                for record in data:
 
 
 
-                            'id': len(nodes),
+                    target_name = record['target']
 
 
 
-                            'label': target_name,
+                    other_drug = record['other_drug']
 
 
 
-                            'type': 'target'
+                    
 
 
 
-                        })
+                    # Add target
 
 
 
-                    
+                    if target_name not in node_ids:
 
 
 
-                    # Add edge
+                        node_ids[target_name] = len(nodes)
 
 
 
-                    edges.append({
+                        nodes.append({
 
 
 
-                        'source': drug_ids[drug_name],
+                            'id': len(nodes),
 
 
 
-                        'target': target_ids[target_name],
+                            'label': target_name,
 
 
 
-                        'type': 'targets'
+                            'type': 'target'
 
 
 
-                    })
+                        })
 
 
 
-                
+                    
 
 
 
-                return {
+                    # Add other drug
 
 
 
-                    'nodes': nodes,
+                    if other_drug and other_drug not in node_ids:
 
 
 
-                    'edges': edges,
+                        node_ids[other_drug] = len(nodes)
 
 
 
-                    'drug_ids': drug_ids,
+                        nodes.append({
 
 
 
-                    'target_ids': target_ids
+                            'id': len(nodes),
 
 
 
-                }
+                            'label': other_drug,
 
 
 
-        except Exception as e:
+                            'type': 'other_drug',
 
 
 
-            st.error(f"Error getting network data: {e}")
+                            'moa': record['other_moa'],
 
 
 
-            return None
+                            'phase': record['other_phase']
 
 
 
-    
-
-
-
-    def get_drug_network(self, drug_name: str, depth: int = 1) -> Dict[str, Any]:
-
-
-
-        """Get network around a specific drug"""
-
-
-
-        if not self.driver:
-
-
-
-            return None
-
-
-
-            
-
-
-
-        try:
-
-
-
-            with self.driver.session(database=self.database) as session:
-
-
-
-                # Get drug's targets and similar drugs
-
-
-
-                result = session.run("""
-
-
-
-                    MATCH (d:Drug {name: $drug_name})-[:TARGETS]->(t:Target)
-
-
-
-                    OPTIONAL MATCH (t)<-[:TARGETS]-(other:Drug)
-
-
-
-                    WHERE other.name <> $drug_name
-
-
-
-                    RETURN d.name as drug, d.moa as moa, d.phase as phase,
-
-
-
-                           t.name as target, other.name as other_drug, 
-
-
-
-                           other.moa as other_moa, other.phase as other_phase
-
-
-
-                    LIMIT 100
-
-
-
-                """, drug_name=drug_name)
-
-
-
-                
-
-
-
-                data = result.data()
-
-
-
-                
-
-
-
-                # Create network data
-
-
-
-                nodes = []
-
-
-
-                edges = []
-
-
-
-                node_ids = {}
-
-
-
-                
-
-
-
-                # Add central drug
-
-
-
-                node_ids[drug_name] = 0
-
-
-
-                nodes.append({
-
-
-
-                    'id': 0,
-
-
-
-                    'label': drug_name,
-
-
-
-                    'type': 'central_drug',
-
-
-
-                    'moa': data[0]['moa'] if data else '',
-
-
-
-                    'phase': data[0]['phase'] if data else ''
-
-
-
-                })
-
-
-
-                
-
-
-
-                # Add targets and other drugs
-
-
-
-                for record in data:
-
-
-
-                    target_name = record['target']
-
-
-
-                    other_drug = record['other_drug']
-
-
-
-                    
-
-
-
-                    # Add target
-
-
-
-                    if target_name not in node_ids:
-
-
-
-                        node_ids[target_name] = len(nodes)
-
-
-
-                        nodes.append({
-
-
-
-                            'id': len(nodes),
-
-
-
-                            'label': target_name,
-
-
-
-                            'type': 'target'
-
-
-
-                        })
-
-
-
-                    
-
-
-
-                    # Add other drug
-
-
-
-                    if other_drug and other_drug not in node_ids:
-
-
-
-                        node_ids[other_drug] = len(nodes)
-
-
-
-                        nodes.append({
-
-
-
-                            'id': len(nodes),
-
-
-
-                            'label': other_drug,
-
-
-
-                            'type': 'other_drug',
-
-
-
-                            'moa': record['other_moa'],
-
-
-
-                            'phase': record['other_phase']
-
-
-
-                        })
+                        })
 
 
 
@@ -4259,23 +4196,7 @@ class DrugTargetGraphApp:
 
 
 
-                targets = session.run("""
-
-
-
-                    MATCH (d:Drug {name: $drug_name})-[:TARGETS]->(t:Target)
-
-
-
-                    RETURN t.name as target
-
-
-
-                    ORDER BY t.name
-
-
-
-                """, drug_name=drug_name).data()
+                targets = session.run(DRUG_TARGETS_QUERY, drug_name=drug_name).data()
 
 
 
@@ -4455,99 +4376,67 @@ class DrugTargetGraphApp:
 
 
 
-    def get_target_details(self, target_name: str) -> Dict[str, Any]:
+    def get_target_details(self, target_name: str, drug_limit: Optional[int] = None) -> Dict[str, Any]:
 
 
 
-        """Get detailed information about a target including mechanism classifications"""
+        """Get detailed information about a target including mechanism classifications
 
 
 
-        if not self.driver:
+        
 
 
 
-            return None
+        drug_limit caps the returned drugs list in the query itself; classification_stats
 
 
 
-            
+        still counts every drug targeting the target. None returns all drugs.
 
 
 
-        try:
-
-
-
-            with self.driver.session(database=self.database) as session:
-
-
-
-                # Get comprehensive target information with mechanism details
-
-
-
-                result = session.run("""
-
-
-
-                    MATCH (t:Target {name: $target_name})<-[r:TARGETS]-(d:Drug)
+        """
 
 
 
-                    RETURN 
-
-
-
-                        t.name as target_name,
-
-
-
-                        d.name as drug_name,
-
-
-
-                        d.moa as drug_moa,
-
-
-
-                        d.phase as drug_phase,
+        if not self.driver:
 
 
 
-                        r.relationship_type as relationship_type,
+            return None
 
 
 
-                        r.target_class as target_class,
+            
 
 
 
-                        r.target_subclass as target_subclass,
+        try:
 
 
 
-                        r.mechanism as mechanism,
+            with self.driver.session(database=self.database) as session:
 
 
 
-                        r.confidence as confidence,
+                # Get comprehensive target information with mechanism details
 
 
 
-                        r.reasoning as reasoning,
+                query = TARGET_DRUGS_QUERY
 
 
 
-                        r.classified as is_classified
+                if drug_limit is not None:
 
 
 
-                    ORDER BY d.name
+                    query += "LIMIT $drug_limit"
 
 
 
-                """, target_name=target_name).data()
+                result = session.run(query, target_name=target_name, drug_limit=drug_limit).data()
 
 
 
@@ -4743,11 +4632,51 @@ class DrugTargetGraphApp:
 
 
 
+                total_count = len(drugs)
+
+
+
+                if drug_limit is not None and total_count >= drug_limit:
+
+
+
+                    # The drugs list was truncated; count the full relationship set
+
+
+
+                    counts = session.run("""
+
+
+
+                        MATCH (t:Target {name: $target_name})<-[r:TARGETS]-(d:Drug)
+
+
+
+                        RETURN count(r) as total,
+
+
+
+                               sum(CASE WHEN r.classified = true THEN 1 ELSE 0 END) as classified
+
+
+
+                    """, target_name=target_name).single()
+
+
+
+                    total_count = counts["total"]
+
+
+
+                    classified_count = counts["classified"]
+
+
+
                 classification_stats = {
 
 
 
-                    "total": len(drugs),
+                    "total": total_count,
 
 
 
@@ -4755,7 +4684,7 @@ class DrugTargetGraphApp:
 
 
 
-                    "percentage": (classified_count / len(drugs) * 100) if drugs else 0
+                    "percentage": (classified_count / total_count * 100) if total_count else 0
 
 
 
@@ -5661,6 +5590,18 @@ class DrugTargetGraphApp:
 
     
 
+    def get_cached_classifications(self, drug_names: List[str], target_name: str) -> Dict[str, Dict]:
+
+        """Cached classifications of many drugs against one target, keyed by drug name (no API call)"""
+
+        cache = self._classification_cache
+
+        keys = {drug_name: f"{drug_name}_{target_name}" for drug_name in drug_names}
+
+        return {drug_name: cache[key] for drug_name, key in keys.items() if key in cache}
+
+    
+
     def is_cached(self, drug_name: str, target_name: str) -> bool:
 
         """Check if classification is cached"""
@@ -5685,6 +5626,20 @@ class DrugTargetGraphApp:
 
             return
 
+        
+
+        # Submit each drug-target pair at most once per session; reruns would otherwise
+
+        # re-queue every target that is still uncached (including ones that failed)
+
+        targets = [target for target in targets if (drug_name, target) not in self._background_attempted]
+
+        if not targets:
+
+            return
+
+        self._background_attempted.update((drug_name, target) for target in targets)
+
             
 
         def classify_worker():
@@ -5781,11 +5736,13 @@ class DrugTargetGraphApp:
 
                 target_mechanisms = {}
 
+                cached = self.get_cached_classifications([drug['drug'] for drug in drugs], target_name)
+
                 for drug in drugs:
 
                     drug_name = drug['drug']
 
-                    classification = self.get_cached_classification(drug_name, target_name)
+                    classification = cached.get(drug_name)
 
                     if classification:
 
@@ -5873,7 +5830,7 @@ class DrugTargetGraphApp:
 
 
 
-            with self.driver.session(database=self.database) as session:
+            with self.driver.session(database=self.database, fetch_size=-1) as session:
 
 
 
@@ -5945,7 +5902,7 @@ class DrugTargetGraphApp:
 
 
 
-            with self.driver.session(database=self.database) as session:
+            with self.driver.session(database=self.database, fetch_size=-1) as session:
 
 
 
@@ -6017,115 +5974,131 @@ class DrugTargetGraphApp:
 
 
 
-            with self.driver.session(database=self.database) as session:
+            with self.driver.session(database=self.database, fetch_size=-1) as session:
 
 
 
-                # Get drugs with multiple targets (polypharmacology)
+                # Fetch all three insight lists in one round trip using CALL subqueries:
 
 
 
-                poly_drugs = session.run("""
+                # drugs with multiple targets (polypharmacology), targets with multiple
 
 
 
-                    MATCH (d:Drug)-[:TARGETS]->(t:Target)
+                # drugs (druggable targets) and the phase distribution
 
 
 
-                    WITH d, count(t) as target_count
+                insights = session.run("""
 
 
 
-                    WHERE target_count > 3
+                    CALL {
 
 
 
-                    RETURN d.name as drug, d.moa as moa, d.phase as phase, target_count
+                        MATCH (d:Drug)-[:TARGETS]->(t:Target)
 
 
 
-                    ORDER BY target_count DESC
+                        WITH d, count(t) as target_count
 
 
 
-                    LIMIT 10
+                        WHERE target_count > 3
 
 
 
-                """).data()
+                        WITH d, target_count
 
 
 
-                
+                        ORDER BY target_count DESC
 
 
 
-                # Get targets with multiple drugs (druggable targets)
+                        LIMIT 10
 
 
 
-                druggable_targets = session.run("""
+                        RETURN collect({drug: d.name, moa: d.moa, phase: d.phase, target_count: target_count}) as poly_drugs
 
 
 
-                    MATCH (d:Drug)-[:TARGETS]->(t:Target)
+                    }
 
 
 
-                    WITH t, count(d) as drug_count
+                    CALL {
 
 
 
-                    WHERE drug_count > 2
+                        MATCH (d:Drug)-[:TARGETS]->(t:Target)
 
 
 
-                    RETURN t.name as target, drug_count
+                        WITH t, count(d) as drug_count
 
 
 
-                    ORDER BY drug_count DESC
+                        WHERE drug_count > 2
 
 
 
-                    LIMIT 10
+                        WITH t, drug_count
 
 
 
-                """).data()
+                        ORDER BY drug_count DESC
 
 
 
-                
+                        LIMIT 10
 
 
 
-                # Get phase distribution insights
+                        RETURN collect({target: t.name, drug_count: drug_count}) as druggable_targets
 
 
 
-                phase_insights = session.run("""
+                    }
 
 
 
-                    MATCH (d:Drug)
+                    CALL {
 
 
 
-                    WHERE d.phase IS NOT NULL AND d.phase <> ''
+                        MATCH (d:Drug)
 
 
 
-                    RETURN d.phase as phase, count(d) as drug_count
+                        WHERE d.phase IS NOT NULL AND d.phase <> ''
 
 
 
-                    ORDER BY drug_count DESC
+                        WITH d.phase as phase, count(d) as drug_count
 
 
 
-                """).data()
+                        ORDER BY drug_count DESC
+
+
+
+                        RETURN collect({phase: phase, drug_count: drug_count}) as phase_insights
+
+
+
+                    }
+
+
+
+                    RETURN poly_drugs, druggable_targets, phase_insights
+
+
+
+                """).single()
 
 
 
@@ -6137,15 +6110,15 @@ class DrugTargetGraphApp:
 
 
 
-                    "polypharmacology_drugs": poly_drugs,
+                    "polypharmacology_drugs": insights["poly_drugs"],
 
 
 
-                    "druggable_targets": druggable_targets,
+                    "druggable_targets": insights["druggable_targets"],
 
 
 
-                    "phase_distribution": phase_insights
+                    "phase_distribution": insights["phase_insights"]
 
 
 
@@ -6201,35 +6174,7 @@ class DrugTargetGraphApp:
 
 
 
-                similar_drugs = session.run("""
-
-
-
-                    MATCH (d1:Drug {name: $drug_name})-[:TARGETS]->(t:Target)<-[:TARGETS]-(d2:Drug)
-
-
-
-                    WHERE d2.name <> $drug_name
-
-
-
-                    WITH d2, count(t) as common_targets
-
-
-
-                    ORDER BY common_targets DESC
-
-
-
-                    LIMIT 15
-
-
-
-                    RETURN d2.name as drug, d2.moa as moa, d2.phase as phase, common_targets
-
-
-
-                """, drug_name=drug_name).data()
+                similar_drugs = session.run(SIMILAR_DRUGS_QUERY, drug_name=drug_name).data()
 
 
 
@@ -6261,15 +6206,23 @@ class DrugTargetGraphApp:
 
 
 
-                # Calculate similarity scores
+                # Calculate similarity scores in one vectorized pass
+
 
 
+                common_counts = np.fromiter((drug['common_targets'] for drug in similar_drugs), dtype=np.int32, count=len(similar_drugs))
 
-                for drug in similar_drugs:
 
 
+                scores = np.round(common_counts * 100.0 / total_targets, 2)
 
-                    drug['similarity_score'] = round((drug['common_targets'] / total_targets) * 100, 2)
+
+
+                for drug, score in zip(similar_drugs, scores):
+
+
+
+                    drug['similarity_score'] = float(score)
 
 
 
@@ -6333,71 +6286,71 @@ class DrugTargetGraphApp:
 
 
 
-            with self.driver.session(database=self.database) as session:
+            return query_3d_network_data(self.driver, self.database, limit)
 
 
 
-                # Get sample drugs and their targets with 3D positioning
+        except Exception as e:
 
 
 
-                result = session.run("""
+            st.error(f"Error getting 3D network data: {e}")
 
 
 
-                    MATCH (d:Drug)-[:TARGETS]->(t:Target)
+            return None
 
 
 
-                    RETURN d.name as drug, d.moa as moa, d.phase as phase, 
+    
 
 
 
-                           t.name as target, count(t) as target_count
+    def get_drug_comparison(self, drug1: str, drug2: str) -> Dict[str, Any]:
 
 
 
-                    ORDER BY target_count DESC
+        """Compare two drugs in detail"""
 
 
 
-                    LIMIT $limit
+        if not self.driver:
 
 
 
-                """, limit=limit)
+            return None
 
 
 
-                
+            
 
 
 
-                data = result.data()
+        try:
 
 
 
-                
+            with self.driver.session(database=self.database) as session:
 
 
 
-                # Create 3D nodes and edges
+                # Get drug 1 details
 
 
 
-                nodes = []
+                drug1_info = session.run("""
 
 
 
-                edges = []
+                    MATCH (d:Drug {name: $drug1})
 
 
 
-                drug_ids = {}
+                    RETURN d.name as name, d.moa as moa, d.phase as phase
 
 
 
-                target_ids = {}
+                """, drug1=drug1).single()
 
 
 
@@ -6405,195 +6358,175 @@ class DrugTargetGraphApp:
 
 
 
-                for i, record in enumerate(data):
-
-
-
-                    drug_name = record['drug']
-
-
-
-                    target_name = record['target']
-
-
-
-                    
-
-
-
-                    # Add drug node if not exists
-
-
-
-                    if drug_name not in drug_ids:
+                # Get drug 2 details
 
 
 
-                        drug_ids[drug_name] = len(nodes)
+                drug2_info = session.run("""
 
 
 
-                        # Create 3D position in a sphere
+                    MATCH (d:Drug {name: $drug2})
 
 
 
-                        angle = len(nodes) * 2 * np.pi / (limit * 2)
+                    RETURN d.name as name, d.moa as moa, d.phase as phase
 
 
 
-                        radius = 2.0
+                """, drug2=drug2).single()
 
 
 
-                        nodes.append({
+                
 
 
 
-                            'id': len(nodes),
+                if not drug1_info or not drug2_info:
 
 
 
-                            'label': drug_name,
+                    return None
 
 
 
-                            'type': 'drug',
+                
 
 
 
-                            'moa': record['moa'],
+                # Get targets for both drugs
 
 
 
-                            'phase': record['phase'],
+                drug1_targets = [r['target'] for r in session.run("""
 
 
 
-                            'x': radius * np.cos(angle),
+                    MATCH (d:Drug {name: $drug1})-[:TARGETS]->(t:Target)
 
 
 
-                            'y': radius * np.sin(angle),
+                    RETURN t.name as target
 
 
 
-                            'z': np.random.uniform(-1, 1)
+                    ORDER BY t.name
 
 
 
-                        })
+                """, drug1=drug1)]
 
 
 
-                    
+                
 
 
 
-                    # Add target node if not exists
+                drug2_targets = [r['target'] for r in session.run("""
 
 
 
-                    if target_name not in target_ids:
+                    MATCH (d:Drug {name: $drug2})-[:TARGETS]->(t:Target)
 
 
 
-                        target_ids[target_name] = len(nodes)
+                    RETURN t.name as target
 
 
 
-                        # Create 3D position in inner sphere
+                    ORDER BY t.name
 
 
 
-                        angle = len(nodes) * 2 * np.pi / (limit * 2)
+                """, drug2=drug2)]
 
 
 
-                        radius = 1.0
+                
 
 
 
-                        nodes.append({
+                # Get common targets
 
 
 
-                            'id': len(nodes),
+                common_targets = [r['target'] for r in session.run("""
 
 
 
-                            'label': target_name,
+                    MATCH (d1:Drug {name: $drug1})-[:TARGETS]->(t:Target)<-[:TARGETS]-(d2:Drug {name: $drug2})
 
 
 
-                            'type': 'target',
+                    RETURN t.name as target
 
 
 
-                            'x': radius * np.cos(angle),
+                    ORDER BY t.name
 
 
 
-                            'y': radius * np.sin(angle),
+                """, drug1=drug1, drug2=drug2)]
 
 
 
-                            'z': np.random.uniform(-0.5, 0.5)
+                
 
 
 
-                        })
+                # Get unique targets for each drug
 
 
 
-                    
+                common_set = set(common_targets)
 
 
 
-                    # Add edge
+                drug1_unique = [t for t in drug1_targets if t not in common_set]
 
 
 
-                    edges.append({
+                drug2_unique = [t for t in drug2_targets if t not in common_set]
 
 
 
-                        'source': drug_ids[drug_name],
+                
 
 
 
-                        'target': target_ids[target_name],
+                return {
 
 
 
-                        'type': 'targets'
+                    "drug1": dict(drug1_info),
 
 
 
-                    })
+                    "drug2": dict(drug2_info),
 
 
 
-                
+                    "drug1_targets": drug1_targets,
 
 
 
-                return {
+                    "drug2_targets": drug2_targets,
 
 
 
-                    'nodes': nodes,
+                    "common_targets": common_targets,
 
 
 
-                    'edges': edges,
+                    "drug1_unique": drug1_unique,
 
 
 
-                    'drug_ids': drug_ids,
+                    "drug2_unique": drug2_unique,
 
 
 
-                    'target_ids': target_ids
+                    "similarity_score": len(common_targets) / max(len(drug1_targets), len(drug2_targets)) * 100
 
 
 
@@ -6605,7 +6538,7 @@ class DrugTargetGraphApp:
 
 
 
-            st.error(f"Error getting 3D network data: {e}")
+            st.error(f"Error comparing drugs: {e}")
 
 
 
@@ -6617,11 +6550,11 @@ class DrugTargetGraphApp:
 
 
 
-    def get_drug_comparison(self, drug1: str, drug2: str) -> Dict[str, Any]:
+    def get_therapeutic_pathways(self, drug_name: str) -> Dict[str, Any]:
 
 
 
-        """Compare two drugs in detail"""
+        """Get therapeutic pathways and mechanisms for a drug"""
 
 
 
@@ -6645,287 +6578,19 @@ class DrugTargetGraphApp:
 
 
 
-                # Get drug 1 details
+                # Get drug's targets and their biological functions
 
 
 
-                drug1_info = session.run("""
+                result = session.run(THERAPEUTIC_PATHWAYS_QUERY, drug_name=drug_name)
 
 
 
-                    MATCH (d:Drug {name: $drug1})
+                
 
 
 
-                    RETURN d.name as name, d.moa as moa, d.phase as phase
-
-
-
-                """, drug1=drug1).single()
-
-
-
-                
-
-
-
-                # Get drug 2 details
-
-
-
-                drug2_info = session.run("""
-
-
-
-                    MATCH (d:Drug {name: $drug2})
-
-
-
-                    RETURN d.name as name, d.moa as moa, d.phase as phase
-
-
-
-                """, drug2=drug2).single()
-
-
-
-                
-
-
-
-                if not drug1_info or not drug2_info:
-
-
-
-                    return None
-
-
-
-                
-
-
-
-                # Get targets for both drugs
-
-
-
-                drug1_targets = session.run("""
-
-
-
-                    MATCH (d:Drug {name: $drug1})-[:TARGETS]->(t:Target)
-
-
-
-                    RETURN t.name as target
-
-
-
-                    ORDER BY t.name
-
-
-
-                """, drug1=drug1).data()
-
-
-
-                
-
-
-
-                drug2_targets = session.run("""
-
-
-
-                    MATCH (d:Drug {name: $drug2})-[:TARGETS]->(t:Target)
-
-
-
-                    RETURN t.name as target
-
-
-
-                    ORDER BY t.name
-
-
-
-                """, drug2=drug2).data()
-
-
-
-                
-
-
-
-                # Get common targets
-
-
-
-                common_targets = session.run("""
-
-
-
-                    MATCH (d1:Drug {name: $drug1})-[:TARGETS]->(t:Target)<-[:TARGETS]-(d2:Drug {name: $drug2})
-
-
-
-                    RETURN t.name as target
-
-
-
-                    ORDER BY t.name
-
-
-
-                """, drug1=drug1, drug2=drug2).data()
-
-
-
-                
-
-
-
-                # Get unique targets for each drug
-
-
-
-                drug1_unique = [t['target'] for t in drug1_targets if t['target'] not in [ct['target'] for ct in common_targets]]
-
-
-
-                drug2_unique = [t['target'] for t in drug2_targets if t['target'] not in [ct['target'] for ct in common_targets]]
-
-
-
-                
-
-
-
-                return {
-
-
-
-                    "drug1": dict(drug1_info),
-
-
-
-                    "drug2": dict(drug2_info),
-
-
-
-                    "drug1_targets": [t['target'] for t in drug1_targets],
-
-
-
-                    "drug2_targets": [t['target'] for t in drug2_targets],
-
-
-
-                    "common_targets": [t['target'] for t in common_targets],
-
-
-
-                    "drug1_unique": drug1_unique,
-
-
-
-                    "drug2_unique": drug2_unique,
-
-
-
-                    "similarity_score": len(common_targets) / max(len(drug1_targets), len(drug2_targets)) * 100
-
-
-
-                }
-
-
-
-        except Exception as e:
-
-
-
-            st.error(f"Error comparing drugs: {e}")
-
-
-
-            return None
-
-
-
-    
-
-
-
-    def get_therapeutic_pathways(self, drug_name: str) -> Dict[str, Any]:
-
-
-
-        """Get therapeutic pathways and mechanisms for a drug"""
-
-
-
-        if not self.driver:
-
-
-
-            return None
-
-
-
-            
-
-
-
-        try:
-
-
-
-            with self.driver.session(database=self.database) as session:
-
-
-
-                # Get drug's targets and their biological functions
-
-
-
-                result = session.run("""
-
-
-
-                    MATCH (d:Drug {name: $drug_name})-[:TARGETS]->(t:Target)
-
-
-
-                    OPTIONAL MATCH (t)<-[:TARGETS]-(other:Drug)
-
-
-
-                    WHERE other.name <> $drug_name
-
-
-
-                    RETURN d.name as drug, d.moa as moa, d.phase as phase,
-
-
-
-                           t.name as target, count(other) as other_drugs
-
-
-
-                    ORDER BY other_drugs DESC
-
-
-
-                """, drug_name=drug_name)
-
-
-
-                
-
-
-
-                data = result.data()
+                data = [(r['moa'], r['target'], r['other_drugs']) for r in result]
 
 
 
@@ -6953,11 +6618,11 @@ class DrugTargetGraphApp:
 
 
 
-                for record in data:
+                for moa, target, other_drugs in data:
 
 
 
-                    moa = record['moa'] if record['moa'] else 'Unknown'
+                    moa = moa if moa else 'Unknown'
 
 
 
@@ -6973,11 +6638,11 @@ class DrugTargetGraphApp:
 
 
 
-                        'target': record['target'],
+                        'target': target,
 
 
 
-                        'other_drugs': record['other_drugs']
+                        'other_drugs': other_drugs
 
 
 
@@ -7603,19 +7268,23 @@ def show_dashboard(app):
 
             if top_drugs:
 
-                for drug in top_drugs:
+                # Emit all cards as a single markdown element
 
-                    with st.container():
+                drug_cards = [
 
-                        st.markdown(f"**{drug['drug']}**")
+                    f"<div class=\"drug-card\"><strong>{html.escape(str(drug['drug']))}</strong><br>"
 
-                        st.write(f"**Targets:** {drug['target_count']}")
+                    f"<strong>Targets:</strong> {drug['target_count']}<br>"
 
-                        st.write(f"**MOA:** {drug['moa']}")
+                    f"<strong>MOA:</strong> {html.escape(str(drug['moa']))}<br>"
 
-                        st.write(f"**Phase:** {drug['phase']}")
+                    f"<strong>Phase:</strong> {html.escape(str(drug['phase']))}</div>"
 
-                        st.divider()
+                    for drug in top_drugs
+
+                ]
+
+                st.markdown("\n".join(drug_cards), unsafe_allow_html=True)
 
 
 
@@ -7637,17 +7306,19 @@ def show_dashboard(app):
 
             if top_targets:
 
-                for target in top_targets:
+                target_cards = [
 
-                    with st.container():
+                    f"<div class=\"target-card\"><strong>{html.escape(str(target['target']))}</strong><br>"
 
-                        st.markdown(f"**{target['target']}**")
+                    f"<strong>Drugs:</strong> {target['drug_count']}<br>"
 
-                        st.write(f"**Drugs:** {target['drug_count']}")
+                    "Targeted by multiple compounds</div>"
 
-                        st.write("Targeted by multiple compounds")
+                    for target in top_targets
 
-                        st.divider()
+                ]
+
+                st.markdown("\n".join(target_cards), unsafe_allow_html=True)
 
 
 
@@ -7739,6309 +7410,6774 @@ def show_dashboard(app):
 
 
 
-def show_network_visualization(app):
+def load_precomputed_layout(name: str, database: str) -> Optional[Dict[str, Any]]:
 
 
 
-    """Show network visualization"""
+    """Load a layout written by precompute_layouts.py for database, or None if there isn't a current one"""
 
 
 
-    st.header("🌐 Network Visualization")
+    path = os.path.join(LAYOUT_DIR, f"{name}.json")
 
 
 
-    
+    if not os.path.exists(path):
 
 
 
-    # Add helpful introduction
+        return None
 
 
 
-    st.markdown("""
+    try:
 
 
 
-    **What is network visualization?** See how drugs and biological targets connect to each other in beautiful interactive graphs.
+        with open(path, 'r') as f:
 
 
 
-    
+            layout = json.load(f)
 
 
 
-    **What do the colors mean?**
+    except (OSError, ValueError) as e:
 
 
 
-    - 🔴 **Red nodes** = Drugs (medicines)
+        logger.warning(f"Ignoring unreadable layout file {path}: {e}")
 
 
 
-    - 🔵 **Blue nodes** = Biological targets (proteins in your body)
+        return None
 
 
 
-    - 🟢 **Green nodes** = Related drugs (drugs with similar targets)
+    if not layout_is_current(layout, database):
 
 
 
-    - **Gray lines** = Connections showing "drug targets this protein"
+        # Written for another database, or too old to trust over live data
 
 
 
-    
+        logger.info(f"Ignoring stale layout file {path}")
 
 
 
-    **How to use:** Enter a drug name below to see its network, or generate a global view of all connections.
+        return None
 
 
 
-    """)
+    return layout
 
 
 
-    
 
 
 
-    # Network options
 
+def load_precomputed_3d_network(size: int, database: str) -> Optional[Dict[str, Any]]:
 
 
-    col1, col2 = st.columns(2)
 
+    """Precomputed 3D network in the get_3d_network_data() column format"""
 
 
-    
 
+    layout = load_precomputed_layout(f"global3d_{size}", database)
 
 
-    with col1:
 
+    if layout is None:
 
 
-        st.subheader("🔍 Drug Network Explorer")
 
+        return None
 
 
-        
 
+    for key in ('x', 'y', 'z'):
 
 
-        # Add example buttons for network exploration
 
+        layout[key] = np.asarray(layout[key], dtype=np.float32)
 
 
-        st.write("**Try these examples:**")
 
+    for key in ('edges_src', 'edges_dst'):
 
 
-        col_a, col_b, col_c = st.columns(3)
 
+        layout[key] = np.asarray(layout[key], dtype=np.int32)
 
 
-        with col_a:
 
+    return layout
 
 
-            if st.button("🩹 Aspirin Network", help="See how aspirin connects to targets"):
 
 
 
-                st.session_state.network_drug_example = "aspirin"
 
 
+# Drops the "-" from "-1"/"-2"/"-3" sequences that break parsing of source SMILES
 
-        with col_b:
 
 
+_CHARGE_RE = re.compile(r'-([123])')
 
-            if st.button("💊 Morphine Network", help="Explore morphine's target network"):
 
 
 
-                st.session_state.network_drug_example = "morphine"
 
 
 
-        with col_c:
+def _smiles_plausible(smiles: str) -> bool:
 
 
 
-            if st.button("🧬 Insulin Network", help="View insulin's biological connections"):
+    """Cheap check for unbalanced branches/brackets, which RDKit would reject anyway"""
 
 
 
-                st.session_state.network_drug_example = "insulin"
+    return smiles.count('(') == smiles.count(')') and smiles.count('[') == smiles.count(']')
 
 
 
-        
 
 
 
-        # Get drug name from input or example
 
+@st.cache_data(ttl=24 * 3600, max_entries=512, show_spinner=False)
 
 
-        default_network_value = st.session_state.get('network_drug_example', '')
 
+def smiles_to_3d(smiles: str) -> Optional[Tuple[str, float, int, int]]:
 
 
-        drug_name = st.text_input("Enter drug name to explore its network:", value=default_network_value, help="Enter any drug name to see how it connects to biological targets")
 
+    """Embed a single SMILES in 3D (needs RDKit).
 
 
-        
 
+    
 
 
-        if drug_name:
 
+    Returns (mol block, molecular weight, atom count, bond count) with hydrogens
 
 
-            # Check if a target was clicked to center the network
 
-            center_key = f'main_drug_network_center_{drug_name}'
+    added, or None if RDKit cannot parse or embed the SMILES.
 
-            center_node = st.session_state.get(center_key, drug_name)
 
-            
 
-            # Debug information
+    """
 
-            st.caption(f"🔍 Debug: Center key = '{center_key}', Center node = '{center_node}'")
 
 
+    from rdkit import Chem
 
-            if center_node == drug_name:
 
-                # Drug-centered view: show drug in center with its targets
 
-                network_data = app.get_drug_network(drug_name)
+    from rdkit.Chem import AllChem, Descriptors
 
-            else:
 
-                # Target-centered view: show target in center with all drugs targeting it
 
-                network_data = app.get_target_network(center_node)
+    
 
 
 
-            if network_data:
+    mol = Chem.MolFromSmiles(smiles)
 
 
 
-                if center_node == drug_name:
+    if mol is None:
 
-                    st.success(f"Found network for {drug_name}")
 
-                else:
 
-                    st.success(f"Found network for target {center_node}")
+        return None
 
 
 
-                
+    
 
 
 
-                # Create network graph using plotly
+    # Add hydrogens and generate 3D coordinates (fixed seed keeps cached results stable)
 
 
 
-                nodes = network_data['nodes']
+    mol = Chem.AddHs(mol)
 
 
 
-                edges = network_data['edges']
+    params = AllChem.ETKDGv3()
 
 
 
-                
+    params.randomSeed = 42
 
 
 
-                # Prepare data for plotly
+    params.useSmallRingTorsions = True
 
 
 
-                node_x = []
+    if AllChem.EmbedMolecule(mol, params) == -1:
 
 
 
-                node_y = []
+        # ETKDG can fail on strained or large ring systems; random starting coordinates usually recover
 
 
 
-                node_text = []
+        params.useRandomCoords = True
 
 
 
-                node_color = []
+        if AllChem.EmbedMolecule(mol, params) == -1:
 
 
 
-                
+            return None
 
 
 
-                for node in nodes:
+    
 
 
 
-                    if center_node == drug_name:
+    # ETKDG geometry is good enough for display; only relax large molecules
 
-                        # Drug-centered view
 
-                        if node['type'] == 'central_drug':
 
-                            node_x.append(0)
+    if mol.GetNumHeavyAtoms() > MMFF_MIN_HEAVY_ATOMS:
 
-                            node_y.append(0)
 
-                            node_color.append('red')
 
-                        elif node['type'] == 'target':
+        # MMFF has no parameters for some drug-like chemistry; UFF covers those
 
-                            node_x.append(np.cos(len(node_x) * 2 * np.pi / len([n for n in nodes if n['type'] == 'target'])))
 
-                            node_y.append(np.sin(len(node_x) * 2 * np.pi / len([n for n in nodes if n['type'] == 'target'])))
 
-                            node_color.append('blue')
+        if AllChem.MMFFHasAllMoleculeParams(mol):
 
-                        else:
 
-                            node_x.append(np.cos(len(node_x) * 2 * np.pi / len([n for n in nodes if n['type'] == 'other_drug'])))
 
-                            node_y.append(np.sin(len(node_x) * 2 * np.pi / len([n for n in nodes if n['type'] == 'other_drug'])))
+            AllChem.MMFFOptimizeMolecule(mol)
 
-                            node_color.append('green')
 
-                    else:
 
-                        # Target-centered view
+        else:
 
-                        if node['type'] == 'central_target':
 
-                            node_x.append(0)
 
-                            node_y.append(0)
+            AllChem.UFFOptimizeMolecule(mol)
 
-                            node_color.append('red')
 
-                        elif node['type'] == 'drug':
 
-                            node_x.append(np.cos(len(node_x) * 2 * np.pi / len([n for n in nodes if n['type'] == 'drug'])))
+    return Chem.MolToMolBlock(mol), Descriptors.MolWt(mol), mol.GetNumAtoms(), mol.GetNumBonds()
 
-                            node_y.append(np.sin(len(node_x) * 2 * np.pi / len([n for n in nodes if n['type'] == 'drug'])))
 
-                            node_color.append('green')
 
-                        else:
 
-                            node_x.append(np.cos(len(node_x) * 2 * np.pi / len([n for n in nodes if n['type'] == 'other_target'])))
 
-                            node_y.append(np.sin(len(node_x) * 2 * np.pi / len([n for n in nodes if n['type'] == 'other_target'])))
 
-                            node_color.append('blue')
 
+@st.cache_data(ttl=24 * 3600, max_entries=512, show_spinner=False)
 
 
-                    
 
+def smiles_to_mol_block(smiles: str) -> Optional[Tuple[int, str, Tuple[str, float, int, int]]]:
 
 
-                    node_text.append(f"{node['label']}<br>Type: {node['type']}")
 
+    """Embed the first parseable comma-separated SMILES variant in 3D (needs RDKit).
 
 
-                
 
+    
 
 
-                # Create edge traces
 
+    Returns (variant index, cleaned SMILES, smiles_to_3d() result), or None if no
 
 
-                edge_x = []
 
+    variant parses.
 
 
-                edge_y = []
 
+    """
 
 
-                for edge in edges:
 
+    smiles_list = [s.strip() for s in smiles.split(',') if s.strip()]
 
 
-                    x0, y0 = node_x[edge['source']], node_y[edge['source']]
 
+    for i, single_smiles in enumerate(smiles_list):
 
 
-                    x1, y1 = node_x[edge['target']], node_y[edge['target']]
 
+        # Clean the SMILES string
 
 
-                    edge_x.extend([x0, x1, None])
 
+        cleaned_smiles = _CHARGE_RE.sub(r'\1', single_smiles)
 
 
-                    edge_y.extend([y0, y1, None])
 
+        if not _smiles_plausible(cleaned_smiles):
 
 
-                
 
+            continue
 
 
-                # Create the network plot
 
+        structure = smiles_to_3d(cleaned_smiles)
 
 
-                fig = go.Figure()
 
+        if structure is not None:
 
 
-                
 
+            return i, cleaned_smiles, structure
 
 
-                # Add edges
 
+    return None
 
 
-                fig.add_trace(go.Scatter(
 
 
 
-                    x=edge_x, y=edge_y,
 
 
+def load_demo_structure(smiles: str) -> Optional[Tuple[str, float, int, int]]:
 
-                    line=dict(width=0.5, color='#888'),
 
 
+    """smiles_to_3d() for a DEMO_MOLECULES entry, persisted in CACHE_DIR so restarts skip RDKit"""
 
-                    hoverinfo='none',
 
 
+    key = hashlib.md5(f"demo_{smiles}".encode()).hexdigest()
 
-                    mode='lines'))
 
 
+    structure = load_from_cache(key)
 
-                
 
 
+    if structure is None:
 
-                # Add nodes
 
 
+        structure = smiles_to_3d(smiles)
 
-                fig.add_trace(go.Scatter(
 
 
+        if structure is not None:
 
-                    x=node_x, y=node_y,
 
 
+            save_to_cache(key, structure)
 
-                    mode='markers+text',
 
 
+    return structure
 
-                    hoverinfo='text',
 
 
 
-                    text=[node['label'] for node in nodes],
 
 
 
-                    textposition="top center",
+@st.cache_data(max_entries=256, show_spinner=False)
 
 
 
-                    marker=dict(
+def build_viewer_html(mol_block: str, width: int = 600, height: int = 400) -> str:
 
 
 
-                        size=20,
+    """Standalone py3Dmol viewer HTML (sticks, spheres and element labels) for a mol block"""
 
 
 
-                        color=node_color,
+    import py3Dmol
 
 
 
-                        line=dict(width=2, color='white')
+    
 
 
 
-                    ),
+    view = py3Dmol.view(width=width, height=height)
 
 
 
-                    textfont=dict(size=10)
+    view.addModel(mol_block, 'mol')
 
 
 
-                ))
+    view.setStyle({
 
 
 
-                
+        'stick': {
 
 
 
-                if center_node == drug_name:
+            'colorscheme': 'default',
 
-                    title_text = f"🕸️ Drug-Centered Network: {drug_name}"
 
-                else:
 
-                    title_text = f"🕸️ Target-Centered Network: {center_node}"
+            'radius': 0.15
 
-                
 
-                fig.update_layout(
 
-                    title=title_text,
+        },
 
-                    showlegend=False,
 
-                    hovermode='closest',
 
-                    margin=dict(b=20,l=5,r=5,t=40),
+        'sphere': {
 
-                    xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
 
-                    yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
 
-                    height=600
+            'scale': 0.3,
 
-                )
 
 
+            'colorscheme': 'default'
 
-                
 
 
+        }
 
-                st.plotly_chart(fig, width='stretch')
 
-                
 
-                # Add interactive buttons for network reorientation
+    })
 
-                if center_node == drug_name:
 
-                    # Drug-centered view: show target buttons
 
-                    st.markdown("**🎯 Click a target below to center the network on it:**")
+    view.addStyle({
 
-                    target_nodes = [n for n in nodes if n['type'] == 'target']
 
-                    if target_nodes:
 
-                        target_cols = st.columns(min(4, len(target_nodes)))
+        'stick': {
 
-                        for i, target_node in enumerate(target_nodes):
 
-                            with target_cols[i % len(target_cols)]:
 
-                                target_name = target_node['label']
+            'showNonBondedAsSticks': True,
 
-                                if st.button(f"🎯 {target_name}", key=f"center_target_{drug_name}_{target_name}_{i}"):
 
-                                    st.session_state[f'main_drug_network_center_{drug_name}'] = target_name
 
-                                    st.success(f"🎯 Centering network on target: {target_name}")
+            'colorscheme': 'default'
 
-                                    st.rerun()
 
-                    else:
 
-                        st.info("No targets found for this drug")
+        }
 
-                else:
 
-                    # Target-centered view: show drug buttons
 
-                    st.markdown(f"**🎯 Currently centered on: {center_node}**")
+    })
 
-                    st.markdown("**💊 Click a drug below to center the network on it:**")
 
-                    drug_nodes = [n for n in nodes if n['type'] == 'drug']
 
-                    if drug_nodes:
+    view.addPropertyLabels('elem', '', {
 
-                        drug_cols = st.columns(min(4, len(drug_nodes)))
 
-                        for i, drug_node in enumerate(drug_nodes):
 
-                            with drug_cols[i % len(drug_cols)]:
+        'fontColor': 'black',
 
-                                drug_name_btn = drug_node['label']
 
-                                button_text = f"💊 {drug_name_btn}" if drug_name_btn != drug_name else f"⭐ {drug_name_btn} (Original)"
 
-                                if st.button(button_text, key=f"center_drug_{drug_name}_{drug_name_btn}_{i}"):
+        'fontSize': 12,
 
-                                    st.session_state[f'main_drug_network_center_{drug_name}'] = drug_name_btn
 
-                                    st.success(f"💊 Centering network on drug: {drug_name_btn}")
 
-                                    st.rerun()
+        'showBackground': False,
 
-                    else:
 
-                        st.info("No drugs found for this target")
 
-                
+        'alignment': 'center'
 
-                # Add reset button
 
-                reset_text = "🔄 Reset to Drug Center" if center_node != drug_name else "🔄 Reset Network"
 
-                if st.button(reset_text, key=f"reset_main_network_{drug_name}"):
+    })
 
-                    if f'main_drug_network_center_{drug_name}' in st.session_state:
 
-                        del st.session_state[f'main_drug_network_center_{drug_name}']
 
-                    st.success("🔄 Reset to drug center")
+    view.setBackgroundColor('white')
 
-                    st.rerun()
 
 
+    view.zoomTo()
 
-                # Show network statistics
 
 
+    return view._make_html()
 
-                st.subheader("📊 Network Statistics")
 
 
 
-                col1, col2, col3 = st.columns(3)
 
 
 
-                
+@st.cache_resource(show_spinner=False)
 
 
 
-                with col1:
+def _pubchem_session():
 
 
 
-                    st.metric("Total Nodes", len(nodes))
+    """Shared keep-alive HTTP session for PubChem lookups (one per server process)"""
 
 
 
-                with col2:
+    import requests
 
 
 
-                    st.metric("Total Edges", len(edges))
+    session = requests.Session()
 
 
 
-                with col3:
+    session.mount('https://', requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8))
 
 
 
-                    target_count = len([n for n in nodes if n['type'] == 'target'])
+    return session
 
 
 
-                    st.metric("Targets", target_count)
 
 
 
-    
 
+@st.cache_data(ttl=24 * 3600, show_spinner=False)
 
 
-    with col2:
 
+def pubchem_smiles(drug_name: str) -> Optional[str]:
 
 
-        st.subheader("🌍 Global Network Overview")
 
+    """Look up a drug's isomeric SMILES on PubChem, or None if PubChem has no match.
 
 
-        st.write("View the overall drug-target network structure")
 
+    
 
 
-        
 
+    Failed requests raise requests exceptions, so they are not cached.
 
 
-        if st.button("Generate Global Network"):
 
+    """
 
 
-            with st.spinner("Generating network visualization..."):
 
+    search_url = f"https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound/name/{drug_name}/property/IsomericSMILES/JSON"
 
 
-                network_data = app.get_network_data(100)
 
+    response = _pubchem_session().get(search_url, timeout=10)
 
 
-                if network_data:
 
+    if response.status_code == 404:
 
 
-                    st.success("Network generated successfully!")
 
+        return None
 
 
-                    
 
+    response.raise_for_status()
 
 
-                    # Create a simplified network visualization
 
+    
 
 
-                    nodes = network_data['nodes']
 
+    data = response.json()
 
 
-                    edges = network_data['edges']
 
+    if 'PropertyTable' in data and 'Properties' in data['PropertyTable']:
 
 
-                    
 
+        return data['PropertyTable']['Properties'][0]['IsomericSMILES']
 
 
-                    # Create a force-directed layout using networkx
 
+    return None
 
 
-                    G = nx.Graph()
 
 
 
-                    
 
 
+@st.cache_data(ttl=600, show_spinner=False)
 
-                    for node in nodes:
 
 
+def cached_search_df(_app, connection: str, search_term: str, limit: int) -> pd.DataFrame:
 
-                        G.add_node(node['id'], label=node['label'], type=node['type'])
 
 
+    """Drug search results as a DataFrame, cached per connection, term and limit"""
 
-                    
 
 
+    return pd.DataFrame(_app.search_drugs(search_term, limit))
 
-                    for edge in edges:
 
 
 
-                        G.add_edge(edge['source'], edge['target'])
 
 
 
-                    
+@st.cache_data(ttl=3600, max_entries=8, show_spinner=False)
 
 
 
-                    # Use spring layout
+def _network_data(_app, connection: str, size: int) -> Dict[str, Any]:
 
 
 
-                    pos = nx.spring_layout(G, k=1, iterations=50)
+    """Global network data, cached per connection and size (the app itself is not hashed).
 
 
 
-                    
+    A failed query raises, so the failure is not cached for the hour.
 
 
 
-                    # Create plotly visualization
+    """
 
 
 
-                    edge_x = []
+    network_data = _app.get_network_data(size)
 
 
 
-                    edge_y = []
+    if network_data is None:
 
 
 
-                    for edge in G.edges():
+        raise LookupError(f"No global network data for size {size}")
 
 
 
-                        x0, y0 = pos[edge[0]]
+    return network_data
 
 
 
-                        x1, y1 = pos[edge[1]]
 
 
 
-                        edge_x.extend([x0, x1, None])
 
+def cached_network_data(_app, connection: str, size: int) -> Optional[Dict[str, Any]]:
 
 
-                        edge_y.extend([y0, y1, None])
 
+    """Global network data through the cache, or None when the query failed (already reported with st.error)"""
 
 
-                    
 
+    try:
 
 
-                    node_x = []
 
+        return _network_data(_app, connection, size)
 
 
-                    node_y = []
 
+    except LookupError:
 
 
-                    node_text = []
 
+        return None
 
 
-                    node_color = []
 
 
 
-                    
 
 
+@st.cache_data(ttl=3600, max_entries=8, show_spinner=False)
 
-                    for node in G.nodes():
 
 
+def _3d_network_data(_app, connection: str, size: int) -> Dict[str, Any]:
 
-                        x, y = pos[node]
 
 
+    """3D network data, cached per connection and size (the app itself is not hashed).
 
-                        node_x.append(x)
 
 
+    A failed query raises, so the failure is not cached for the hour.
 
-                        node_y.append(y)
 
 
+    """
 
-                        node_data = G.nodes[node]
 
 
+    network_data = _app.get_3d_network_data(size)
 
-                        node_text.append(f"{node_data['label']}<br>Type: {node_data['type']}")
 
 
+    if network_data is None:
 
-                        
 
 
+        raise LookupError(f"No 3D network data for size {size}")
 
-                        if node_data['type'] == 'drug':
 
 
+    return network_data
 
-                            node_color.append('red')
 
 
 
-                        else:
 
 
 
-                            node_color.append('blue')
+def cached_3d_network_data(_app, connection: str, size: int) -> Optional[Dict[str, Any]]:
 
 
 
-                    
+    """3D network data through the cache, or None when the query failed (already reported with st.error)"""
 
 
 
-                    fig = go.Figure()
+    try:
 
 
 
-                    
+        return _3d_network_data(_app, connection, size)
 
 
 
-                    # Add edges
+    except LookupError:
 
 
 
-                    fig.add_trace(go.Scatter(
+        return None
 
 
 
-                        x=edge_x, y=edge_y,
 
 
 
-                        line=dict(width=0.5, color='#888'),
 
+@st.cache_data(ttl=600, max_entries=2048, show_spinner=False)
 
 
-                        hoverinfo='none',
 
+def cached_target_details(_app, connection: str, target_name: str, version: int,
 
 
-                        mode='lines'))
 
+                          drug_limit: Optional[int] = None) -> Dict[str, Any]:
 
 
-                    
 
+    """Target details with its drugs, cached per connection and target until any session stores a classification (version)"""
 
 
-                    # Add nodes
 
+    return _app.get_target_details(target_name, drug_limit=drug_limit)
 
 
-                    fig.add_trace(go.Scatter(
 
 
 
-                        x=node_x, y=node_y,
 
 
 
-                        mode='markers',
+@st.cache_data(ttl=600, max_entries=1024, show_spinner=False)
 
 
 
-                        hoverinfo='text',
+def cached_drug_details(_app, connection: str, drug_name: str) -> Dict[str, Any]:
 
 
 
-                        text=node_text,
+    """Drug details with targets, indications and similar drugs, cached per connection and drug"""
 
 
 
-                        marker=dict(
+    return _app.get_drug_details(drug_name)
 
 
 
-                            size=8,
 
 
 
-                            color=node_color,
 
+@st.cache_data(ttl=300, show_spinner=False)
 
 
-                            line=dict(width=1, color='white')
 
+def cached_existing_classifications(_classifier, connection: str, drug_name: str, target_names: tuple, version: int) -> Dict[str, Dict]:
 
 
-                        )
 
+    """Stored classifications for a drug's targets, cached until any session stores a new one (version)"""
 
 
-                    ))
 
+    return _classifier.get_existing_classifications(drug_name, list(target_names))
 
 
-                    
 
 
 
-                    fig.update_layout(
 
 
+@st.cache_data(ttl=300, show_spinner=False)
 
-                        title="Global Drug-Target Network",
 
 
+def cached_target_mechanisms(_classifier, connection: str, drug_name: str, target_names: tuple,
 
-                        showlegend=False,
 
 
+                             version: int) -> Tuple[Dict[str, Dict], Dict[str, int]]:
 
-                        hovermode='closest',
 
 
+    """Mechanism info per target plus relationship-type counts for the drug network view"""
 
-                        margin=dict(b=20,l=5,r=5,t=40),
 
 
+    existing_map = cached_existing_classifications(_classifier, connection, drug_name, target_names, version)
 
-                        xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
 
 
+    target_mechanisms = {}
 
-                        yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
 
 
+    for target in target_names:
 
-                        height=600
 
 
+        classification = existing_map.get(target)
 
-                    )
 
 
+        if classification:  # If any classification exists, it means it's classified
 
-                    
 
 
+            target_mechanisms[target] = {
 
-                    st.plotly_chart(fig, width='stretch')
 
 
+                'mechanism': classification.get('mechanism', 'Under Analysis') or 'Under Analysis',
 
-                    
 
 
+                'relationship_type': classification.get('relationship_type', 'Unknown'),
 
-                    # Show network statistics
 
 
+                'target_class': classification.get('target_class', 'Unknown'),
 
-                    st.subheader("📊 Global Network Statistics")
 
 
+                'target_subclass': classification.get('target_subclass', 'Unknown'),
 
-                    col1, col2, col3 = st.columns(3)
 
 
+                'confidence': classification.get('confidence', 0),
 
-                    
 
 
+                'reasoning': classification.get('reasoning', 'No reasoning provided'),
 
-                    with col1:
 
 
+                'classified': True
 
-                        drug_nodes = len([n for n in nodes if n['type'] == 'drug'])
 
 
+            }
 
-                        st.metric("Drug Nodes", drug_nodes)
 
 
 
-                    with col2:
 
 
+        else:
 
-                        target_nodes = len([n for n in nodes if n['type'] == 'target'])
 
 
+            target_mechanisms[target] = {
 
-                        st.metric("Target Nodes", target_nodes)
 
 
+                'mechanism': 'Under Analysis',
 
-                    with col3:
 
 
+                'relationship_type': 'Unclassified',
 
-                        st.metric("Total Edges", len(edges))
 
 
+                'target_class': 'Unknown',
 
 
 
+                'target_subclass': 'Unknown',
 
 
-def show_3d_network_visualization(app):
 
+                'confidence': 0,
 
 
-    """Show 3D network visualization"""
 
+                'reasoning': 'Target not yet analyzed by AI classifier',
 
 
-    st.header("🎨 3D Network Visualization")
 
+                'classified': False
 
 
-    
 
+            }
 
 
-    # Add helpful introduction
 
+    # Count relationship types in one pass; anything non-canonical is reported as Unknown
 
 
-    st.markdown("""
 
+    counts = Counter(info['relationship_type'] if info['classified'] else 'Unclassified' for info in target_mechanisms.values())
 
 
-    **What is 3D network visualization?** Experience drug-target relationships in immersive 3D space!
 
+    classification_summary = {rel_type: counts.pop(rel_type, 0) for rel_type in ('Primary/On-Target', 'Secondary/Off-Target', 'Unclassified')}
 
 
-    
 
+    classification_summary['Unknown'] = sum(counts.values())
 
 
-    **How to interact with 3D networks:**
 
+    return target_mechanisms, classification_summary
 
 
-    - 🖱️ **Click and drag** to rotate the view
 
 
 
-    - 🔍 **Mouse wheel** to zoom in and out
 
 
+@st.cache_resource(show_spinner=False)
 
-    - 👆 **Right-click and drag** to pan around
 
 
+def _classify_pacer() -> Dict[str, Any]:
 
-    - 🖱️ **Double-click** to reset the view
 
 
+    """Process-wide Gemini pacing state shared by every session's classification workers"""
 
-    
 
 
+    return {'lock': threading.Lock(), 'next_start': 0.0}
 
-    **What you'll see:**
 
 
 
-    - 🔴 **Red diamonds** = Drugs positioned in outer sphere
 
 
 
-    - 🔵 **Blue circles** = Biological targets in inner sphere
+def _paced_classification(app, pacer: Dict[str, Any], drug_name: str, target_name: str) -> Optional[Dict]:
 
 
 
-    - **Gray lines** = Connections between drugs and targets
+    """Classify one pair, starting no sooner than CLASSIFY_MIN_INTERVAL after the previous start"""
 
 
 
-    """)
+    with pacer['lock']:
 
 
 
-    
+        now = time.monotonic()
 
 
 
-    # 3D Network Options
+        start = max(now, pacer['next_start'])
 
 
 
-    col1, col2 = st.columns(2)
+        pacer['next_start'] = start + CLASSIFY_MIN_INTERVAL
 
 
 
-    
+    if start > now:
 
 
 
-    with col1:
+        time.sleep(start - now)
 
 
 
-        st.subheader("🔧 3D Network Settings")
+    return app.get_drug_target_classification(drug_name, target_name)
 
 
 
-        network_size = st.slider("Network Size", min_value=10, max_value=100, value=30, 
 
 
 
-                                help="Number of nodes to display (larger = more complex)")
 
+def classify_pairs_concurrently(app, pairs: List[Tuple[str, str]], on_progress=None):
 
 
-        
 
+    """Classify (drug, target) pairs on a small worker pool; yields (pair, classification, error) as each finishes"""
 
 
-        if st.button("🎨 Generate 3D Network", type="primary"):
 
+    # Classifier calls are I/O-bound (Gemini + Neo4j), so fan them out, but pace the
 
 
-            with st.spinner("Creating 3D network visualization..."):
 
+    # starts process-wide so several sessions classifying at once stay under the quota
 
 
-                network_data = app.get_3d_network_data(network_size)
 
+    if not pairs:
 
 
-                if network_data:
 
+        return
 
 
-                    st.success("3D Network generated successfully!")
 
+    pacer = _classify_pacer()
 
 
-                    
 
+    with ThreadPoolExecutor(max_workers=min(CLASSIFY_MAX_WORKERS, len(pairs))) as executor:
 
 
-                    # Create 3D scatter plot
 
+        futures = {
 
 
-                    nodes = network_data['nodes']
 
+            executor.submit(_paced_classification, app, pacer, drug_name, target_name): (drug_name, target_name)
 
 
-                    edges = network_data['edges']
 
+            for drug_name, target_name in pairs
 
 
-                    
 
+        }
 
 
-                    # Separate drugs and targets
 
+        for done, future in enumerate(as_completed(futures), start=1):
 
 
-                    drug_nodes = [n for n in nodes if n['type'] == 'drug']
 
+            pair = futures[future]
 
 
-                    target_nodes = [n for n in nodes if n['type'] == 'target']
 
+            try:
 
 
-                    
 
+                classification, error = future.result(), None
 
 
-                    # Create 3D plot
 
+            except Exception as e:
 
 
-                    fig = go.Figure()
 
+                classification, error = None, e
 
 
-                    
 
+            if on_progress:
 
 
-                    # Add drug nodes
 
+                on_progress(done, len(pairs), pair)
 
 
-                    if drug_nodes:
 
+            yield pair, classification, error
 
 
-                        fig.add_trace(go.Scatter3d(
 
 
 
-                            x=[n['x'] for n in drug_nodes],
 
 
+@st.cache_data(max_entries=8, show_spinner=False)
 
-                            y=[n['y'] for n in drug_nodes],
 
 
+def cached_spring_layout(node_ids: tuple, edge_pairs: tuple) -> np.ndarray:
 
-                            z=[n['z'] for n in drug_nodes],
 
 
+    """Spring layout positions (one row per node id) for a given node/edge set"""
 
-                            mode='markers+text',
 
 
+    index = {node_id: i for i, node_id in enumerate(node_ids)}
 
-                            name='Drugs',
 
 
+    edge_src = np.fromiter((index[src] for src, _ in edge_pairs), dtype=np.intp, count=len(edge_pairs))
 
-                            text=[n['label'] for n in drug_nodes],
 
 
+    edge_dst = np.fromiter((index[dst] for _, dst in edge_pairs), dtype=np.intp, count=len(edge_pairs))
 
-                            marker=dict(
 
 
+    return fast_spring_layout(len(node_ids), edge_src, edge_dst, iters=50, k=1.0)
 
-                                size=8,
 
 
 
-                                color='red',
 
 
 
-                                symbol='diamond',
+def edge_segments(coords: np.ndarray, edge_src: np.ndarray, edge_dst: np.ndarray) -> np.ndarray:
 
 
 
-                                line=dict(width=2, color='white')
+    """Interleave edge endpoints as [src, dst, nan, ...] so all edges fit in one line trace"""
 
 
 
-                            ),
+    segments = np.empty(3 * len(edge_src), dtype=np.float32)
 
 
 
-                            textposition="top center",
+    segments[0::3] = coords[edge_src]
 
 
 
-                            textfont=dict(size=8)
+    segments[1::3] = coords[edge_dst]
 
 
 
-                        ))
+    segments[2::3] = np.nan
 
 
 
-                    
+    return segments
 
 
 
-                    # Add target nodes
 
 
 
-                    if target_nodes:
 
+@lru_cache(maxsize=256)
 
 
-                        fig.add_trace(go.Scatter3d(
 
+def ring_layout(n: int) -> Tuple[np.ndarray, np.ndarray]:
 
 
-                            x=[n['x'] for n in target_nodes],
 
+    """x, y for n nodes circled around a centre node.
 
 
-                            y=[n['y'] for n in target_nodes],
 
+    
 
 
-                            z=[n['z'] for n in target_nodes],
 
+    Up to 8 nodes share one ring of radius 6; larger sets get an inner ring of radius 5
 
 
-                            mode='markers+text',
 
+    (at most 10 nodes) and an outer ring of radius 9 for the rest, each evenly spaced.
 
 
-                            name='Targets',
 
+    
 
 
-                            text=[n['label'] for n in target_nodes],
 
+    Memoised per n; the returned arrays are read-only.
 
 
-                            marker=dict(
 
+    """
 
 
-                                size=6,
 
+    if n <= 8:
 
 
-                                color='blue',
 
+        angles = np.linspace(0, 2 * np.pi, n, endpoint=False)
 
 
-                                symbol='circle',
 
+        radii = np.full(n, 6.0)
 
 
-                                line=dict(width=1, color='white')
 
+    else:
 
 
-                            ),
 
+        inner = min(10, n // 2)
 
 
-                            textposition="top center",
 
+        angles = np.concatenate([np.linspace(0, 2 * np.pi, inner, endpoint=False),
 
 
-                            textfont=dict(size=8)
 
+                                 np.linspace(0, 2 * np.pi, n - inner, endpoint=False)])
 
 
-                        ))
 
+        radii = np.repeat([5.0, 9.0], [inner, n - inner])
 
 
-                    
 
+    xs, ys = radii * np.cos(angles), radii * np.sin(angles)
 
 
-                    # Add edges (connections)
 
+    xs.setflags(write=False)  # Shared between callers through the cache
 
 
-                    edge_x = []
 
+    ys.setflags(write=False)
 
 
-                    edge_y = []
 
+    return xs, ys
 
 
-                    edge_z = []
 
 
 
-                    
 
 
+def spoke_segments(xs: np.ndarray, ys: np.ndarray, center_x: float = 0.0,
 
-                    for edge in edges:
 
 
+                   center_y: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
 
-                        source_node = next(n for n in nodes if n['id'] == edge['source'])
 
 
+    """Plotly line coordinates for one spoke from the centre to each (xs[i], ys[i]).
 
-                        target_node = next(n for n in nodes if n['id'] == edge['target'])
 
 
+    Every spoke takes three points (centre, end, NaN gap), so a whole group of edges
 
-                        
 
 
+    is one array pair for a single lines trace.
 
-                        edge_x.extend([source_node['x'], target_node['x'], None])
 
 
+    """
 
-                        edge_y.extend([source_node['y'], target_node['y'], None])
 
 
+    edge_x = np.full(3 * len(xs), np.nan)
 
-                        edge_z.extend([source_node['z'], target_node['z'], None])
 
 
+    edge_y = np.full(3 * len(ys), np.nan)
 
-                    
 
 
+    edge_x[0::3] = center_x
 
-                    fig.add_trace(go.Scatter3d(
 
 
+    edge_y[0::3] = center_y
 
-                        x=edge_x, y=edge_y, z=edge_z,
 
 
+    edge_x[1::3] = xs
 
-                        mode='lines',
 
 
+    edge_y[1::3] = ys
 
-                        name='Connections',
 
 
+    return edge_x, edge_y
 
-                        line=dict(width=1, color='rgba(128,128,128,0.6)'),
 
 
 
-                        hoverinfo='none'
 
 
 
-                    ))
+def order_by_relationship(names: List[str], mechanisms: Dict[str, Dict]) -> List[Tuple[str, str]]:
 
 
 
-                    
+    """names paired with their ring group, primary first, then secondary, unknown and unclassified (stable)"""
 
 
 
-                    # Update layout for 3D
+    ranks = np.fromiter((RELATIONSHIP_RANKS.get(mechanisms.get(name, {}).get('relationship_type'), 3) for name in names),
 
 
 
-                    fig.update_layout(
+                        dtype=np.int8, count=len(names))
 
 
 
-                        title=f"3D Drug-Target Network ({len(nodes)} nodes, {len(edges)} connections)",
+    return [(names[i], RING_GROUP_TYPES[ranks[i]]) for i in np.argsort(ranks, kind='stable').tolist()]
 
 
 
-                        scene=dict(
 
 
 
-                            xaxis_title="X",
 
+def add_grouped_edge_traces(traces: List[go.Scattergl], edge_groups: Dict[str, Dict[str, Any]], ring_x: np.ndarray,
 
 
-                            yaxis_title="Y", 
 
+                            ring_y: np.ndarray, glow: bool = True) -> None:
 
 
-                            zaxis_title="Z",
 
+    """Append edges collected per legend group to traces as one glow trace and one line trace each.
 
 
-                            camera=dict(
 
+    
 
 
-                                eye=dict(x=1.5, y=1.5, z=1.5)
 
+    edge_groups maps the legend name to {'color', 'width', 'glow', 'hovertemplate', 'index',
 
 
-                            )
 
+    'customdata'}: the ring positions (into ring_x/ring_y) its spokes run to from the centre and
 
+    
 
-                        ),
+    one hover row per spoke. Glows go in first so every line is drawn above them.
 
 
 
-                        height=700,
+    
 
 
 
-                        showlegend=True
+    glow=False leaves the glow traces out (used for large rings).
 
 
 
-                    )
+    """
 
 
 
-                    
+    segments = {priority: spoke_segments(ring_x[group['index']], ring_y[group['index']])
 
 
 
-                    st.plotly_chart(fig, width='stretch')
+                for priority, group in edge_groups.items()}
 
 
 
-                    
+    if glow:
 
 
 
-                    # Network statistics
+        for priority, group in edge_groups.items():
 
 
 
-                    st.subheader("📊 3D Network Statistics")
+            traces.append(go.Scattergl(
 
 
 
-                    col1, col2, col3, col4 = st.columns(4)
+                x=segments[priority][0], y=segments[priority][1],
 
 
 
-                    
+                mode='lines',
 
 
 
-                    with col1:
+                line=dict(color=group['glow'], width=group['width'] + 2),
 
 
 
-                        st.metric("Total Nodes", len(nodes))
+                showlegend=False,
 
 
 
-                    with col2:
+                hoverinfo='skip'
 
 
 
-                        st.metric("Total Edges", len(edges))
+            ))
 
 
 
-                    with col3:
+    for priority, group in edge_groups.items():
 
 
 
-                        drug_count = len([n for n in nodes if n['type'] == 'drug'])
+        traces.append(go.Scattergl(
 
 
 
-                        st.metric("Drug Nodes", drug_count)
+            x=segments[priority][0], y=segments[priority][1],
 
 
 
-                    with col4:
+            mode='lines',
 
 
 
-                        target_count = len([n for n in nodes if n['type'] == 'target'])
+            line=dict(color=group['color'], width=group['width']),
 
 
 
-                        st.metric("Target Nodes", target_count)
+            name=priority,
 
 
 
-                    
+            legendgroup=priority,
 
 
 
-                    # Interactive exploration
+            customdata=[row for row in group['customdata'] for _ in range(3)],
 
 
 
-                    st.subheader("🔍 Interactive 3D Exploration")
+            hovertemplate=group['hovertemplate']
 
 
 
-                    st.write("""
+        ))
 
 
 
-                    **How to use the 3D visualization:**
 
 
 
-                    - **Rotate:** Click and drag to rotate the view
 
 
+def add_ring_node_traces(traces: List[go.Scattergl], nodes: Dict[str, List], hovertemplate: str, glow: bool = True,
 
-                    - **Zoom:** Use mouse wheel to zoom in/out
 
 
+                         **text_kwargs) -> None:
 
-                    - **Pan:** Right-click and drag to pan
 
 
+    """Append ring nodes collected as parallel lists to traces as one glow trace and one marker trace.
 
-                    - **Hover:** Hover over nodes to see labels
 
 
+    
 
-                    - **Double-click:** Reset the view
 
 
+    nodes holds 'x', 'y', 'color', 'border', 'glow' and 'customdata' lists (one entry per node),
 
-                    """)
 
 
+    the customdata rows being the fields hovertemplate refers to.
 
-                else:
 
 
+    text_kwargs (text, textposition, textfont) switch the marker trace to markers+text.
 
-                    st.error("Failed to generate 3D network data.")
 
 
+    """
 
-    
 
 
+    if not nodes['x']:
 
-    with col2:
 
 
+        return
 
-        st.subheader("🎯 3D Network Features")
 
 
+    if glow:
 
-        st.markdown("""
 
 
+        traces.append(go.Scattergl(
 
-        **🌟 What's New in 3D:**
 
 
+            x=nodes['x'], y=nodes['y'],
 
-        
 
 
+            mode='markers',
 
-        - **🌍 Immersive 3D Space** - Explore networks in three dimensions
 
 
+            marker=dict(size=65, color=nodes['glow'], opacity=0.4),
 
-        - **🎨 Interactive Controls** - Rotate, zoom, and pan freely
 
 
+            showlegend=False,
 
-        - **🔍 Enhanced Visibility** - Better node separation and clarity
 
 
+            hoverinfo='skip'
 
-        - **📊 Spatial Relationships** - See how drugs and targets relate spatially
 
 
+        ))
 
-        - **⚡ Performance Optimized** - Smooth rendering even with large networks
 
 
+    traces.append(go.Scattergl(
 
-        
 
 
+        x=nodes['x'], y=nodes['y'],
 
-        **💡 Use Cases:**
 
 
+        mode='markers+text' if text_kwargs else 'markers',
 
-        - **Research Presentations** - Impressive 3D visualizations for demos
 
 
+        marker=dict(size=55, color=nodes['color'], line=dict(color=nodes['border'], width=3), opacity=0.9),
 
-        - **Network Analysis** - Better understanding of complex relationships
 
 
+        showlegend=False,
 
-        - **Drug Discovery** - Spatial insights into target interactions
 
 
+        customdata=nodes['customdata'],
 
-        - **Educational Purposes** - Engaging way to learn about drug networks
 
 
+        hovertemplate=hovertemplate,
 
-        """)
 
 
+        **text_kwargs
 
-        
 
 
+    ))
 
-        # Quick 3D demo
 
 
 
-        st.subheader("🚀 Quick 3D Demo")
 
 
 
-        if st.button("🎬 Show 3D Demo", type="secondary"):
+@lru_cache(maxsize=1024)
 
 
 
-            st.info("🎨 3D visualization is ready! Use the controls on the left to generate your own 3D network.")
+def truncate_mechanism_label(mechanism: str) -> str:
 
 
 
-            
+    """Shorten a mechanism to fit an edge label (memoised - the same mechanisms recur across renders)"""
 
 
 
-            # Show sample 3D data structure
+    return mechanism if len(mechanism) <= 15 else mechanism[:12] + "..."
 
 
 
-            st.code("""
 
 
 
-# Sample 3D Network Data Structure
 
+@st.cache_data(ttl=300, show_spinner=False)
 
 
-{
 
+def build_network_figure(drug_name: str, center_node: str, nodes_tuple: tuple, edges_tuple: tuple) -> go.Figure:
 
 
-    'nodes': [
 
+    """Build the drug/target-centered network figure (cached per drug and center node)"""
 
 
-        {
 
+    
 
 
-            'id': 0,
 
+    # nodes_tuple holds (label, type) pairs, edges_tuple holds (source, target) index pairs
 
 
-            'label': 'Drug Name',
 
+    # Central nodes stay at the origin of the preallocated coordinate arrays
 
 
-            'type': 'drug',
 
+    node_x = np.zeros(len(nodes_tuple), dtype=np.float32)
 
 
-            'x': 2.0,  # 3D X coordinate
 
+    node_y = np.zeros(len(nodes_tuple), dtype=np.float32)
 
 
-            'y': 0.0,  # 3D Y coordinate  
 
+    node_color = []
 
 
-            'z': 0.5   # 3D Z coordinate
 
+    
 
 
-        }
 
+    # Precompute one ring of unit-circle positions per node type
 
 
-    ],
 
+    # so the loop below only indexes into them
 
 
-    'edges': [
 
+    type_counts = Counter(node_type for _, node_type in nodes_tuple)
 
 
-        {
 
+    ring_x = {}
 
 
-            'source': 0,  # Source node ID
 
+    ring_y = {}
 
 
-            'target': 1,  # Target node ID
 
+    for node_type, count in type_counts.items():
 
 
-            'type': 'targets'
 
+        angles = np.arange(count) * 2 * np.pi / count
 
 
-        }
 
+        ring_x[node_type] = np.cos(angles)
 
 
-    ]
 
+        ring_y[node_type] = np.sin(angles)
 
 
-}
 
+    ring_index = dict.fromkeys(type_counts, 0)
 
 
-            """, language="python")
 
+    
 
 
 
+    type_colors = {
 
 
 
-def show_drug_search(app):
+        'central_drug': 'red',
 
 
 
-    """Show drug search interface"""
+        'central_target': 'red',
 
 
 
-    st.header("🔍 Drug Search")
+        'target': 'blue',
 
 
 
-    
+        'other_target': 'blue',
 
-    # Initialize drug_details to None to avoid UnboundLocalError
 
-    drug_details = None
 
-    
+        'drug': 'green',
 
 
 
-    # Add helpful introduction
+        'other_drug': 'green'
 
 
 
-    st.markdown("""
+    }
 
 
 
-    **What can you do here?** Search for any drug to see detailed information about it.
+    
 
 
 
-    
+    for k, (_, node_type) in enumerate(nodes_tuple):
 
 
 
-    **Try these examples:** aspirin, insulin, morphine, ibuprofen, metformin
+        if node_type not in ('central_drug', 'central_target'):
 
 
 
-    """)
+            i = ring_index[node_type]
 
 
 
-    
+            ring_index[node_type] = i + 1
 
 
 
-    # Add example buttons
+            node_x[k] = ring_x[node_type][i]
 
 
 
-    col1, col2, col3, col4 = st.columns(4)
+            node_y[k] = ring_y[node_type][i]
 
 
 
-    with col1:
+        node_color.append(type_colors.get(node_type, 'green'))
 
 
 
-        if st.button("Try: Aspirin", help="Search for Aspirin"):
+    # Create edge traces
 
 
 
-            st.session_state.search_example = "aspirin"
+    edge_src = np.fromiter((source for source, _ in edges_tuple), dtype=np.int32, count=len(edges_tuple))
 
 
 
-    with col2:
+    edge_dst = np.fromiter((target for _, target in edges_tuple), dtype=np.int32, count=len(edges_tuple))
 
 
 
-        if st.button("Try: Insulin", help="Search for Insulin"):
+    edge_x = edge_segments(node_x, edge_src, edge_dst)
 
 
 
-            st.session_state.search_example = "insulin"
+    edge_y = edge_segments(node_y, edge_src, edge_dst)
 
 
 
-    with col3:
+    
 
 
 
-        if st.button("Try: Morphine", help="Search for Morphine"):
+    # Create the network plot
 
 
 
-            st.session_state.search_example = "morphine"
+    fig = go.Figure()
 
 
 
-    with col4:
+    
 
 
 
-        if st.button("Try: Metformin", help="Search for Metformin"):
+    # Add edges
 
 
 
-            st.session_state.search_example = "metformin"
+    fig.add_trace(go.Scatter(
 
 
 
-    
+        x=edge_x, y=edge_y,
 
 
 
-    # Get search term from input or example
+        line=dict(width=0.5, color='#888'),
 
 
 
-    default_value = st.session_state.get('search_example', '')
+        hoverinfo='none',
 
 
 
-    
+        mode='lines'))
 
-    search_term = st.text_input("Enter drug name or partial name:", value=default_value, help="You can search for full names or just part of a drug name")
 
 
+    
 
-    # Clear session state if user is searching for a different drug
 
-    if search_term and search_term != st.session_state.get('last_search_term', ''):
 
-        # Clear previous search data when starting a new search
+    # Add nodes
 
-        st.session_state.pop('search_results', None)
 
-        st.session_state.pop('selected_drug', None)
 
-        st.session_state.pop('last_search_term', None)
+    fig.add_trace(go.Scatter(
 
-        st.session_state.pop('search_example', None)  # Clear example too
 
-        # Clear any cached network data
 
-        keys_to_remove = [key for key in st.session_state.keys() if key.startswith('target_network_')]
+        x=node_x, y=node_y,
 
-        for key in keys_to_remove:
 
-            st.session_state.pop(key, None)
 
-    
+        mode='markers+text',
 
-    # Store search term in session state for persistence across reruns
 
-    if search_term:
 
-        st.session_state['last_search_term'] = search_term
+        hoverinfo='text',
 
-    
 
-    # Use stored search term if current is empty but we have stored results
 
-    if not search_term and 'last_search_term' in st.session_state and 'search_results' in st.session_state:
+        text=[label for label, _ in nodes_tuple],
 
-        search_term = st.session_state['last_search_term']
 
-    
 
+        textposition="top center",
 
 
-    if search_term:
 
+        marker=dict(
 
 
-        results = app.search_drugs(search_term, 50)
 
+            size=20,
 
 
-        
 
+            color=node_color,
 
 
-        if results:
 
+            line=dict(width=2, color='white')
 
 
-            st.success(f"Found {len(results)} drugs matching '{search_term}'")
 
+        ),
 
 
-            
 
+        textfont=dict(size=10)
 
 
-            # Create a DataFrame for better display
 
+    ))
 
 
-            df = pd.DataFrame(results)
 
+    
 
 
-            # Store search results in session state for persistence across reruns
 
-            st.session_state['search_results'] = results
+    if center_node == drug_name:
 
-            
 
-            # Streamlit 1.28 requires width as int; use full container width instead
 
-            st.dataframe(df, use_container_width=True)
+        title_text = f"🕸️ Drug-Centered Network: {drug_name}"
 
-            
 
-            # Simple summary
 
-            st.info(f"📋 Found {len(results)} drugs. Select one below for detailed information.")
+    else:
 
-            
 
 
+        title_text = f"🕸️ Target-Centered Network: {center_node}"
 
-            # Allow user to select a drug for detailed view
 
-            # Use session state to maintain selection across interactions
 
-            # Use session state results if available (for persistence across reruns)
+    fig.update_layout(
 
-            if 'search_results' in st.session_state:
 
-                drug_options = [r['drug'] for r in st.session_state['search_results']]
 
-            else:
+        title=title_text,
 
-                drug_options = [r['drug'] for r in results]
 
-            
 
-            # Get current selection from session state, or default to first option
+        showlegend=False,
 
-            current_selection = st.session_state.get('selected_drug', drug_options[0] if drug_options else '')
 
-            
 
-            # If current selection is not in options, add it
+        hovermode='closest',
 
-            if current_selection and current_selection not in drug_options:
 
-                # Get drug details to add to options
 
-                drug_details_for_addition = app.get_drug_details(current_selection)
+        margin=dict(b=20,l=5,r=5,t=40),
 
-                if drug_details_for_addition:
 
-                    new_option = {
 
-                        'drug': current_selection,
+        xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
 
-                        'moa': drug_details_for_addition.get('moa', 'Unknown'),
 
-                        'phase': drug_details_for_addition.get('phase', 'Unknown')
 
-                    }
+        yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
 
-                    st.session_state['search_results'].append(new_option)
 
-                    drug_options.append(current_selection)
 
-            
+        height=600
 
-            # Find the index of current selection
 
-            try:
 
-                default_index = drug_options.index(current_selection) if current_selection in drug_options else 0
+    )
 
-            except:
 
-                default_index = 0
 
-            
+    
 
-            selected_drug = st.selectbox("Select a drug for detailed view:", drug_options, index=default_index, key="drug_selectbox")
 
 
+    return fig
 
-            # Update session state when selectbox changes
 
-            st.session_state['selected_drug'] = selected_drug
 
-            
 
 
 
-            if selected_drug:
 
+@st.cache_data(max_entries=64, show_spinner=False)
 
 
-                # Always get fresh drug details for the currently selected drug
 
-                drug_details = app.get_drug_details(selected_drug)
+def build_drug_network_figure(database: str, selected_drug: str, center_node: str, targets: tuple,
 
 
 
-                if drug_details:
+                              target_mechanisms: Dict[str, Dict], drug_info: Dict[str, Any],
 
 
 
-                    # Auto-classify all drug-target relationships if classifier is available
+                              network_drugs: tuple, ring_mechanisms: Dict[str, Dict], version: int) -> go.Figure:
 
 
 
-                    if app.classifier and drug_details['targets']:
+    """Build the ring network for the drug search page (drug- or target-centred).
 
 
 
-                        unclassified_targets = []
+    
 
 
 
-                        for target in drug_details['targets']:
+    Cached per drug, center node and classifier version (a new stored classification
 
 
 
-                            existing = app.classifier.get_existing_classification(selected_drug, target)
+    rebuilds it); reruns from unrelated widgets reuse the figure. ring_mechanisms holds the
 
 
 
-                            if not existing or not existing.get('classified', False):
+    classifications of the drugs around a centred target; the caller resolves (and stores)
 
 
 
-                                unclassified_targets.append(target)
+    them, so a cached figure never skips that work.
 
 
 
-                        
+    """
 
 
 
-                        if unclassified_targets:
+    # Enhanced layout algorithm based on classification types
 
-                            # Test API first
+    if center_node == selected_drug:
 
-                            col1, col2 = st.columns([3, 1])
+        # Drug-centered view: position targets around drug
 
-                            with col2:
+        drug_x, drug_y = 0, 0
 
-                                if st.button("🔧 Test API", help="Test if Gemini API is working"):
+        # Order targets by classification type for intelligent positioning
 
-                                    with st.spinner("Testing Gemini API..."):
 
-                                        if app.classifier.test_api_connection():
 
-                                            st.success("✅ API is working!")
+        ordered_targets = order_by_relationship(targets, target_mechanisms)
 
-                                        else:
 
-                                            st.error("❌ API test failed - check logs")
 
-                            
+        # Calculate dramatic circular layout for maximum visual impact (one or two rings)
 
-                            with col1:
 
-                                st.info(f"Found {len(unclassified_targets)} unclassified targets")
 
+        ring_x, ring_y = ring_layout(len(ordered_targets))
 
 
-                            # Classify ALL targets automatically - no limit
 
+        target_positions = [(x, y, target, group_type) for x, y, (target, group_type) in zip(ring_x.tolist(), ring_y.tolist(), ordered_targets)]
 
 
-                            targets_to_classify = unclassified_targets
 
 
+        show_glow = len(ring_x) <= MAX_GLOW_NODES  # Glow traces only pay off on small rings
 
-                            
+    else:
 
+        # Target-centered view: position drugs around target
 
+        target_x, target_y = 0, 0  # Target is at center
 
-                            st.info(f"🔄 **Auto-classifying ALL {len(targets_to_classify)} drug-target relationships...** This will take about {len(targets_to_classify) * 3} seconds.")
+        drug_x, drug_y = 0, 0  # Target is at center (alias for compatibility)
 
+        # Index the target's drugs by name for the edge and node passes below
 
 
-                            
 
+        drug_info_by_name = {d.get('drug', ''): d for d in network_drugs}
 
 
-                            # Progress bar for classification
 
+        # Order drugs by their relationship to the centered target for intelligent positioning
 
 
-                            progress_bar = st.progress(0)
 
+        ordered_drugs = order_by_relationship(list(drug_info_by_name), target_mechanisms)
 
 
-                            status_text = st.empty()
 
+        # Calculate dramatic circular layout for maximum visual impact (one or two rings)
 
 
-                            
 
+        ring_x, ring_y = ring_layout(len(ordered_drugs))
 
 
-                            classified_count = 0
 
+        drug_positions = [(x, y, drug, group_type) for x, y, (drug, group_type) in zip(ring_x.tolist(), ring_y.tolist(), ordered_drugs)]
 
 
-                            for i, target in enumerate(targets_to_classify):
 
 
+        show_glow = len(ring_x) <= MAX_GLOW_NODES  # Glow traces only pay off on small rings
 
-                                status_text.text(f"🧬 Analyzing {selected_drug} → {target}...")
 
 
+    # Create the VIVID, dramatic plot (traces are collected and handed to go.Figure in one go)
 
-                                
 
 
+    traces = []
 
-                                try:
 
 
+    
 
-                                    classification = app.get_drug_target_classification(selected_drug, target)
 
 
+    # Add dramatic connection lines with glow effects
 
-                                    if classification:
 
 
+    edge_traces = {}  # Edge segments grouped by effect type (one glow + one line trace each)
 
-                                        classified_count += 1
 
 
+    labels = {'x': [], 'y': [], 'text': [], 'hover': []}  # Mechanism labels on primary edges, drawn as one trace pair
 
-                                    else:
 
-                                        st.warning(f"⚠️ Failed to classify {selected_drug} → {target}")
 
+    
 
+    # Create edges based on current view
 
-                                except Exception as e:
+    if center_node == selected_drug:
 
+        # Drug-centered view: create edges from drug to targets
 
+        
 
-                                    # Log the error but continue with other classifications
+        for i, (x, y, target, ring_type) in enumerate(target_positions):
 
+            # Get comprehensive mechanism info for this target
 
+            mech_info = target_mechanisms.get(target, {})
 
-                                    logger.warning(f"Classification failed for {selected_drug} → {target}: {e}")
+            mechanism = mech_info.get('mechanism', 'Under Analysis') or 'Under Analysis'
 
-                                    st.warning(f"⚠️ Error classifying {selected_drug} → {target}: {str(e)}")
+            if not mechanism or mechanism.strip() == '':
 
+                mechanism = 'Under Analysis'
 
+            
 
-                                
+            rel_type = mech_info.get('relationship_type', 'Unclassified')
 
+            target_class = mech_info.get('target_class', 'Unknown')
 
+            confidence = float(mech_info.get('confidence', 0) or 0)
 
-                                progress_bar.progress((i + 1) / len(targets_to_classify))
+            
 
 
 
-                            
+            # Clean, professional color scheme
 
+            edge_color, edge_width, priority, node_color, glow_color = EFFECT_STYLES.get(rel_type, DEFAULT_EFFECT_STYLE)
 
 
-                            progress_bar.empty()
 
+            # Enhanced hover information with rich formatting (compact, so the figure JSON stays small)
 
+            hover_fields = [target, mechanism, confidence, target_class]
 
-                            status_text.empty()
+            
 
+            # Collect the glow and main line segments for this effect type
 
 
-                            
 
+            group = edge_traces.get(priority)
 
+            if group is None:
 
-                            if classified_count > 0:
+                group = edge_traces[priority] = {'color': edge_color, 'width': edge_width, 'glow': glow_color, 'index': [], 'customdata': [],
 
+                                                 'hovertemplate': TARGET_EDGE_HOVER.format(color=edge_color, priority=priority)}
 
 
-                                st.success(f"✅ **Successfully classified {classified_count}/{len(targets_to_classify)} relationships!** Complete mechanism analysis available below.")
 
+            group['index'].append(i)
 
 
-                                if classified_count == len(targets_to_classify):
 
+            group['customdata'].append(hover_fields)
 
 
-                                    st.success("🎉 **All classifications completed successfully!**")
 
+            # Mechanism label at the edge midpoint - only for primary effects to reduce clutter
 
 
-                            else:
 
+            if mechanism not in ['Under Analysis', 'Unknown'] and rel_type == 'Primary/On-Target':
 
 
-                                st.warning("⚠️ **Auto-classification encountered issues.** You can manually classify individual relationships below.")
 
+                labels['x'].append((drug_x + x) / 2)
 
 
-                    
 
+                labels['y'].append((drug_y + y) / 2)
 
 
-                    st.subheader(f"💊 Comprehensive Details for {selected_drug}")
 
+                labels['text'].append(truncate_mechanism_label(mechanism))
 
 
-                    
 
+                labels['hover'].append(f'<b>Mechanism:</b> {mechanism}<br><b>Effect:</b> {priority}<br><b>Confidence:</b> {confidence:.0%}')
 
 
-                    # Basic Drug Information
 
 
 
-                    st.markdown("### 📊 **Basic Information**")
 
+        add_grouped_edge_traces(traces, edge_traces, ring_x, ring_y, glow=show_glow)
 
 
-                    col1, col2, col3 = st.columns(3)
 
+        if labels['x']:
 
 
-                    with col1:
 
+            # Enhanced background for text readability
 
 
-                        st.metric("Name", drug_details['drug_info']['name'])
 
+            traces.append(go.Scattergl(
 
 
-                        st.metric("Development Phase", drug_details['drug_info']['phase'] or 'N/A')
 
+                x=labels['x'], y=labels['y'],
 
 
-                    with col2:
 
+                mode='markers',
 
 
-                        st.metric("Disease Area", drug_details['drug_info']['disease_area'] or 'N/A')
 
+                marker=dict(size=50, color='rgba(255,255,255,0.95)', opacity=0.9, 
 
 
-                        st.metric("Purity", drug_details['drug_info']['purity'] or 'N/A')
 
+                           line=dict(color=EFFECT_STYLES['Primary/On-Target'][0], width=2)),
 
 
-                    with col3:
 
+                showlegend=False,
 
 
-                        st.metric("Vendor", drug_details['drug_info']['vendor'] or 'N/A')
 
+                hoverinfo='skip'
 
 
-                        st.metric("Indication", drug_details['drug_info']['indication'] or 'N/A')
 
+            ))
 
 
-                    
 
+            traces.append(go.Scattergl(
 
 
-                    # Mechanism of Action
 
+                x=labels['x'], y=labels['y'],
 
 
-                    st.markdown("### 🔬 **Mechanism of Action (MOA)**")
 
+                mode='text',
 
 
-                    moa = drug_details['drug_info']['moa'] or 'Not specified'
 
+                text=labels['text'],
 
 
-                    st.info(f"**{moa}**")
 
+                customdata=labels['hover'],
 
 
-                    
 
+                textfont=dict(size=11, color='black'),
 
 
-                    # Add clickable button to search for other drugs with same MOA
 
-                    if moa != 'Not specified':
+                textposition='middle center',
 
-                        if st.button(f"🔍 **Find Other Drugs with MOA: {moa}**", key=f"search_moa_{moa}_{selected_drug}"):
 
-                            # Store the MOA to search in session state
 
-                            st.session_state.moa_to_search = moa
+                showlegend=False,
 
-                            st.session_state.switch_to_moa_analysis = True
 
-                            st.rerun()
 
-                    
+                hovertemplate='%{customdata}<extra></extra>'
 
-                    # Chemical Structure
 
 
+            ))
 
-                    if drug_details['drug_info']['smiles'] and drug_details['drug_info']['smiles'] != 'N/A':
 
 
+    else:
 
-                        st.markdown("### 🧪 **Chemical Structure**")
+        # Target-centered view: create edges from target to drugs
 
+        target_x, target_y = 0, 0  # Target is at center
 
+        for i, (x, y, drug, ring_type) in enumerate(drug_positions):
 
-                        
+            # Get drug info
 
+            drug_info = drug_info_by_name.get(drug, {})
 
+            moa = drug_info.get('moa', 'Unknown')
 
-                        # Show SMILES notation
+            phase = drug_info.get('phase', 'Unknown')
 
+            
 
+            # Get mechanism info for this drug-target pair
 
-                        st.markdown("#### 📝 SMILES Notation")
+            mech_info = ring_mechanisms.get(drug) or {}
 
-                        st.code(drug_details['drug_info']['smiles'], language='text')
+            
 
-                        st.caption("SMILES notation - textual representation of the molecular structure")
+            # Extract classification results
 
+            mechanism = mech_info.get('mechanism', 'Under Analysis')
 
+            if not mechanism or mechanism.strip() == '':
 
-                        
+                mechanism = 'Under Analysis'
 
+            rel_type = mech_info.get('relationship_type', 'Unclassified')
 
+            confidence = mech_info.get('confidence', 0)
 
-                        # 3D Molecular Visualization
+            
 
+            # Simple classification based on phase and mechanism
 
+            edge_color, edge_width, priority, node_color, glow_color = EFFECT_STYLES.get(rel_type, DEFAULT_EFFECT_STYLE)
 
-                        st.markdown("#### 🌐 **Interactive 3D Molecular Structure**")
+            
 
+            # Enhanced hover information
 
+            hover_fields = [drug, moa, phase, float(confidence or 0)]
 
-                        
+            
 
+            # Collect the glow and main line segments for this effect type
 
 
-                        try:
 
+            group = edge_traces.get(priority)
 
+            if group is None:
 
-                            # Try to create 3D visualization
+                group = edge_traces[priority] = {'color': edge_color, 'width': edge_width, 'glow': glow_color, 'index': [], 'customdata': [],
 
+                                                 'hovertemplate': DRUG_EDGE_HOVER.format(color=edge_color, priority=priority)}
 
 
-                            smiles = drug_details['drug_info']['smiles']
 
+            group['index'].append(i)
 
 
-                            
 
+            group['customdata'].append(hover_fields)
 
 
-                            # Check if RDKit is available
 
+        add_grouped_edge_traces(traces, edge_traces, ring_x, ring_y, glow=show_glow)
 
+        
 
-                            if RDKIT_AVAILABLE:
 
 
+    # Enhanced VIVID nodes with dramatic glow effects
 
-                                try:
+    # Initialize annotations list for both views
 
+    annotations = []
 
+    
 
-                                    # Debug: Show the SMILES string
+    if center_node == selected_drug:
 
+        # Drug-centered view: show target nodes
 
+        
 
-                                    st.info(f"🔍 **Raw SMILES:** `{smiles[:100]}...`" if len(smiles) > 100 else f"🔍 **Raw SMILES:** `{smiles}`")
+        ring_nodes = {'x': [], 'y': [], 'color': [], 'border': [], 'glow': [], 'customdata': []}
 
+        for x, y, target, ring_type in target_positions:
 
+            # Drug-centered view: use target_mechanisms as before
 
-                                    
+            mech_info = target_mechanisms.get(target, {})
 
+            rel_type = mech_info.get('relationship_type', 'Unclassified')
 
+            mechanism = mech_info.get('mechanism', 'Under Analysis')
 
-                                    # Clean and process SMILES string
+            if not mechanism or mechanism.strip() == '':
 
+                mechanism = 'Under Analysis'
 
+            confidence = float(mech_info.get('confidence', 0) or 0)
 
-                                    # Handle multiple SMILES separated by commas
+            # Clean color scheme matching edges
 
+            node_color, border_color, glow_color = NODE_STYLES.get(rel_type, DEFAULT_NODE_STYLE)
 
+            # Collect the node; every target is drawn by the same glow + marker trace pair
 
-                                    smiles_list = [s.strip() for s in smiles.split(',') if s.strip()]
+            ring_nodes['x'].append(x)
 
+            ring_nodes['y'].append(y)
 
+            ring_nodes['color'].append(node_color)
 
-                                    
+            ring_nodes['border'].append(border_color)
 
+            ring_nodes['glow'].append(glow_color)
 
+            ring_nodes['customdata'].append([target, rel_type, mechanism, confidence, mech_info.get('target_class', 'Unknown')])
 
-                                    # Try each SMILES until one works
+        if len(target_positions) > MAX_ANNOTATED_NODES:
 
+            # Large rings: draw the labels as WebGL text on the node trace instead of one SVG annotation each
 
+            add_ring_node_traces(traces, ring_nodes, TARGET_NODE_HOVER, glow=show_glow,
 
-                                    mol = None
+                                 text=[target.upper() for _, _, target, _ in target_positions],
 
+                                 textposition='middle center',
 
+                                 textfont=dict(size=12, color='white'))
 
-                                    working_smiles = None
+        else:
 
+            add_ring_node_traces(traces, ring_nodes, TARGET_NODE_HOVER, glow=show_glow)
 
+            # One label per target, all sharing the same font dict
 
-                                    
+            label_font = dict(size=14, color='white')
 
+            annotations = [dict(x=x, y=y, text=target.upper(), showarrow=False, font=label_font,
 
+                                bgcolor='rgba(0,0,0,0.7)', bordercolor='white', borderwidth=1, xref='x', yref='y')
 
-                                    for i, single_smiles in enumerate(smiles_list):
+                           for x, y, target, _ in target_positions]
 
 
 
-                                        # Clean the SMILES string
 
+        # Add all annotations at once after the loop
 
+        # MOVED OUTSIDE LOOP - this was the bug!
 
-                                        cleaned_smiles = single_smiles.replace('-3', '3').replace('-2', '2').replace('-1', '1')
+        
 
+        # Store annotations to be added in the final layout update
 
+        # (Don't call update_layout here - it gets overwritten later)
 
-                                        
+    else:
 
+        # Target-centered view: show drug nodes around the target
 
+        ring_nodes = {'x': [], 'y': [], 'color': [], 'border': [], 'glow': [], 'customdata': []}
 
-                                        try:
+        for x, y, drug, ring_type in drug_positions:
 
+            # Get drug info
 
+            drug_info = drug_info_by_name.get(drug, {})
 
-                                            test_mol = Chem.MolFromSmiles(cleaned_smiles)
+            moa = drug_info.get('moa', 'Unknown')
 
+            phase = drug_info.get('phase', 'Unknown')
 
+            # Get mechanism info for this drug-target pair
 
-                                            if test_mol is not None:
+            mech_info = ring_mechanisms.get(drug)
 
+            if not mech_info:
 
+                # If not cached, use a simple classification based on drug info
 
-                                                mol = test_mol
+                rel_type = PHASE_FALLBACK_RELATIONSHIPS.get(phase, 'Unclassified')
 
+            else:
 
+                rel_type = mech_info.get('relationship_type', 'Unclassified')
 
-                                                working_smiles = cleaned_smiles
+            # Color scheme for drugs
 
+            node_color, border_color, glow_color = NODE_STYLES.get(rel_type, DEFAULT_NODE_STYLE)
 
+            # Collect the node; every drug is drawn by the same glow + marker trace pair
 
-                                                st.success(f"✅ **Using SMILES #{i+1}:** `{working_smiles}`")
+            ring_nodes['x'].append(x)
 
+            ring_nodes['y'].append(y)
 
+            ring_nodes['color'].append(node_color)
 
-                                                break
+            ring_nodes['border'].append(border_color)
 
+            ring_nodes['glow'].append(glow_color)
 
+            ring_nodes['customdata'].append([drug, border_color, moa, phase, rel_type])
 
-                                        except:
+        add_ring_node_traces(traces, ring_nodes, DRUG_NODE_HOVER, glow=show_glow,
 
+                             text=[drug for _, _, drug, _ in drug_positions],
 
+                             textposition='middle center',
 
-                                            continue
+                             textfont=dict(size=12, color='white'))
 
 
 
-                                    
 
+        # Central target node
 
+        target_hover = f"""
 
-                                    if mol is None:
+        <b style="font-size:22px; color:#FF1493">{center_node}</b><br>
 
+        <b>Total Drugs:</b> <span style="color:gold">{len(network_drugs)}</span><br>
 
+        <b>Target Type:</b> <span style="color:lightgreen">Protein</span>
 
-                                        st.warning(f"⚠️ Tried {len(smiles_list)} SMILES variants, none could be parsed")
+        """
 
+        
 
+        # Target node subtle glow effect
 
-                                        # Show all the SMILES that were tried
+        traces.append(go.Scattergl(
 
+            x=[target_x], y=[target_y],
 
+            mode='markers',
 
-                                        st.markdown("##### 🔍 See all SMILES variants tried")
+            marker=dict(size=85, color='rgba(231, 76, 60, 0.3)', opacity=0.5),
 
-                                        for i, s in enumerate(smiles_list):
+            showlegend=False,
 
-                                            st.code(f"{i+1}. {s}")
+            hoverinfo='skip'
 
+        ))
 
+        
 
-                                    
+        # Main target node
 
+        traces.append(go.Scattergl(
 
+            x=[target_x], y=[target_y],
 
-                                    # Continue with the working molecule
+            mode='markers+text',
 
+            marker=dict(size=70, color='#E74C3C',  # Red for target
 
+                       line=dict(color='#C0392B', width=4),
 
-                                    if mol is not None:
+                       opacity=0.9),
 
+            text=[center_node.upper()],
 
+            textposition='middle center',
 
-                                        # Add hydrogens and generate 3D coordinates
+            textfont=dict(size=14, color='white'),
 
+            name='🎯 Target',
 
+            showlegend=True,
 
-                                        mol = Chem.AddHs(mol)
+            hovertemplate=target_hover + '<extra></extra>',
 
+            hoverinfo='text'
 
+        ))
 
-                                        AllChem.EmbedMolecule(mol, randomSeed=42)
 
 
+    # Enhanced CENTRAL drug node with MASSIVE dramatic effect (only for drug-centered view)
 
-                                        AllChem.MMFFOptimizeMolecule(mol)
+    if center_node == selected_drug:
 
+        drug_hover = f"""
 
+        <b style="font-size:22px; color:#FF1493">{selected_drug}</b><br>
 
-                                        
+        <b>Total Targets:</b> <span style="color:gold">{len(targets)}</span><br>
 
+        <b>MOA:</b> <span style="color:lightgreen">{drug_info.get('moa', 'Unknown')}</span><br>
 
+        <b>Indication:</b> <span style="color:lightblue">{drug_info.get('indication', 'Unknown')}</span>
 
-                                        # Create 3D visualization
+        """
 
+        
 
+        # Drug node subtle glow effect - single layer
 
-                                        st.info("🔬 Rotate, zoom, and explore the 3D molecular structure below:")
+        traces.append(go.Scattergl(
 
+            x=[drug_x], y=[drug_y],
 
+            mode='markers',
 
-                                        
+            marker=dict(size=85, color='rgba(52, 152, 219, 0.3)', opacity=0.5),
 
+            showlegend=False,
 
+            hoverinfo='skip'
 
-                                        # Convert to mol block for 3D display
+        ))
 
 
 
-                                        mol_block = Chem.MolToMolBlock(mol)
+        # Main drug node - prominent but not overwhelming
 
+        traces.append(go.Scattergl(
 
+            x=[drug_x], y=[drug_y],
 
-                                        
+            mode='markers+text',
 
+            marker=dict(size=70, color='#3498DB',  # Professional blue
 
+                       line=dict(color='#2980B9', width=4),  # Darker blue border
 
-                                        # Display 3D molecule using py3Dmol directly
+                       opacity=0.9),
 
+            text=[selected_drug.upper()],
 
+            textposition='middle center',
 
-                                        try:
+            textfont=dict(size=14, color='white'),
 
+            name='💊 Drug',
 
+            showlegend=True,
 
-                                            import py3Dmol
+            hovertemplate=drug_hover + '<extra></extra>',
 
+            hoverinfo='text'
 
+        ))
 
-                                            
 
 
+    # Clean, professional layout
 
-                                            # Create enhanced 3D viewer with labels
+    # Include annotations in the final layout update
 
+    layout_kwargs = {
 
+        'title': dict(
 
-                                            view = py3Dmol.view(width=600, height=400)
+            text=f"Drug-Target Network: {selected_drug}",
 
+            font=dict(size=20, color='#2C3E50'),
 
+            x=0.5
 
-                                            view.addModel(mol_block, 'mol')
+        ),
 
+        'height': 700,  # Reasonable size
 
+        'font': dict(family='system-ui, -apple-system, Arial, sans-serif'),  # One family for every trace and label
 
-                                            
+        # Pick only the nearest point within a short radius; dense rings skip hover picking entirely
 
+        'hovermode': 'closest' if len(ring_x) <= MAX_HOVER_NODES else False,
 
+        'hoverdistance': 20,
 
-                                            # Enhanced styling with labels and colors
+        'showlegend': True,
 
+        'legend': dict(
 
+            x=0.02, y=0.98,
 
-                                            view.setStyle({
+            bgcolor='rgba(255,255,255,0.95)',
 
+            bordercolor='#BDC3C7',
 
+            borderwidth=1,
 
-                                                'stick': {
+            font=dict(size=12, color='#2C3E50')
 
+        ),
 
+        'plot_bgcolor': '#F8F9FA',  # Light gray background
 
-                                                    'colorscheme': 'default',
+        'paper_bgcolor': 'white',  # White paper
 
+        'margin': dict(l=50, r=50, t=80, b=50),
 
+        'xaxis': dict(
 
-                                                    'radius': 0.15
+            showgrid=False,
 
+            zeroline=False, 
 
+            showticklabels=False,
 
-                                                },
+            range=[-12, 12],  # Appropriate range
 
+            scaleratio=1
 
+        ),
 
-                                                'sphere': {
+        'yaxis': dict(
 
+            showgrid=False,
 
+            zeroline=False, 
 
-                                                    'scale': 0.3,
+            showticklabels=False,
 
+            range=[-10, 10]  # Appropriate range
 
+        )
 
-                                                    'colorscheme': 'default'
+    }
 
+    
 
+    # Add annotations if they exist (for drug-centered view)
 
-                                                }
+    if annotations:
 
+        layout_kwargs['annotations'] = annotations
 
 
-                                            })
 
+    fig = go.Figure(data=traces, layout=layout_kwargs)
 
 
-                                            
 
+    return fig
 
 
-                                            # Add atom labels
 
 
 
-                                            view.addStyle({
 
 
+def show_network_visualization(app):
 
-                                                'stick': {
 
 
+    """Show network visualization"""
 
-                                                    'showNonBondedAsSticks': True,
 
 
+    st.header("🌐 Network Visualization")
 
-                                                    'colorscheme': 'default'
 
 
+    
 
-                                                }
 
 
+    # Add helpful introduction
 
-                                            })
 
 
+    st.markdown("""
 
-                                            
 
 
+    **What is network visualization?** See how drugs and biological targets connect to each other in beautiful interactive graphs.
 
-                                            # Add element labels to atoms
 
 
+    
 
-                                            view.addPropertyLabels('elem', '', {
 
 
+    **What do the colors mean?**
 
-                                                'fontColor': 'black',
 
 
+    - 🔴 **Red nodes** = Drugs (medicines)
 
-                                                'fontSize': 12,
 
 
+    - 🔵 **Blue nodes** = Biological targets (proteins in your body)
 
-                                                'showBackground': False,
 
 
+    - 🟢 **Green nodes** = Related drugs (drugs with similar targets)
 
-                                                'alignment': 'center'
 
 
+    - **Gray lines** = Connections showing "drug targets this protein"
 
-                                            })
 
 
+    
 
-                                            
 
 
+    **How to use:** Enter a drug name below to see its network, or generate a global view of all connections.
 
-                                            view.setBackgroundColor('white')
 
 
+    """)
 
-                                            view.zoomTo()
 
 
+    
 
-                                            
 
 
+    # Network options
 
-                                            # Show in Streamlit
 
 
+    col1, col2 = st.columns(2)
 
-                                            stmol.showmol(view, height=400, width=600)
 
 
+    
 
-                                            
 
 
+    with col1:
 
-                                        except Exception as py3d_error:
 
 
+        st.subheader("🔍 Drug Network Explorer")
 
-                                            # Fallback: try simpler stmol approach
 
 
+        
 
-                                            try:
 
 
+        # Add example buttons for network exploration
 
-                                                stmol.showmol(mol_block, height=400, width=600)
 
 
+        st.write("**Try these examples:**")
 
-                                            except Exception as stmol_error:
 
 
+        col_a, col_b, col_c = st.columns(3)
 
-                                                st.error(f"3D visualization failed: {py3d_error}")
 
 
+        with col_a:
 
-                                                st.info("💡 **Alternative:** Try the demo molecules below or PubChem search")
 
 
+            if st.button("🩹 Aspirin Network", help="See how aspirin connects to targets"):
 
-                                        
 
 
+                st.session_state.network_drug_example = "aspirin"
 
-                                        st.success("✅ 3D structure generated from SMILES data")
 
 
+        with col_b:
 
-                                        st.caption("🖱️ **Controls:** Click and drag to rotate, scroll to zoom, right-click to pan")
 
 
+            if st.button("💊 Morphine Network", help="Explore morphine's target network"):
 
-                                        st.caption("🏷️ **Labels:** Atom symbols shown (C=Carbon, N=Nitrogen, O=Oxygen, etc.)")
 
 
+                st.session_state.network_drug_example = "morphine"
 
-                                        st.caption("🎨 **Colors:** Standard CPK coloring (C=gray, N=blue, O=red, H=white)")
 
 
+        with col_c:
 
-                                        
 
 
+            if st.button("🧬 Insulin Network", help="View insulin's biological connections"):
 
-                                        # Show molecular properties
 
 
+                st.session_state.network_drug_example = "insulin"
 
-                                        mol_weight = Descriptors.MolWt(mol)
 
 
+        
 
-                                        num_atoms = mol.GetNumAtoms()
 
 
+        # Get drug name from input or example
 
-                                        num_bonds = mol.GetNumBonds()
 
 
+        default_network_value = st.session_state.get('network_drug_example', '')
 
-                                        
 
 
+        drug_name = st.text_input("Enter drug name to explore its network:", value=default_network_value, help="Enter any drug name to see how it connects to biological targets")
 
-                                        col1, col2, col3 = st.columns(3)
 
 
+        
 
-                                        with col1:
 
 
+        if drug_name:
 
-                                            st.metric("🧮 Molecular Weight", f"{mol_weight:.2f} g/mol")
 
 
+            # Check if a target was clicked to center the network
 
-                                        with col2:
+            center_key = f'main_drug_network_center_{drug_name}'
 
+            center_node = st.session_state.get(center_key, drug_name)
 
+            
 
-                                            st.metric("⚛️ Number of Atoms", num_atoms)
+            # Debug information
 
+            logger.debug(f"Center key = '{center_key}', Center node = '{center_node}'")
 
 
-                                        with col3:
 
+            if center_node == drug_name:
 
+                # Drug-centered view: show drug in center with its targets
 
-                                            st.metric("🔗 Number of Bonds", num_bonds)
+                network_data = app.get_drug_network(drug_name)
 
+            else:
 
+                # Target-centered view: show target in center with all drugs targeting it
 
-                                        
+                network_data = app.get_target_network(center_node)
 
 
 
-                                    else:
+            if network_data:
 
 
 
-                                        st.warning("⚠️ Could not parse SMILES notation for 3D visualization")
+                if center_node == drug_name:
 
+                    st.success(f"Found network for {drug_name}")
 
+                else:
 
-                                        
+                    st.success(f"Found network for target {center_node}")
 
 
 
-                                        # Offer demo molecules
+                
 
 
 
-                                        st.info("💡 **Try a demo molecule instead:**")
+                # Create network graph using plotly
 
 
 
-                                        demo_molecules = {
+                nodes = network_data['nodes']
 
 
 
-                                            "Aspirin": "CC(=O)OC1=CC=CC=C1C(=O)O",
+                edges = network_data['edges']
 
 
 
-                                            "Caffeine": "CN1C=NC2=C1C(=O)N(C(=O)N2C)C",
+                
 
 
 
-                                            "Morphine": "CN1CC[C@]23c4c5ccc(O)c4O[C@H]2[C@@H](O)C=C[C@H]3[C@H]1C5",
+                # Build (or reuse) the cached figure for this drug/center pair
 
 
 
-                                            "Glucose": "C([C@@H]1[C@H]([C@@H]([C@H]([C@H](O1)O)O)O)O)O",
+                nodes_tuple = tuple((node['label'], node['type']) for node in nodes)
 
 
 
-                                            "Benzene": "c1ccccc1"
+                edges_tuple = tuple((edge['source'], edge['target']) for edge in edges)
 
 
 
-                                        }
+                fig = build_network_figure(drug_name, center_node, nodes_tuple, edges_tuple)
 
 
 
-                                        
+                
 
 
 
-                                        col1, col2, col3 = st.columns(3)
+                st.plotly_chart(fig, width='stretch')
 
+                
 
+                # Add interactive buttons for network reorientation
 
-                                        with col1:
+                if center_node == drug_name:
 
+                    # Drug-centered view: pick a target to center on (one widget instead of a button per node)
 
+                    target_options = [n['label'] for n in nodes if n['type'] == 'target']
 
-                                            if st.button("🧪 Aspirin", key="demo_aspirin"):
+                    if target_options:
 
+                        with st.form(key=f"center_target_form_{drug_name}"):
 
+                            choice = st.selectbox("🎯 Center the network on target:", target_options)
 
-                                                demo_smiles = demo_molecules["Aspirin"]
+                            if st.form_submit_button("🎯 Center"):
 
+                                st.session_state[f'main_drug_network_center_{drug_name}'] = choice
 
+                                st.rerun()
 
-                                                st.session_state[f'demo_smiles_{selected_drug}'] = demo_smiles
+                    else:
 
+                        st.info("No targets found for this drug")
 
+                else:
 
-                                        with col2:
+                    # Target-centered view: pick a drug to center on
 
+                    st.markdown(f"**🎯 Currently centered on: {center_node}**")
 
+                    drug_options = [n['label'] for n in nodes if n['type'] == 'drug']
 
-                                            if st.button("☕ Caffeine", key="demo_caffeine"):
+                    if drug_options:
 
+                        with st.form(key=f"center_drug_form_{drug_name}"):
 
+                            choice = st.selectbox(
 
-                                                demo_smiles = demo_molecules["Caffeine"]
+                                "💊 Center the network on drug:", drug_options,
 
+                                format_func=lambda d: f"⭐ {d} (Original)" if d == drug_name else d
 
+                            )
 
-                                                st.session_state[f'demo_smiles_{selected_drug}'] = demo_smiles
+                            if st.form_submit_button("💊 Center"):
 
+                                st.session_state[f'main_drug_network_center_{drug_name}'] = choice
 
+                                st.rerun()
 
-                                        with col3:
+                    else:
 
+                        st.info("No drugs found for this target")
 
+                
 
-                                            if st.button("💊 Morphine", key="demo_morphine"):
+                # Add reset button
 
+                reset_text = "🔄 Reset to Drug Center" if center_node != drug_name else "🔄 Reset Network"
 
+                if st.button(reset_text, key=f"reset_main_network_{drug_name}"):
 
-                                                demo_smiles = demo_molecules["Morphine"]
+                    if f'main_drug_network_center_{drug_name}' in st.session_state:
 
+                        del st.session_state[f'main_drug_network_center_{drug_name}']
 
+                    st.success("🔄 Reset to drug center")
 
-                                                st.session_state[f'demo_smiles_{selected_drug}'] = demo_smiles
+                    st.rerun()
 
 
 
-                                        
+                # Show network statistics
 
 
 
-                                        # Check if demo molecule was selected
+                st.subheader("📊 Network Statistics")
 
 
 
-                                        if f'demo_smiles_{selected_drug}' in st.session_state:
+                type_counts = Counter(n['type'] for n in nodes)
 
 
 
-                                            demo_smiles = st.session_state[f'demo_smiles_{selected_drug}']
+                col1, col2, col3 = st.columns(3)
 
 
 
-                                            st.success(f"🧪 **Displaying demo molecule structure**")
+                
 
 
 
-                                            
+                with col1:
 
 
 
-                                            try:
+                    st.metric("Total Nodes", len(nodes))
 
 
 
-                                                demo_mol = Chem.MolFromSmiles(demo_smiles)
+                with col2:
 
 
 
-                                                if demo_mol is not None:
+                    st.metric("Total Edges", len(edges))
 
 
 
-                                                    demo_mol = Chem.AddHs(demo_mol)
+                with col3:
 
 
 
-                                                    AllChem.EmbedMolecule(demo_mol, randomSeed=42)
+                    st.metric("Targets", type_counts['target'])
 
 
 
-                                                    AllChem.MMFFOptimizeMolecule(demo_mol)
+    
 
 
 
-                                                    
+    with col2:
 
 
 
-                                                    demo_mol_block = Chem.MolToMolBlock(demo_mol)
+        st.subheader("🌍 Global Network Overview")
 
 
 
-                                                    
+        st.write("View the overall drug-target network structure")
 
 
 
-                                                    # Display demo molecule
+        
 
 
 
-                                                    try:
+        if st.button("Generate Global Network"):
 
 
 
-                                                        import py3Dmol
+            with st.spinner("Generating network visualization..."):
 
 
 
-                                                        
+                layout = load_precomputed_layout("global_100", app.database)
 
 
 
-                                                        # Create enhanced 3D viewer for demo
+                network_data = layout or cached_network_data(app, app.connection_key, 100)
 
 
 
-                                                        demo_view = py3Dmol.view(width=600, height=400)
+                if network_data and len(network_data['nodes']) < 2:
 
 
 
-                                                        demo_view.addModel(demo_mol_block, 'mol')
+                    # Nothing to lay out; skip the layout and figure work
 
 
 
-                                                        
+                    st.info("Network too small to visualize")
 
 
 
-                                                        # Enhanced styling with labels for demo
+                elif network_data:
 
 
 
-                                                        demo_view.setStyle({
+                    st.success("Network generated successfully!")
 
 
 
-                                                            'stick': {
+                    
 
 
 
-                                                                'colorscheme': 'default',
+                    # Create a simplified network visualization
 
 
 
-                                                                'radius': 0.15
+                    nodes = network_data['nodes']
 
 
 
-                                                            },
+                    edges = network_data['edges']
 
 
 
-                                                            'sphere': {
+                    
 
 
 
-                                                                'scale': 0.3,
+                    # Use the precomputed layout when shipped, otherwise run the force-directed layout
 
 
 
-                                                                'colorscheme': 'default'
+                    if layout:
 
 
 
-                                                            }
+                        pos_arr = np.array([(node['x'], node['y']) for node in nodes], dtype=np.float32)
 
 
 
-                                                        })
+                    else:
 
 
 
-                                                        
+                        pos_arr = cached_spring_layout(
 
 
 
-                                                        # Add element labels to demo molecule
+                            tuple(node['id'] for node in nodes),
 
 
 
-                                                        demo_view.addPropertyLabels('elem', '', {
+                            tuple((edge['source'], edge['target']) for edge in edges)
 
 
 
-                                                            'fontColor': 'black',
+                        )
 
 
 
-                                                            'fontSize': 12,
+                    
 
 
 
-                                                            'showBackground': False,
+                    # Create plotly visualization (node ids are positions in `nodes`)
 
 
 
-                                                            'alignment': 'center'
+                    edge_src = np.fromiter((edge['source'] for edge in edges), dtype=np.int32, count=len(edges))
 
 
 
-                                                        })
+                    edge_dst = np.fromiter((edge['target'] for edge in edges), dtype=np.int32, count=len(edges))
 
 
 
-                                                        
+                    edge_x = edge_segments(pos_arr[:, 0], edge_src, edge_dst)
 
 
 
-                                                        demo_view.setBackgroundColor('white')
+                    edge_y = edge_segments(pos_arr[:, 1], edge_src, edge_dst)
 
 
 
-                                                        demo_view.zoomTo()
+                    
 
 
 
-                                                        
+                    node_x = pos_arr[:, 0]
 
 
 
-                                                        # Show in Streamlit
+                    node_y = pos_arr[:, 1]
 
 
 
-                                                        stmol.showmol(demo_view, height=400, width=600)
+                    node_text = [f"{node['label']}<br>Type: {node['type']}" for node in nodes]
 
 
 
-                                                        
+                    node_color = ['red' if node['type'] == 'drug' else 'blue' for node in nodes]
 
 
 
-                                                    except Exception:
+                    
 
 
 
-                                                        # Fallback for demo
+                    fig = go.Figure()
 
 
 
-                                                        try:
+                    
 
 
 
-                                                            stmol.showmol(demo_mol_block, height=400, width=600)
+                    # Add edges
 
 
 
-                                                        except Exception as e:
+                    fig.add_trace(go.Scattergl(
 
 
 
-                                                            st.error(f"Demo visualization failed: {e}")
+                        x=edge_x, y=edge_y,
 
 
 
-                                                    
+                        line=dict(width=0.5, color='#888'),
 
 
 
-                                                    st.caption("🖱️ **Controls:** Click and drag to rotate, scroll to zoom")
+                        hoverinfo='none',
 
 
 
-                                                    st.caption("📝 This is a demo molecule for visualization purposes")
+                        mode='lines'))
 
 
 
-                                            except Exception as e:
+                    
 
 
 
-                                                st.error(f"Demo molecule error: {e}")
+                    # Add nodes
 
 
 
-                                        
+                    fig.add_trace(go.Scattergl(
 
 
 
-                                except Exception as e:
+                        x=node_x, y=node_y,
 
 
 
-                                    st.error(f"❌ Error generating 3D structure: {str(e)}")
+                        mode='markers',
 
 
 
-                            else:
+                        hoverinfo='text',
 
 
 
-                                st.warning(f"📦 3D visualization libraries not available: {RDKIT_ERROR}")
+                        text=node_text,
 
 
 
-                                st.info("💡 **To enable 3D structures:** pip install rdkit-pypi stmol")
+                        marker=dict(
 
 
 
-                        
+                            size=8,
 
 
 
-                        except Exception as e:
+                            color=node_color,
 
 
 
-                            st.warning(f"Chemical structure visualization not available: {e}")
+                            line=dict(width=1, color='white')
 
 
 
-                    else:
+                        )
 
 
 
-                        st.info("🧪 **Chemical structure data not available** in local database")
+                    ))
 
 
 
-                        
+                    
 
 
 
-                        # Try to fetch from PubChem as fallback
+                    fig.update_layout(
 
 
 
-                        st.markdown("#### 🌐 **Try PubChem Lookup**")
+                        title="Global Drug-Target Network",
 
 
 
-                        if st.button("🔍 Search PubChem for 3D Structure", key=f"pubchem_{selected_drug}"):
+                        showlegend=False,
 
 
 
-                            try:
+                        hovermode='closest',
 
 
 
-                                import requests
+                        margin=dict(b=20,l=5,r=5,t=40),
 
 
 
-                                import time
+                        xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
 
 
 
-                                
+                        yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
 
 
 
-                                with st.spinner(f"Searching PubChem for {selected_drug}..."):
+                        height=600
 
 
 
-                                    # Search PubChem for the drug name
+                    )
 
 
 
-                                    search_url = f"https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound/name/{selected_drug}/property/IsomericSMILES/JSON"
+                    
 
 
 
-                                    
+                    st.session_state['global_network_fig'] = fig.to_json()
 
 
 
-                                    response = requests.get(search_url, timeout=10)
+                    st.plotly_chart(fig, width='stretch')
 
 
 
-                                    
+                    # Show network statistics
 
 
 
-                                    if response.status_code == 200:
+                    st.subheader("📊 Global Network Statistics")
 
 
 
-                                        data = response.json()
+                    type_counts = Counter(n['type'] for n in nodes)
 
 
 
-                                        if 'PropertyTable' in data and 'Properties' in data['PropertyTable']:
+                    col1, col2, col3 = st.columns(3)
 
 
 
-                                            smiles = data['PropertyTable']['Properties'][0]['IsomericSMILES']
+                    with col1:
 
 
 
-                                            
+                        st.metric("Drug Nodes", type_counts['drug'])
 
 
 
-                                            st.success(f"✅ Found structure for {selected_drug} in PubChem!")
+                    with col2:
 
 
 
-                                            st.code(smiles, language='text')
+                        st.metric("Target Nodes", type_counts['target'])
 
 
 
-                                            st.caption("SMILES from PubChem database")
+                    with col3:
 
 
 
-                                            
+                        st.metric("Total Edges", len(edges))
 
 
 
-                                            # Try to create 3D visualization with PubChem SMILES
+        elif 'global_network_fig' in st.session_state:
 
 
 
-                                            if RDKIT_AVAILABLE:
+            # Unrelated rerun: show the last generated figure without rebuilding it
 
 
 
-                                                try:
+            st.plotly_chart(pio.from_json(st.session_state['global_network_fig']), width='stretch')
 
 
 
-                                                    mol = Chem.MolFromSmiles(smiles)
 
 
 
-                                                    if mol is not None:
 
+def show_3d_network_visualization(app):
 
 
-                                                        mol = Chem.AddHs(mol)
 
+    """Show 3D network visualization"""
 
 
-                                                        AllChem.EmbedMolecule(mol, randomSeed=42)
 
+    st.header("🎨 3D Network Visualization")
 
 
-                                                        AllChem.MMFFOptimizeMolecule(mol)
 
+    
 
 
-                                                        
 
+    # Add helpful introduction
 
 
-                                                        st.info("🔬 3D structure from PubChem data:")
 
+    st.markdown("""
 
 
-                                                        mol_block = Chem.MolToMolBlock(mol)
 
+    **What is 3D network visualization?** Experience drug-target relationships in immersive 3D space!
 
 
-                                                        
 
+    
 
 
-                                                        # Display PubChem molecule
 
+    **How to interact with 3D networks:**
 
 
-                                                        try:
 
+    - 🖱️ **Click and drag** to rotate the view
 
 
-                                                            import py3Dmol
 
+    - 🔍 **Mouse wheel** to zoom in and out
 
 
-                                                            
 
+    - 👆 **Right-click and drag** to pan around
 
 
-                                                            # Create enhanced 3D viewer for PubChem data
 
+    - 🖱️ **Double-click** to reset the view
 
 
-                                                            pubchem_view = py3Dmol.view(width=600, height=400)
 
+    
 
 
-                                                            pubchem_view.addModel(mol_block, 'mol')
 
+    **What you'll see:**
 
 
-                                                            
 
+    - 🔴 **Red diamonds** = Drugs positioned in outer sphere
 
 
-                                                            # Enhanced styling with labels for PubChem
 
+    - 🔵 **Blue circles** = Biological targets in inner sphere
 
 
-                                                            pubchem_view.setStyle({
 
+    - **Gray lines** = Connections between drugs and targets
 
 
-                                                                'stick': {
 
+    """)
 
 
-                                                                    'colorscheme': 'default',
 
+    
 
 
-                                                                    'radius': 0.15
 
+    # 3D Network Options
 
 
-                                                                },
 
+    col1, col2 = st.columns(2)
 
 
-                                                                'sphere': {
 
+    
 
 
-                                                                    'scale': 0.3,
 
+    with col1:
 
 
-                                                                    'colorscheme': 'default'
 
+        st.subheader("🔧 3D Network Settings")
 
 
-                                                                }
 
+        network_size = st.slider("Network Size", min_value=10, max_value=100, value=30, 
 
 
-                                                            })
 
+                                help="Number of nodes to display (larger = more complex)")
 
 
-                                                            
 
+        
 
 
-                                                            # Add element labels to PubChem molecule
 
+        fig_key = f"network_3d_fig_{network_size}"
 
 
-                                                            pubchem_view.addPropertyLabels('elem', '', {
 
+        if st.button("🎨 Generate 3D Network", type="primary"):
 
 
-                                                                'fontColor': 'black',
 
+            with st.spinner("Creating 3D network visualization..."):
 
 
-                                                                'fontSize': 12,
 
+                network_data = (load_precomputed_3d_network(network_size, app.database)
 
 
-                                                                'showBackground': False,
 
+                                or cached_3d_network_data(app, app.connection_key, network_size))
 
 
-                                                                'alignment': 'center'
 
+                if network_data and len(network_data['labels']) < 2:
 
 
-                                                            })
 
+                    # Nothing to lay out; skip the 3D figure work
 
 
-                                                            
 
+                    st.info("Network too small to visualize")
 
 
-                                                            pubchem_view.setBackgroundColor('white')
 
+                elif network_data:
 
 
-                                                            pubchem_view.zoomTo()
 
+                    st.success("3D Network generated successfully!")
 
 
-                                                            
 
+                    
 
 
-                                                            # Show in Streamlit
 
+                    # Create 3D scatter plot from the column arrays
 
 
-                                                            stmol.showmol(pubchem_view, height=400, width=600)
 
+                    xs = network_data['x']
 
 
-                                                            
 
+                    ys = network_data['y']
 
 
-                                                        except Exception:
 
+                    zs = network_data['z']
 
 
-                                                            # Fallback for PubChem
 
+                    labels = network_data['labels']
 
 
-                                                            stmol.showmol(mol_block, height=400, width=600)
 
+                    types = network_data['types']
 
 
-                                                        
 
+                    edges_src = network_data['edges_src']
 
 
-                                                        st.caption("🖱️ **Controls:** Click and drag to rotate, scroll to zoom")
 
+                    edges_dst = network_data['edges_dst']
 
 
-                                                        
 
+                    n_nodes = len(labels)
 
 
-                                                except Exception as e:
 
+                    n_edges = len(edges_src)
 
 
-                                                    st.warning(f"Could not generate 3D structure: {e}")
 
+                    
 
 
-                                            else:
 
+                    # Drug/target flag drives the per-point marker styling
 
 
-                                                st.warning("RDKit not available for 3D visualization")
 
+                    is_drug = np.fromiter((t == 'drug' for t in types), dtype=bool, count=n_nodes)
 
 
-                                        else:
 
+                    
 
 
-                                            st.warning(f"❌ No structure found for '{selected_drug}' in PubChem")
 
+                    # Only the most connected nodes get a visible label; all nodes keep hover text
 
 
-                                    else:
 
+                    degree = np.bincount(np.concatenate([edges_src, edges_dst]), minlength=n_nodes)
 
 
-                                        st.warning(f"❌ PubChem search failed (Status: {response.status_code})")
 
+                    is_labelled = np.zeros(n_nodes, dtype=bool)
 
 
-                                        
 
+                    is_labelled[np.argsort(-degree, kind='stable')[:MAX_3D_LABELS]] = True
 
 
-                            except requests.exceptions.Timeout:
 
+                    
 
 
-                                st.error("⏱️ PubChem request timed out. Try again later.")
 
+                    # Create 3D plot
 
 
-                            except requests.exceptions.RequestException as e:
 
+                    fig = go.Figure()
 
 
-                                st.error(f"🌐 Network error: {e}")
 
+                    
 
 
-                            except Exception as e:
 
+                    # Add all nodes as one trace: drugs are red diamonds, targets blue circles
 
 
-                                st.error(f"❌ Error searching PubChem: {e}")
 
+                    if n_nodes:
 
 
-                        
 
+                        fig.add_trace(go.Scatter3d(
 
 
-                        st.caption("💡 **Tip:** PubChem is a free chemistry database with millions of compound structures")
 
+                            x=xs,
 
 
-                    
 
+                            y=ys,
 
 
-                    # Biological Targets with Mechanism Classification
 
+                            z=zs,
 
 
-                    st.markdown("### 🎯 **Biological Targets & Mechanisms**")
 
+                            mode='markers+text',
 
 
-                    if drug_details.get('targets'):
 
+                            showlegend=False,
 
 
-                        st.success(f"This drug targets **{len(drug_details['targets'])} biological proteins/receptors**:")
 
+                            text=[label if show else '' for label, show in zip(labels, is_labelled)],
 
 
-                        
 
+                            textposition='middle center',
 
 
-                        # Check if classifier is available
 
+                            textfont=dict(size=8),
 
 
-                        if app.classifier:
 
+                            hovertext=labels,
 
 
-                            # Count classified vs unclassified targets
 
+                            hoverinfo='text',
 
 
-                            classified_count = 0
 
+                            marker=dict(
 
 
-                            for target in drug_details['targets']:
 
+                                size=np.where(is_drug, 8, 6),
 
 
-                                existing = app.classifier.get_existing_classification(selected_drug, target)
 
+                                color=np.where(is_drug, 'red', 'blue').tolist(),
 
 
-                                if existing and existing.get('classified', False):
 
+                                symbol=np.where(is_drug, 'diamond', 'circle').tolist(),
 
 
-                                    classified_count += 1
 
+                                line=dict(width=1, color='white')
 
 
-                
 
+                            )
 
 
-                if classified_count == len(drug_details['targets']):
 
+                        ))
 
 
-                    st.success(f"🔬 **All {classified_count} targets have been classified!** Detailed mechanism insights available below.")
 
+                        # Legend-only entries, so drugs and targets keep their own legend items
 
 
-                elif classified_count > 0:
 
+                        for legend_name, legend_color, legend_symbol in (('Drugs', 'red', 'diamond'), ('Targets', 'blue', 'circle')):
 
 
-                    st.info(f"🔬 **{classified_count}/{len(drug_details['targets'])} targets classified** - Remaining targets can be manually classified using buttons below.")
 
+                            fig.add_trace(go.Scatter3d(
 
 
-                    
 
+                                x=[None],
 
 
-                    # Option to classify remaining targets
 
+                                y=[None],
 
 
-                    remaining_count = len(drug_details['targets']) - classified_count
 
+                                z=[None],
 
 
-                    if remaining_count > 0 and st.button(f"🚀 Classify All {remaining_count} Remaining Targets", type="secondary"):
 
+                                mode='markers',
 
 
-                        with st.spinner(f"Classifying {remaining_count} remaining targets..."):
 
+                                name=legend_name,
 
 
-                            batch_count = 0
 
+                                hoverinfo='skip',
 
 
-                            for target in drug_details['targets']:
 
+                                marker=dict(size=6, color=legend_color, symbol=legend_symbol)
 
 
-                                existing = app.classifier.get_existing_classification(selected_drug, target)
 
+                            ))
 
 
-                                if not existing or not existing.get('classified', False):
 
+                    
 
 
-                                    try:
 
+                    # Add edges (connections); NaN separators break the line between edges
 
 
-                                        classification = app.get_drug_target_classification(selected_drug, target)
 
+                    edge_x = edge_segments(xs, edges_src, edges_dst)
 
 
-                                        if classification:
 
+                    edge_y = edge_segments(ys, edges_src, edges_dst)
 
 
-                                            batch_count += 1
 
+                    edge_z = edge_segments(zs, edges_src, edges_dst)
 
 
-                                    except Exception as e:
 
+                    
 
 
-                                        logger.warning(f"Batch classification failed for {selected_drug} → {target}: {e}")
 
+                    fig.add_trace(go.Scatter3d(
 
 
-                            
 
+                        x=edge_x, y=edge_y, z=edge_z,
 
 
-                            if batch_count > 0:
 
+                        mode='lines',
 
 
-                                st.success(f"✅ Successfully classified {batch_count} additional targets!")
 
+                        name='Connections',
 
 
-                                st.rerun()  # Refresh to show updated classifications
 
+                        line=dict(width=1, color='rgba(128,128,128,0.6)'),
 
 
-                else:
 
+                        hoverinfo='none'
 
 
-                    st.info("🔬 **Mechanism classifications available** - Use 'Classify Mechanism' buttons for detailed insights")
 
+                    ))
 
 
-            
 
+                    
 
 
-            # Display targets with expanders for clean organization
 
-            st.markdown("### 🎯 **Biological Targets**")
+                    # Update layout for 3D
 
-            st.info("💡 **Click on any target name to see detailed information about that protein/receptor**")
 
-            
 
-            # Show targets in expandable sections
+                    fig.update_layout(
 
-            for target in drug_details['targets']:
 
 
+                        title=f"3D Drug-Target Network ({n_nodes} nodes, {n_edges} connections)",
 
-                # Check if target has classification
 
-                has_classification = False
 
-                if app.classifier:
+                        scene=dict(
 
-                    existing_classification = app.classifier.get_existing_classification(selected_drug, target)
 
-                    has_classification = existing_classification is not None
 
-                
+                            xaxis_title="X",
 
-                # Create expander with status indicator
 
-                status_icon = "✅" if has_classification else "⏳"
 
-                with st.expander(f"{status_icon} **{target}** - Click for details"):
+                            yaxis_title="Y", 
 
-                    
 
-                    col1, col2 = st.columns([2, 1])
 
+                            zaxis_title="Z",
 
 
-                    
 
+                            camera=dict(
 
 
-                    with col1:
 
+                                eye=dict(x=1.5, y=1.5, z=1.5)
 
 
-                        st.markdown(f"**Target:** {target}")
 
+                            )
 
 
-                        
 
+                        ),
 
 
-                        # Add inline target details display
 
-                        if st.button(f"🔍 **Show Drugs Targeting {target}**", key=f"show_target_drugs_{target}_{selected_drug}"):
+                        height=700,
 
-                            # Show drugs targeting this target inline
 
-                            with st.spinner(f"Loading drugs targeting {target}..."):
 
-                                try:
+                        showlegend=True
 
-                                    target_details = app.get_target_details(target)
 
-                                    if target_details and target_details['drugs']:
 
-                                        st.markdown(f"**🎯 Drugs Targeting {target}:**")
+                    )
 
-                                        
 
-                                        # Create a nice display of drugs targeting this target
 
-                                        drugs_data = []
+                    
 
-                                        for drug in target_details['drugs'][:10]:  # Show top 10
 
-                                            drugs_data.append({
 
-                                                'Drug Name': drug['drug_name'],
+                    st.session_state[fig_key] = fig.to_json()
 
-                                                'MOA': drug['drug_moa'] or 'Not specified',
 
-                                                'Phase': drug['drug_phase'] or 'Unknown',
 
-                                                'Classified': '✅ Yes' if drug['is_classified'] else '⏳ No'
+                    st.plotly_chart(fig, width='stretch')
 
-                                            })
 
-                                        
 
-                                        if drugs_data:
+                    # Network statistics
 
-                                            drugs_df = pd.DataFrame(drugs_data)
 
-                                            
 
-                                            # Add custom CSS for better table visibility
+                    st.subheader("📊 3D Network Statistics")
 
-                                            st.markdown("""
 
-                                            <style>
 
-                                            .drug-table {
+                    type_counts = Counter(types)
 
-                                                background-color: #f8f9fa;
 
-                                                border: 1px solid #dee2e6;
 
-                                                border-radius: 5px;
+                    col1, col2, col3, col4 = st.columns(4)
 
-                                                padding: 10px;
 
-                                                margin: 10px 0;
 
-                                            }
+                    
 
-                                            .drug-table th {
 
-                                                background-color: #007bff;
 
-                                                color: white;
+                    with col1:
 
-                                                padding: 8px;
 
-                                                text-align: left;
 
-                                            }
+                        st.metric("Total Nodes", n_nodes)
 
-                                            .drug-table td {
 
-                                                padding: 8px;
 
-                                                border-bottom: 1px solid #dee2e6;
+                    with col2:
 
-                                            }
 
-                                            </style>
 
-                                            """, unsafe_allow_html=True)
+                        st.metric("Total Edges", n_edges)
 
-                                            
 
-                                            # Use st.table for better visibility
 
-                                            st.markdown("**📋 Table View:**")
+                    with col3:
 
-                                            st.table(drugs_df)
 
-                                            
 
-                                            # Alternative markdown display for better visibility
+                        st.metric("Drug Nodes", type_counts['drug'])
 
-                                            st.markdown("**📝 List View:**")
 
-                                            for i, drug in enumerate(drugs_data, 1):
 
-                                                st.markdown(f"**{i}.** **{drug['Drug Name']}** - {drug['MOA']} - {drug['Phase']} - {drug['Classified']}")
+                    with col4:
 
-                                            
 
-                                            # Add network visualization
 
-                                            st.markdown("**🕸️ Network Visualization:**")
+                        st.metric("Target Nodes", type_counts['target'])
 
-                                            try:
 
-                                                # Create a simple network graph
 
-                                                import networkx as nx
+                    
 
-                                                import plotly.graph_objects as go
 
-                                                
 
-                                                # Create network graph
+                    # Interactive exploration
 
-                                                G = nx.Graph()
 
-                                                
 
-                                                # Add target as central node
+                    st.subheader("🔍 Interactive 3D Exploration")
 
-                                                G.add_node(target, node_type='target', size=20, color='red')
 
-                                                
 
-                                                # Add drugs as nodes
+                    st.write("""
 
-                                                for drug in drugs_data:
 
-                                                    drug_name = drug['Drug Name']
 
-                                                    G.add_node(drug_name, node_type='drug', size=15, color='blue')
+                    **How to use the 3D visualization:**
 
-                                                    G.add_edge(target, drug_name)
 
-                                                
 
-                                                # Get positions
+                    - **Rotate:** Click and drag to rotate the view
 
-                                                pos = nx.spring_layout(G, k=3, iterations=50)
 
-                                                
 
-                                                # Create plotly figure
+                    - **Zoom:** Use mouse wheel to zoom in/out
 
-                                                fig = go.Figure()
 
-                                                
 
-                                                # Add edges
+                    - **Pan:** Right-click and drag to pan
 
-                                                for edge in G.edges():
 
-                                                    x0, y0 = pos[edge[0]]
 
-                                                    x1, y1 = pos[edge[1]]
+                    - **Hover:** Hover over nodes to see labels
 
-                                                    fig.add_trace(go.Scatter(
 
-                                                        x=[x0, x1, None],
 
-                                                        y=[y0, y1, None],
+                    - **Double-click:** Reset the view
 
-                                                        mode='lines',
 
-                                                        line=dict(color='gray', width=2),
 
-                                                        hoverinfo='none',
+                    """)
 
-                                                        showlegend=False
 
-                                                    ))
 
-                                                
+                else:
 
-                                                # Add nodes
 
-                                                for node in G.nodes():
 
-                                                    x, y = pos[node]
+                    st.error("Failed to generate 3D network data.")
 
-                                                    node_type = G.nodes[node]['node_type']
 
-                                                    color = 'red' if node_type == 'target' else 'blue'
 
-                                                    size = 20 if node_type == 'target' else 15
+        elif fig_key in st.session_state:
 
-                                                    
 
-                                                    fig.add_trace(go.Scatter(
 
-                                                        x=[x],
+            # Unrelated rerun: show the last generated figure without rebuilding it
 
-                                                        y=[y],
 
-                                                        mode='markers+text',
 
-                                                        marker=dict(size=size, color=color),
+            st.plotly_chart(pio.from_json(st.session_state[fig_key]), width='stretch')
 
-                                                        text=node,
 
-                                                        textposition="middle center",
 
-                                                        textfont=dict(size=10, color='white'),
+    
 
-                                                        hoverinfo='text',
 
-                                                        hovertext=f"{node} ({node_type})",
 
-                                                        showlegend=False
+    with col2:
 
-                                                    ))
 
-                                                
 
-                                                # Update layout
+        st.subheader("🎯 3D Network Features")
+
+
+
+        st.markdown("""
+
+
+
+        **🌟 What's New in 3D:**
+
+
+
+        
+
+
+
+        - **🌍 Immersive 3D Space** - Explore networks in three dimensions
+
+
+
+        - **🎨 Interactive Controls** - Rotate, zoom, and pan freely
+
+
+
+        - **🔍 Enhanced Visibility** - Better node separation and clarity
+
+
+
+        - **📊 Spatial Relationships** - See how drugs and targets relate spatially
+
+
+
+        - **⚡ Performance Optimized** - Smooth rendering even with large networks
+
+
+
+        
+
+
+
+        **💡 Use Cases:**
+
+
+
+        - **Research Presentations** - Impressive 3D visualizations for demos
+
+
+
+        - **Network Analysis** - Better understanding of complex relationships
+
+
+
+        - **Drug Discovery** - Spatial insights into target interactions
+
+
+
+        - **Educational Purposes** - Engaging way to learn about drug networks
+
+
+
+        """)
+
+
+
+        
+
+
+
+        # Quick 3D demo
+
+
+
+        st.subheader("🚀 Quick 3D Demo")
+
+
+
+        if st.button("🎬 Show 3D Demo", type="secondary"):
+
+
+
+            st.info("🎨 3D visualization is ready! Use the controls on the left to generate your own 3D network.")
+
+
+
+            
+
+
+
+            # Show sample 3D data structure
+
+
+
+            st.code("""
+
+
+
+# Sample 3D Network Data Structure (one entry per node / edge in each column)
+
+
+
+{
+
+
+
+    'x': array([2.0, 1.0]),          # 3D X coordinates (float32)
+
+
+
+    'y': array([0.0, 0.1]),          # 3D Y coordinates (float32)
+
+
+
+    'z': array([0.5, -0.2]),         # 3D Z coordinates (float32)
+
+
+
+    'labels': ['Drug Name', 'Target Name'],
+
+
+
+    'types': ['drug', 'target'],
+
+
+
+    'edges_src': array([0]),         # Source node index (int32)
+
+
+
+    'edges_dst': array([1])          # Target node index (int32)
+
+
+
+}
+
+
+
+            """, language="python")
+
+
+
+
+
+
+
+def show_drug_search(app):
+
+
+
+    """Show drug search interface"""
+
+
+
+    st.header("🔍 Drug Search")
+
+
+
+    
+
+    # Initialize drug_details to None to avoid UnboundLocalError
+
+    drug_details = None
+
+    
+
+
+
+    # Add helpful introduction
+
+
+
+    st.markdown("""
+
+
+
+    **What can you do here?** Search for any drug to see detailed information about it.
+
+
+
+    
+
+
+
+    **Try these examples:** aspirin, insulin, morphine, ibuprofen, metformin
+
+
+
+    """)
+
+
+
+    
+
+
+
+    # Add example buttons
+
+
+
+    col1, col2, col3, col4 = st.columns(4)
+
+
+
+    with col1:
+
+
+
+        if st.button("Try: Aspirin", help="Search for Aspirin"):
+
+
+
+            st.session_state.search_example = "aspirin"
+
+
+
+    with col2:
+
+
+
+        if st.button("Try: Insulin", help="Search for Insulin"):
+
+
+
+            st.session_state.search_example = "insulin"
+
+
+
+    with col3:
+
+
+
+        if st.button("Try: Morphine", help="Search for Morphine"):
+
+
+
+            st.session_state.search_example = "morphine"
+
+
+
+    with col4:
+
+
+
+        if st.button("Try: Metformin", help="Search for Metformin"):
+
+
+
+            st.session_state.search_example = "metformin"
+
+
+
+    
+
+
+
+    # Get search term from input or example
+
+
+
+    default_value = st.session_state.get('search_example', '')
+
+
+
+    
+
+    search_term = st.text_input("Enter drug name or partial name:", value=default_value, help="You can search for full names or just part of a drug name")
+
+
+
+    # Clear session state if user is searching for a different drug
+
+    if search_term and search_term != st.session_state.get('last_search_term', ''):
+
+        # Clear previous search data when starting a new search
+
+        st.session_state.pop('search_results', None)
+
+        st.session_state.pop('selected_drug', None)
+
+        st.session_state.pop('last_search_term', None)
+
+        st.session_state.pop('search_example', None)  # Clear example too
+
+        # Clear any cached network data
+
+        keys_to_remove = [key for key in st.session_state.keys() if key.startswith('target_network_')]
+
+        for key in keys_to_remove:
+
+            st.session_state.pop(key, None)
+
+    
+
+    # Store search term in session state for persistence across reruns
+
+    if search_term:
+
+        st.session_state['last_search_term'] = search_term
+
+    
+
+    # Use stored search term if current is empty but we have stored results
+
+    if not search_term and 'last_search_term' in st.session_state and 'search_results' in st.session_state:
+
+        search_term = st.session_state['last_search_term']
+
+    
+
+
+
+    if search_term:
+
+
+
+        df = cached_search_df(app, app.connection_key, search_term, 50)
+
+
+
+        results = df.to_dict('records')
+
+
+
+        
+
+
+
+        if results:
+
+
+
+            st.success(f"Found {len(results)} drugs matching '{search_term}'")
+
+
+
+            
+
+
+
+            # Store search results in session state for persistence across reruns
+
+            st.session_state['search_results'] = results
+
+            
+
+            # Streamlit 1.28 requires width as int; use full container width instead
+
+            st.dataframe(df, use_container_width=True)
+
+            
+
+            # Simple summary
+
+            st.info(f"📋 Found {len(results)} drugs. Select one below for detailed information.")
+
+            
+
+
+
+            # Allow user to select a drug for detailed view
+
+            # Use session state to maintain selection across interactions
+
+            # Use session state results if available (for persistence across reruns)
+
+            if 'search_results' in st.session_state:
+
+                drug_options = [r['drug'] for r in st.session_state['search_results']]
+
+            else:
+
+                drug_options = [r['drug'] for r in results]
+
+            
+
+            # Get current selection from session state, or default to first option
+
+            current_selection = st.session_state.get('selected_drug', drug_options[0] if drug_options else '')
+
+            
+
+            # If current selection is not in options, add it
+
+            if current_selection and current_selection not in drug_options:
+
+                # Get drug details to add to options
+
+                drug_details_for_addition = cached_drug_details(app, app.connection_key, current_selection)
+
+                if drug_details_for_addition:
+
+                    new_option = {
+
+                        'drug': current_selection,
+
+                        'moa': drug_details_for_addition.get('moa', 'Unknown'),
+
+                        'phase': drug_details_for_addition.get('phase', 'Unknown')
+
+                    }
+
+                    st.session_state['search_results'].append(new_option)
+
+                    drug_options.append(current_selection)
+
+            
+
+            # Find the index of current selection
+
+            try:
+
+                default_index = drug_options.index(current_selection) if current_selection in drug_options else 0
+
+            except:
+
+                default_index = 0
+
+            
+
+            selected_drug = st.selectbox("Select a drug for detailed view:", drug_options, index=default_index, key="drug_selectbox")
+
+
+
+            # Update session state when selectbox changes
+
+            st.session_state['selected_drug'] = selected_drug
+
+            
+
+
+
+            if selected_drug:
+
+
+
+                # Drug details for the currently selected drug (cached across reruns)
+
+                drug_details = cached_drug_details(app, app.connection_key, selected_drug)
+
+
+
+                if drug_details:
+
+
+
+                    # Auto-classify all drug-target relationships if classifier is available
+
+
+
+                    if app.classifier and drug_details['targets']:
+
+
+
+                        unclassified_targets = []
+
+
+
+                        existing_map = cached_existing_classifications(app.classifier, app.connection_key, selected_drug, tuple(drug_details['targets']), classification_store_version())
+
+
+
+                        for target in drug_details['targets']:
+
+
+
+                            existing = existing_map.get(target)
+
+
+
+                            if not existing or not existing.get('classified', False):
+
+
+
+                                unclassified_targets.append(target)
+
+
+
+                        
+
+
+
+                        if unclassified_targets:
+
+                            # Test API first
+
+                            col1, col2 = st.columns([3, 1])
+
+                            with col2:
+
+                                if st.button("🔧 Test API", help="Test if Gemini API is working"):
+
+                                    with st.spinner("Testing Gemini API..."):
+
+                                        if app.classifier.test_api_connection():
+
+                                            st.success("✅ API is working!")
+
+                                        else:
+
+                                            st.error("❌ API test failed - check logs")
+
+                            
+
+                            with col1:
+
+                                st.info(f"Found {len(unclassified_targets)} unclassified targets")
+
+
+
+                            # Classify ALL targets automatically - no limit
+
+
+
+                            targets_to_classify = unclassified_targets
+
+
+
+                            
+
+
+
+                            st.info(f"🔄 **Auto-classifying ALL {len(targets_to_classify)} drug-target relationships...** This will take about {len(targets_to_classify) * 3} seconds.")
+
+
+
+                            
+
+
+
+                            # Progress bar for classification
+
+
+
+                            progress_bar = st.progress(0)
+
+
+
+                            status_text = st.empty()
+
+
+
+                            
+
+
+
+                            classified_count = 0
+
+                            # Refresh the progress widgets ~20 times in total rather than once per target
+
+                            update_every = max(1, len(targets_to_classify) // 20)
+
+                            def show_progress(done, total, pair):
+
+                                if done % update_every == 0 or done == total:
+
+                                    status_text.text(f"🧬 Analyzing {pair[0]} → {pair[1]}...")
+
+                                    progress_bar.progress(done / total)
+
+                            pairs = [(selected_drug, target) for target in targets_to_classify]
+
+                            for (_, target), classification, error in classify_pairs_concurrently(app, pairs, show_progress):
+
+                                if error:
+
+                                    # Log the error but continue with other classifications
+
+                                    logger.warning(f"Classification failed for {selected_drug} → {target}: {error}")
+
+                                    st.warning(f"⚠️ Error classifying {selected_drug} → {target}: {str(error)}")
+
+                                elif classification:
+
+                                    classified_count += 1
+
+                                else:
+
+                                    st.warning(f"⚠️ Failed to classify {selected_drug} → {target}")
+
+
+
+                            
+
+
+
+                            progress_bar.empty()
+
+
+
+                            status_text.empty()
+
+
+
+                            
+
+
+
+                            if classified_count > 0:
+
+
+
+                                st.success(f"✅ **Successfully classified {classified_count}/{len(targets_to_classify)} relationships!** Complete mechanism analysis available below.")
+
+
+
+                                if classified_count == len(targets_to_classify):
+
+
+
+                                    st.success("🎉 **All classifications completed successfully!**")
+
+
+
+                            else:
+
+
+
+                                st.warning("⚠️ **Auto-classification encountered issues.** You can manually classify individual relationships below.")
+
+
+
+                    
+
+
+
+                    st.subheader(f"💊 Comprehensive Details for {selected_drug}")
+
+
+
+                    
+
+
+
+                    # Basic Drug Information
+
+
+
+                    st.markdown("### 📊 **Basic Information**")
+
+
+
+                    col1, col2, col3 = st.columns(3)
+
+
+
+                    with col1:
+
+
+
+                        st.metric("Name", drug_details['drug_info']['name'])
+
+
+
+                        st.metric("Development Phase", drug_details['drug_info']['phase'] or 'N/A')
+
+
+
+                    with col2:
+
+
+
+                        st.metric("Disease Area", drug_details['drug_info']['disease_area'] or 'N/A')
+
+
+
+                        st.metric("Purity", drug_details['drug_info']['purity'] or 'N/A')
+
+
+
+                    with col3:
+
+
+
+                        st.metric("Vendor", drug_details['drug_info']['vendor'] or 'N/A')
+
+
+
+                        st.metric("Indication", drug_details['drug_info']['indication'] or 'N/A')
+
+
+
+                    
+
+
+
+                    # Mechanism of Action
+
+
+
+                    st.markdown("### 🔬 **Mechanism of Action (MOA)**")
+
+
+
+                    moa = drug_details['drug_info']['moa'] or 'Not specified'
+
+
+
+                    st.info(f"**{moa}**")
+
+
+
+                    
+
+
+
+                    # Add clickable button to search for other drugs with same MOA
+
+                    if moa != 'Not specified':
+
+                        if st.button(f"🔍 **Find Other Drugs with MOA: {moa}**", key=f"search_moa_{moa}_{selected_drug}"):
+
+                            # Store the MOA to search in session state
+
+                            st.session_state.moa_to_search = moa
+
+                            st.session_state.switch_to_moa_analysis = True
+
+                            st.rerun()
+
+                    
+
+                    # Chemical Structure
+
+
+
+                    if drug_details['drug_info']['smiles'] and drug_details['drug_info']['smiles'] != 'N/A':
+
+
+
+                        st.markdown("### 🧪 **Chemical Structure**")
+
+
+
+                        
+
+
+
+                        # Show SMILES notation
+
+
+
+                        st.markdown("#### 📝 SMILES Notation")
+
+                        st.code(drug_details['drug_info']['smiles'], language='text')
+
+                        st.caption("SMILES notation - textual representation of the molecular structure")
+
+
+
+                        
+
+
+
+                        # 3D Molecular Visualization
+
+
+
+                        st.markdown("#### 🌐 **Interactive 3D Molecular Structure**")
+
+
+
+                        
+
+
+
+                        try:
 
-                                                fig.update_layout(
 
-                                                    title=f"Drug-Target Network: {target}",
 
-                                                    showlegend=False,
+                            # Try to create 3D visualization
 
-                                                    hovermode='closest',
 
-                                                    margin=dict(b=20,l=5,r=5,t=40),
 
-                                                    annotations=[ dict(
+                            smiles = drug_details['drug_info']['smiles']
 
-                                                        text="Red: Target, Blue: Drugs",
 
-                                                        showarrow=False,
 
-                                                        xref="paper", yref="paper",
+                            
 
-                                                        x=0.005, y=-0.002,
 
-                                                        xanchor='left', yanchor='bottom',
 
-                                                        font=dict(color='gray', size=12)
+                            # Check if RDKit is available
 
-                                                    )],
 
-                                                    xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
 
-                                                    yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+                            if RDKIT_AVAILABLE:
 
-                                                    height=400
 
-                                                )
 
-                                                
+                                try:
 
-                                                st.plotly_chart(fig, use_container_width=True)
 
-                                                
 
-                                            except Exception as e:
+                                    # Debug: Show the SMILES string
 
-                                                st.info("Network visualization not available (missing dependencies)")
 
-                                            
 
-                                            if len(target_details['drugs']) > 10:
+                                    st.info(f"🔍 **Raw SMILES:** `{smiles[:100]}...`" if len(smiles) > 100 else f"🔍 **Raw SMILES:** `{smiles}`")
 
-                                                st.info(f"Showing top 10 of {len(target_details['drugs'])} drugs targeting {target}")
 
-                                        
 
-                                        # Add classification button for this target
+                                    
 
-                                        unclassified_count = len([d for d in target_details['drugs'] if not d['is_classified']])
 
-                                        if unclassified_count > 0 and app.classifier:
 
-                                            if st.button(f"🔬 Classify All {unclassified_count} Unclassified Drugs for {target}", key=f"classify_all_{target}_{selected_drug}"):
+                                    # Clean and process SMILES string
 
-                                                with st.spinner(f"Classifying {unclassified_count} drugs for {target}..."):
 
-                                                    success_count = 0
 
-                                                    error_count = 0
+                                    # Handle multiple SMILES separated by commas
 
-                                                    
 
-                                                    for drug in target_details['drugs']:
 
-                                                        if not drug['is_classified']:
+                                    smiles_list = [s.strip() for s in smiles.split(',') if s.strip()]
 
-                                                            try:
 
-                                                                classification = app.get_drug_target_classification(drug['drug_name'], target)
 
-                                                                if classification:
+                                    
 
-                                                                    success_count += 1
 
-                                                                else:
 
-                                                                    error_count += 1
+                                    # Parse and embed the first working SMILES (cached per SMILES string)
 
-                                                            except Exception as e:
 
-                                                                error_count += 1
 
-                                                    
+                                    mol_block = None
 
-                                                    st.success(f"✅ Classified {success_count} drugs for {target}")
 
-                                                    if error_count > 0:
 
-                                                        st.warning(f"⚠️ {error_count} drugs failed to classify")
+                                    embedded = smiles_to_mol_block(smiles)
 
-                                    else:
 
-                                        st.info(f"No drugs found targeting {target}")
 
-                                except Exception as e:
+                                    if embedded is not None:
 
-                                    st.error(f"Error loading target details: {e}")
 
-                        
 
-                        # Check for existing classification
+                                        i, working_smiles, (mol_block, mol_weight, num_atoms, num_bonds) = embedded
 
 
 
-                        if app.classifier:
+                                        st.success(f"✅ **Using SMILES #{i+1}:** `{working_smiles}`")
 
 
 
-                            existing_classification = app.classifier.get_existing_classification(selected_drug, target)
+                                    if mol_block is None:
 
 
 
-                            
+                                        st.warning(f"⚠️ Tried {len(smiles_list)} SMILES variants, none could be parsed")
 
 
 
-                            if existing_classification:
+                                        # Show all the SMILES that were tried
 
 
 
-                                st.success("✅ **Classification Available:**")
+                                        st.markdown("##### 🔍 See all SMILES variants tried")
 
+                                        for i, s in enumerate(smiles_list):
 
+                                            st.code(f"{i+1}. {s}")
 
-                                
 
 
+                                    
 
-                                # Display classification in a nice format
 
 
+                                    # Continue with the working molecule
 
-                                col_a, col_b = st.columns(2)
 
 
+                                    if mol_block is not None:
 
-                                with col_a:
 
 
+                                        # Create 3D visualization
 
-                                    st.metric("🔗 Relationship Type", existing_classification['relationship_type'])
 
 
+                                        st.info("🔬 Rotate, zoom, and explore the 3D molecular structure below:")
 
-                                    st.metric("🧬 Target Class", existing_classification['target_class'])
 
 
+                                        
 
-                                with col_b:
 
 
+                                        # Display 3D molecule using py3Dmol directly
 
-                                    st.metric("⚙️ Mechanism", existing_classification['mechanism'])
 
 
+                                        try:
 
-                                    st.metric("🎯 Confidence", f"{existing_classification['confidence']:.1%}")
 
 
+                                            components.html(build_viewer_html(mol_block), height=420, width=620)
 
-                                
 
 
 
-                                st.markdown("**📝 Scientific Reasoning**")
 
-                                st.write(existing_classification['reasoning'])
 
-                                st.caption(f"Source: {existing_classification['source']} | {existing_classification['timestamp'][:10]}")
+                                            
 
-                                
 
-                                # Add feedback mechanism
 
-                                st.markdown("---")
+                                        except Exception as py3d_error:
 
-                                st.markdown("**📝 Is this classification accurate?**")
 
-                                feedback_col1, feedback_col2, feedback_col3 = st.columns([1, 1, 2])
 
-                                
+                                            st.error(f"3D visualization failed: {py3d_error}")
 
-                                with feedback_col1:
 
-                                    if st.button("✅ Correct", key=f"feedback_correct_{selected_drug}_{target}", type="primary"):
 
-                                        # Store positive feedback
+                                            st.info("💡 **Alternative:** Try the demo molecules below or PubChem search")
 
-                                        feedback_key = f"feedback_{selected_drug}_{target}"
 
-                                        if 'classification_feedback' not in st.session_state:
 
-                                            st.session_state['classification_feedback'] = {}
+                                        
 
-                                        feedback_data = {
 
-                                            'drug': selected_drug,
 
-                                            'target': target,
+                                        st.success("✅ 3D structure generated from SMILES data")
 
-                                            'feedback': 'correct',
 
-                                            'timestamp': str(pd.Timestamp.now()),
 
-                                            'user': st.session_state.get('current_user', 'anonymous'),
+                                        st.caption("  \n".join([
 
-                                            'classification': existing_classification
 
-                                        }
 
-                                        st.session_state['classification_feedback'][feedback_key] = feedback_data
+                                            "🖱️ **Controls:** Click and drag to rotate, scroll to zoom, right-click to pan",
 
-                                        # Save to file for analysis
 
-                                        save_feedback_to_file(feedback_data)
 
-                                        st.success("👍 Thank you! Feedback recorded as CORRECT")
+                                            "🏷️ **Labels:** Atom symbols shown (C=Carbon, N=Nitrogen, O=Oxygen, etc.)",
 
-                                
 
-                                with feedback_col2:
 
-                                    if st.button("❌ Incorrect", key=f"feedback_incorrect_{selected_drug}_{target}", type="secondary"):
+                                            "🎨 **Colors:** Standard CPK coloring (C=gray, N=blue, O=red, H=white)"
 
-                                        # Store negative feedback
 
-                                        feedback_key = f"feedback_{selected_drug}_{target}"
 
-                                        if 'classification_feedback' not in st.session_state:
+                                        ]))
 
-                                            st.session_state['classification_feedback'] = {}
 
-                                        feedback_data = {
 
-                                            'drug': selected_drug,
+                                        
 
-                                            'target': target,
 
-                                            'feedback': 'incorrect',
 
-                                            'timestamp': str(pd.Timestamp.now()),
+                                        # Show molecular properties (computed alongside the cached mol block)
 
-                                            'user': st.session_state.get('current_user', 'anonymous'),
 
-                                            'classification': existing_classification
 
-                                        }
+                                        
 
-                                        st.session_state['classification_feedback'][feedback_key] = feedback_data
 
-                                        # Save to file for analysis
 
-                                        save_feedback_to_file(feedback_data)
+                                        col1, col2, col3 = st.columns(3)
 
-                                        st.error("👎 Thank you! Feedback recorded as INCORRECT")
 
-                                
 
-                                with feedback_col3:
+                                        with col1:
 
-                                    # Show current feedback status
 
-                                    feedback_key = f"feedback_{selected_drug}_{target}"
 
-                                    if 'classification_feedback' in st.session_state and feedback_key in st.session_state['classification_feedback']:
+                                            st.metric("🧮 Molecular Weight", f"{mol_weight:.2f} g/mol")
 
-                                        feedback = st.session_state['classification_feedback'][feedback_key]
 
-                                        if feedback['feedback'] == 'correct':
 
-                                            st.success(f"✅ Marked as correct by {feedback['user']}")
+                                        with col2:
+
+
+
+                                            st.metric("⚛️ Number of Atoms", num_atoms)
+
+
+
+                                        with col3:
+
+
+
+                                            st.metric("🔗 Number of Bonds", num_bonds)
+
+
+
+                                        
 
-                                        else:
 
-                                            st.error(f"❌ Marked as incorrect by {feedback['user']}")
 
                                     else:
 
-                                        st.info("⏳ No feedback yet")
 
 
+                                        st.warning("⚠️ Could not parse SMILES notation for 3D visualization")
 
-                            else:
 
 
+                                        
 
-                                st.info("ℹ️ No classification available yet")
 
 
+                                        # Offer demo molecules
 
-                    
 
 
+                                        st.info("💡 **Try a demo molecule instead:**")
 
-                    with col2:
 
 
+                                        
 
-                        if app.classifier:
 
 
+                                        col1, col2, col3 = st.columns(3)
+
+
+
+                                        with col1:
+
+
+
+                                            if st.button("🧪 Aspirin", key="demo_aspirin"):
+
+
+
+                                                demo_smiles = DEMO_MOLECULES["Aspirin"]
+
+
+
+                                                st.session_state[f'demo_smiles_{selected_drug}'] = demo_smiles
+
+
+
+                                        with col2:
+
 
-                            if st.button(f"🔬 Classify Mechanism", key=f"classify_{selected_drug}_{target}"):
 
+                                            if st.button("☕ Caffeine", key="demo_caffeine"):
+
+
+
+                                                demo_smiles = DEMO_MOLECULES["Caffeine"]
+
+
+
+                                                st.session_state[f'demo_smiles_{selected_drug}'] = demo_smiles
+
+
+
+                                        with col3:
+
+
+
+                                            if st.button("💊 Morphine", key="demo_morphine"):
+
+
+
+                                                demo_smiles = DEMO_MOLECULES["Morphine"]
+
+
+
+                                                st.session_state[f'demo_smiles_{selected_drug}'] = demo_smiles
+
+
+
+                                        
+
+
+
+                                        # Check if demo molecule was selected
+
+
+
+                                        if f'demo_smiles_{selected_drug}' in st.session_state:
+
+
+
+                                            demo_smiles = st.session_state[f'demo_smiles_{selected_drug}']
+
+
+
+                                            st.success(f"🧪 **Displaying demo molecule structure**")
+
+
+
+                                            
+
+
+
+                                            try:
+
+
+
+                                                demo_structure = load_demo_structure(demo_smiles)
+
+
+
+                                                if demo_structure is not None:
+
+
+
+                                                    demo_mol_block = demo_structure[0]
+
+
+
+                                                    
 
 
-                                with st.spinner(f"Classifying {selected_drug} → {target}..."):
 
+                                                    # Display demo molecule
 
 
-                                    classification = app.get_drug_target_classification(selected_drug, target)
 
+                                                    try:
 
 
-                                    
 
+                                                        components.html(build_viewer_html(demo_mol_block), height=420, width=620)
 
 
-                                    if classification:
 
 
 
-                                        st.success("✅ Classification completed!")
 
+                                                        
 
 
-                                        st.rerun()  # Refresh to show new classification
 
+                                                    except Exception as e:
 
 
-                                    else:
 
+                                                        st.error(f"Demo visualization failed: {e}")
 
 
-                                        st.error("❌ Classification failed. Check logs for details.")
 
+                                                    
 
 
-                        else:
 
+                                                    st.caption("🖱️ **Controls:** Click and drag to rotate, scroll to zoom  \n"
 
 
-                            st.info("🔧 Set GEMINI_API_KEY to enable classification")
 
+                                                               "📝 This is a demo molecule for visualization purposes")
 
 
-            
 
+                                            except Exception as e:
 
 
-        else:
 
+                                                st.error(f"Demo molecule error: {e}")
 
 
-            st.warning("No biological targets found in database")
 
+                                        
 
 
-                    
 
+                                except Exception as e:
 
 
-        # Only show additional details if drug_details is available
 
+                                    st.error(f"❌ Error generating 3D structure: {str(e)}")
 
 
-        if drug_details:
 
+                            else:
 
 
-            # Disease Areas and Indications
 
+                                st.warning(f"📦 3D visualization libraries not available: {RDKIT_ERROR}")
 
 
-            col1, col2 = st.columns(2)
 
+                                st.info("💡 **To enable 3D structures:** pip install rdkit-pypi stmol")
 
 
-            with col1:
 
+                        
 
 
-                st.markdown("### 🏥 **Disease Areas**")
 
+                        except Exception as e:
 
 
-                if drug_details.get('disease_areas'):
 
+                            st.warning(f"Chemical structure visualization not available: {e}")
 
 
-                    for da in drug_details['disease_areas']:
 
+                    else:
 
 
-                        st.markdown(f"🏥 {da}")
 
+                        st.info("🧪 **Chemical structure data not available** in local database")
 
 
-                else:
 
+                        
 
 
-                    st.info("No specific disease areas listed")
 
+                        # Try to fetch from PubChem as fallback
 
 
-        
 
+                        st.markdown("#### 🌐 **Try PubChem Lookup**")
 
 
-            with col2:
 
+                        if st.button("🔍 Search PubChem for 3D Structure", key=f"pubchem_{selected_drug}"):
 
 
-                st.markdown("### 💊 **Medical Indications**")
 
+                            try:
 
 
-                if drug_details.get('indications'):
 
+                                import requests
 
 
-                    for indication in drug_details['indications']:
 
+                                with st.spinner(f"Searching PubChem for {selected_drug}..."):
 
 
-                        st.markdown(f"💊 {indication}")
 
+                                    # Search PubChem for the drug name
 
 
-                else:
 
+                                    smiles = pubchem_smiles(selected_drug)
 
 
-                    st.info("No specific indications listed")
 
+                                    if smiles:
 
 
-        
 
+                                        
 
 
-            # Vendor Information
 
+                                        st.success(f"✅ Found structure for {selected_drug} in PubChem!")
 
 
-            st.markdown("### 🏪 **Supplier/Vendor Information**")
 
+                                        st.code(smiles, language='text')
 
 
-            if drug_details.get('vendors'):
 
+                                        st.caption("SMILES from PubChem database")
 
 
-                st.info(f"Available from: **{', '.join(drug_details['vendors'])}**")
 
+                                        
 
 
-            else:
 
+                                        # Try to create 3D visualization with PubChem SMILES
 
 
-                st.info("No vendor information available")
 
+                                        if RDKIT_AVAILABLE:
 
 
-                    
 
+                                            try:
 
 
-            # Enhanced Visual Network Graph with Mechanism Labels
 
+                                                structure = smiles_to_3d(smiles)
 
 
-            st.markdown("### 🌐 Drug-Target Network")
 
+                                                if structure is not None:
 
 
-            if drug_details.get('targets'):
 
+                                                    st.info("🔬 3D structure from PubChem data:")
 
 
-                col_net1, col_net2 = st.columns([3, 1])
 
+                                                    mol_block = structure[0]
 
 
-                with col_net1:
 
+                                                    
 
 
-                    st.info("🎯 **How to read:** Green = Primary effects, Orange = Side effects, Gray = Under analysis. Hover over nodes for details.")
 
+                                                    # Display PubChem molecule
 
 
-                with col_net2:
 
+                                                    try:
 
 
-                    if st.button("🔄 Refresh", help="Reload network data"):
 
+                                                        components.html(build_viewer_html(mol_block), height=420, width=620)
 
 
-                        st.rerun()
 
 
 
-            
 
+                                                        
 
 
-            # Get comprehensive mechanism information for each target
 
+                                                    except Exception as e:
 
 
-            target_mechanisms = {}
 
+                                                        st.error(f"3D visualization failed: {e}")
 
 
-            classification_summary = {
 
+                                                    
 
 
-                'Primary/On-Target': 0,
 
+                                                    st.caption("🖱️ **Controls:** Click and drag to rotate, scroll to zoom")
 
 
-                'Secondary/Off-Target': 0, 
 
+                                                    
 
 
-                'Unknown': 0,
 
+                                            except Exception as e:
 
 
-                'Unclassified': 0
 
+                                                st.warning(f"Could not generate 3D structure: {e}")
 
 
-            }
 
+                                        else:
 
 
-            
 
+                                            st.warning("RDKit not available for 3D visualization")
 
 
-            if app.classifier:
 
+                                    else:
 
 
-                for target in drug_details['targets']:
 
+                                        st.warning(f"❌ No structure found for '{selected_drug}' in PubChem")
 
 
-                    # Use the same method as target expanders for consistency
 
 
 
-                    classification = app.classifier.get_existing_classification(selected_drug, target)
 
+                                        
 
 
-                    
 
+                            except requests.exceptions.Timeout:
 
 
-                    if classification:  # If any classification exists, it means it's classified
 
+                                st.error("⏱️ PubChem request timed out. Try again later.")
 
 
-                        target_mechanisms[target] = {
 
+                            except requests.exceptions.RequestException as e:
 
 
-                            'mechanism': classification.get('mechanism', 'Under Analysis') or 'Under Analysis',
 
+                                st.error(f"🌐 Network error: {e}")
 
 
-                            'relationship_type': classification.get('relationship_type', 'Unknown'),
 
+                            except Exception as e:
 
 
-                            'target_class': classification.get('target_class', 'Unknown'),
 
+                                st.error(f"❌ Error searching PubChem: {e}")
 
 
-                            'target_subclass': classification.get('target_subclass', 'Unknown'),
 
+                        
 
 
-                            'confidence': classification.get('confidence', 0),
 
+                        st.caption("💡 **Tip:** PubChem is a free chemistry database with millions of compound structures")
 
 
-                            'reasoning': classification.get('reasoning', 'No reasoning provided'),
 
+                    
 
 
-                            'classified': True  # If we have classification data, it's classified
 
+                    # Biological Targets with Mechanism Classification
 
 
-                        }
 
+                    st.markdown("### 🎯 **Biological Targets & Mechanisms**")
 
 
-                        rel_type = classification.get('relationship_type', 'Unknown')
 
+                    if drug_details.get('targets'):
 
 
-                        if rel_type in classification_summary:
 
+                        st.success(f"This drug targets **{len(drug_details['targets'])} biological proteins/receptors**:")
 
 
-                            classification_summary[rel_type] += 1
 
+                        
 
 
-                        else:
 
+                        # Check if classifier is available
 
 
-                            classification_summary['Unknown'] += 1
 
+                        if app.classifier:
 
 
-                    else:
 
+                            # Count classified vs unclassified targets
 
 
-                        target_mechanisms[target] = {
 
+                            existing_map = cached_existing_classifications(app.classifier, app.connection_key, selected_drug, tuple(drug_details['targets']), classification_store_version())
 
 
-                            'mechanism': 'Under Analysis',
 
+                            classified_count = sum(1 for existing in existing_map.values() if existing.get('classified', False))
 
 
-                            'relationship_type': 'Unclassified',
 
+                
 
 
-                            'target_class': 'Unknown',
 
+                if classified_count == len(drug_details['targets']):
 
 
-                            'target_subclass': 'Unknown',
 
+                    st.success(f"🔬 **All {classified_count} targets have been classified!** Detailed mechanism insights available below.")
 
 
-                            'confidence': 0,
 
+                elif classified_count > 0:
 
 
-                            'reasoning': 'Target not yet analyzed by AI classifier',
 
+                    st.info(f"🔬 **{classified_count}/{len(drug_details['targets'])} targets classified** - Remaining targets can be manually classified using buttons below.")
 
 
-                            'classified': False
 
+                    
 
 
-                        }
 
+                    # Option to classify remaining targets
 
 
-                        classification_summary['Unclassified'] += 1
 
+                    remaining_count = len(drug_details['targets']) - classified_count
 
 
-            
 
+                    if remaining_count > 0 and st.button(f"🚀 Classify All {remaining_count} Remaining Targets", type="secondary"):
 
 
-            # Show classification summary
 
+                        with st.spinner(f"Classifying {remaining_count} remaining targets..."):
 
 
-            col1, col2, col3, col4 = st.columns(4)
 
+                            batch_count = 0
 
 
-            with col1:
 
+                            # existing_map was loaded for the counts above and is re-read on every
 
 
-                st.metric("🟢 Primary Effects", classification_summary['Primary/On-Target'])
 
+                            # rerun, so an interrupted batch resumes from what is already stored
 
 
-            with col2:
 
+                            pending = [t for t in drug_details['targets'] if not existing_map.get(t, {}).get('classified', False)]
 
 
-                st.metric("🟠 Secondary Effects", classification_summary['Secondary/Off-Target'])
 
+                            progress_bar = st.progress(0)
 
 
-            with col3:
 
+                            pairs = [(selected_drug, target) for target in pending]
 
 
-                st.metric("⚪ Unknown Type", classification_summary['Unknown'])
 
+                            for (_, target), classification, error in classify_pairs_concurrently(
 
 
-            with col4:
 
+                                    app, pairs, lambda done, total, pair: progress_bar.progress(done / total)):
 
 
-                st.metric("⚫ Unclassified", classification_summary['Unclassified'])
 
+                                if error:
 
 
-            
 
+                                    logger.warning(f"Batch classification failed for {selected_drug} → {target}: {error}")
 
 
-            # Create enhanced 3D-style network visualization
 
+                                elif classification:
 
 
-            import plotly.graph_objects as go
 
+                                    batch_count += 1
 
 
-            import math
 
+                            progress_bar.empty()
 
 
-            import numpy as np
 
+                            
 
 
-            
 
+                            if batch_count > 0:
 
 
-            # Interactive network with reorientation capability
 
-            # Check if a target was clicked to center the network
+                                st.success(f"✅ Successfully classified {batch_count} additional targets!")
 
-            center_key = f'interactive_network_center_{selected_drug}'
 
-            center_node = st.session_state.get(center_key, selected_drug)
-            
-            # Get network data for vis.js visualization (works for drug-centered view)
-            visjs_network_data = None
-            if center_node == selected_drug:
-                # Get network data for the selected drug
-                cache_key_visjs = f"drug_network_visjs_{selected_drug}"
-                if cache_key_visjs in st.session_state:
-                    visjs_network_data = st.session_state[cache_key_visjs]
-                else:
-                    visjs_network_data = app.get_drug_network(selected_drug)
-                    if visjs_network_data:
-                        st.session_state[cache_key_visjs] = visjs_network_data
 
-            
+                                st.rerun()  # Refresh to show updated classifications
 
-            # Store original selected drug for fallback
 
-            if 'original_selected_drug' not in st.session_state:
 
-                st.session_state['original_selected_drug'] = selected_drug
+                else:
 
-            
 
-            # Start background classification for all targets (only if not already cached)
 
-            uncached_targets = [t for t in drug_details['targets'] if not app.is_cached(selected_drug, t)]
+                    st.info("🔬 **Mechanism classifications available** - Use 'Classify Mechanism' buttons for detailed insights")
 
-            if uncached_targets:
 
-                app.background_classify_targets(selected_drug, uncached_targets)
 
             
 
-            if center_node == selected_drug:
 
-                # Drug-centered view: show drug in center with its targets
 
-                targets = drug_details['targets']  # Show ALL targets
+            # Display targets with expanders for clean organization
 
-                network_data = None
+            st.markdown("### 🎯 **Biological Targets**")
 
-            else:
+            st.info("💡 **Click on any target name to see detailed information about that protein/receptor**")
 
-                # Check if center_node is a drug (from target-centered view drug selection)
+            
 
-                # First get network_data if we don't have it
+            # Show targets in expandable sections
 
-                if 'network_data' not in locals() or network_data is None:
+            existing_map = cached_existing_classifications(app.classifier, app.connection_key, selected_drug, tuple(drug_details['targets']), classification_store_version()) if app.classifier else {}
 
-                    cache_key = f"target_network_{center_node}"
+            for target in drug_details['targets']:
 
-                    if cache_key in st.session_state:
 
-                        network_data = st.session_state[cache_key]
 
-                    else:
+                # Check if target has classification
 
-                        network_data = app.get_target_network_data(center_node)
+                has_classification = False
 
-                        if network_data:
+                if app.classifier:
 
-                            st.session_state[cache_key] = network_data
+                    existing_classification = existing_map.get(target)
 
-                
+                    has_classification = existing_classification is not None
 
                 
 
-                if network_data and center_node in [d['drug'] for d in network_data.get('drugs', [])]:
-
-                    # Switch to drug-centered view for the selected drug
-
-                    new_selected_drug = center_node
-
-                    # Get drug details for the new selected drug
+                # Create expander with status indicator
 
-                    new_drug_details = app.get_drug_details(new_selected_drug)
 
-                    if new_drug_details:
 
-                        # Update session state to reflect the new drug
+                status_icon = "✅" if has_classification else "⏳"
 
-                        st.session_state['selected_drug'] = new_selected_drug
 
-                        # Update the center key to point to the new drug
 
-                        st.session_state[center_key] = new_selected_drug
+                # Streamlit cannot tell us whether an expander is open, so the body is only built once
 
-                        
 
-                        # Add the new drug to search results if not already present
 
-                        if 'search_results' in st.session_state:
+                # the user loads it; the flag keeps that target's expander open on later reruns
 
-                            existing_drugs = [r['drug'] for r in st.session_state['search_results']]
 
-                            if new_selected_drug not in existing_drugs:
 
-                                # Add the new drug to search results
+                open_key = f"target_details_open_{target}_{selected_drug}"
 
-                                new_drug_result = {
 
-                                    'drug': new_selected_drug,
 
-                                    'moa': new_drug_details.get('moa', 'Unknown'),
+                with st.expander(f"{status_icon} **{target}** - Click for details", expanded=st.session_state.get(open_key, False)):
 
-                                    'phase': new_drug_details.get('phase', 'Unknown')
 
-                                }
 
-                                st.session_state['search_results'].append(new_drug_result)
+                    if not st.session_state.get(open_key, False):
 
-                        
 
-                        # Update local variables
 
-                        selected_drug = new_selected_drug
+                        st.button("📂 Load target details", key=f"load_{open_key}", on_click=st.session_state.__setitem__, args=(open_key, True))
 
-                        drug_details = new_drug_details
 
-                        targets = drug_details['targets']
 
-                        center_node = new_selected_drug
+                        continue
 
-                        network_data = None
 
-                        # Show success message
 
-                        st.success(f"🔄 Switched to drug-centered view for **{new_selected_drug}**")
+                    col1, col2 = st.columns([2, 1])
 
-                        # Don't rerun - let the UI naturally update
 
-                    else:
 
-                        # Fallback to original drug
+                    
 
-                        selected_drug = st.session_state.get('original_selected_drug', selected_drug)
 
-                        targets = drug_details['targets']
 
-                        network_data = None
+                    with col1:
 
-                else:
 
-                    # Target-centered view: show target in center with all drugs targeting it
 
-                    # Use cached network data for faster reorientation
+                        st.markdown(f"**Target:** {target}")
 
-                    cache_key = f"target_network_{center_node}"
 
-                    if cache_key in st.session_state:
 
-                        network_data = st.session_state[cache_key]
+                        
 
-                    else:
 
-                        network_data = app.get_target_network_data(center_node)
 
-                        if network_data:
+                        # Add inline target details display
 
-                            st.session_state[cache_key] = network_data
+                        if st.button(f"🔍 **Show Drugs Targeting {target}**", key=f"show_target_drugs_{target}_{selected_drug}"):
 
-                    
+                            # Show drugs targeting this target inline
 
-                    if network_data:
+                            with st.spinner(f"Loading drugs targeting {target}..."):
 
-                        targets = [center_node]  # The centered target
+                                try:
 
-                        
+                                    target_details = cached_target_details(app, app.connection_key, target, classification_store_version(), drug_limit=10)
 
-                        # Populate target_mechanisms for target-centered view
+                                    if target_details and target_details['drugs']:
 
-                        # In target-centered view, we need to get the mechanism for the specific drug being hovered
+                                        st.markdown(f"**🎯 Drugs Targeting {target}:**")
 
-                        # This will be populated in the hover logic based on the selected drug
+                                        
 
-                        target_mechanisms = {}
+                                        # Create a nice display of drugs targeting this target
 
-                    else:
+                                        names, moas, phases, classified = [], [], [], []
 
-                        targets = drug_details['targets']  # Fallback to drug view
+                                        for drug in target_details['drugs']:  # Top 10, limited in the query
 
-                        center_node = selected_drug
+                                            names.append(drug['drug_name'])
 
-                    st.session_state[center_key] = selected_drug
+                                            moas.append(drug['drug_moa'] or 'Not specified')
 
+                                            phases.append(drug['drug_phase'] or 'Unknown')
 
+                                            classified.append('✅ Yes' if drug['is_classified'] else '⏳ No')
 
-            if targets:
+                                        if names:
 
+                                            drugs_df = pd.DataFrame({'Drug Name': names, 'MOA': moas, 'Phase': phases, 'Classified': classified})
 
+                                            
 
-                # Enhanced layout algorithm based on classification types
 
-                if center_node == selected_drug:
 
-                    # Drug-centered view: position targets around drug
+                                            
 
-                    drug_x, drug_y = 0, 0
+                                            # Arrow-backed grid; Streamlit renders it client-side
 
-                    target_positions = []
+                                            st.markdown("**📋 Table View:**")
 
-                    
+                                            st.dataframe(drugs_df, hide_index=True, use_container_width=True, column_config={'Classified': st.column_config.TextColumn(width='small')})
 
-                    # Group targets by classification type for intelligent positioning
+                                            
 
-                    primary_targets = []
+                                            # Alternative markdown display for better visibility
 
-                    secondary_targets = []
+                                            st.markdown("**📝 List View:**")
 
-                    unknown_targets = []
+                                            st.markdown("  \n".join(
 
-                    unclassified_targets = []
 
-                    
 
-                    for target in targets:
+                                                f"**{i}.** **{name}** - {moa} - {phase} - {status}"
 
-                        mech_info = target_mechanisms.get(target, {})
 
-                        rel_type = mech_info.get('relationship_type', 'Unclassified')
 
-                        
+                                                for i, (name, moa, phase, status) in enumerate(zip(names, moas, phases, classified), 1)
 
-                        if rel_type == 'Primary/On-Target':
 
-                            primary_targets.append(target)
 
-                        elif rel_type == 'Secondary/Off-Target':
+                                            ))
 
-                            secondary_targets.append(target)
+                                            
 
-                        elif rel_type == 'Unknown':
+                                            # Add network visualization
 
-                            unknown_targets.append(target)
+                                            st.markdown("**🕸️ Network Visualization:**")
 
-                        else:
+                                            try:
 
-                            unclassified_targets.append(target)
+                                                # The graph is a star (one target, its drugs, no drug-drug edges), so
 
-                    
+                                                # place the target at the origin and the drugs evenly on the unit circle
 
-                    # Group all targets by type for intelligent positioning
+                                                theta = np.linspace(0, 2 * np.pi, len(names), endpoint=False)
 
-                    all_target_groups = [
+                                                drug_x = np.cos(theta).tolist()
 
-                        (primary_targets, 'primary'),
+                                                drug_y = np.sin(theta).tolist()
 
-                        (secondary_targets, 'secondary'), 
+                                                # Create plotly figure
 
-                        (unknown_targets, 'unknown'),
+                                                fig = go.Figure()
 
-                        (unclassified_targets, 'unclassified')
+                                                # Add edges as a single trace (None breaks the line between segments)
 
-                    ]
+                                                edge_x = [v for x in drug_x for v in (0.0, x, None)]
 
-                    
+                                                edge_y = [v for y in drug_y for v in (0.0, y, None)]
 
-                    # Calculate dramatic circular layout for maximum visual impact
+                                                fig.add_trace(go.Scattergl(
 
-                    total_targets = len(targets)
+                                                    x=edge_x,
 
+                                                    y=edge_y,
 
+                                                    mode='lines',
 
-                    if total_targets <= 8:
+                                                    line=dict(color='gray', width=2),
 
-                        # Single ring layout for few targets
+                                                    hoverinfo='skip',
 
-                        radius = 6
+                                                    showlegend=False
 
-                    else:
+                                                ))
 
-                        # Multi-ring layout for many targets
+                                                # Add nodes as a single trace: the target first, then its drugs
 
-                        inner_radius = 5
+                                                fig.add_trace(go.Scattergl(
 
-                        outer_radius = 9
+                                                    x=[0.0] + drug_x,
 
-                        targets_per_ring = min(10, total_targets // 2)
+                                                    y=[0.0] + drug_y,
 
+                                                    mode='markers+text',
 
+                                                    marker=dict(size=[20] + [15] * len(names), color=['red'] + ['blue'] * len(names)),
 
-                    target_index = 0
+                                                    text=[target] + names,
 
+                                                    textposition="middle center",
 
+                                                    textfont=dict(size=10, color='white'),
 
-                    for target_group, group_type in all_target_groups:
+                                                    hoverinfo='text',
 
-                        for target in target_group:
+                                                    hovertext=[f"{target} (target)"] + [f"{name} (drug)" for name in names],
 
-                            if total_targets <= 8:
+                                                    showlegend=False
 
-                                # Single ring layout
+                                                ))
 
-                                angle = 2 * math.pi * target_index / total_targets
+                                                
 
-                                x = radius * math.cos(angle)
+                                                # Update layout
 
-                                y = radius * math.sin(angle)
+                                                fig.update_layout(
 
-                            else:
+                                                    title=f"Drug-Target Network: {target}",
 
-                                # Multi-ring layout
+                                                    showlegend=False,
 
-                                if target_index < targets_per_ring:
+                                                    hovermode='closest',
 
-                                    # Inner ring
+                                                    margin=dict(b=20,l=5,r=5,t=40),
 
-                                    angle = 2 * math.pi * target_index / targets_per_ring
+                                                    annotations=[ dict(
 
-                                    x = inner_radius * math.cos(angle)
+                                                        text="Red: Target, Blue: Drugs",
 
-                                    y = inner_radius * math.sin(angle)
+                                                        showarrow=False,
 
-                                else:
+                                                        xref="paper", yref="paper",
 
-                                    # Outer ring
+                                                        x=0.005, y=-0.002,
 
-                                    outer_index = target_index - targets_per_ring
+                                                        xanchor='left', yanchor='bottom',
 
-                                    remaining_targets = total_targets - targets_per_ring
+                                                        font=dict(color='gray', size=12)
 
-                                    angle = 2 * math.pi * outer_index / remaining_targets
+                                                    )],
 
-                                    x = outer_radius * math.cos(angle)
+                                                    xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
 
-                                    y = outer_radius * math.sin(angle)
+                                                    yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
 
-                            
+                                                    width=700,
 
-                            target_positions.append((x, y, target, group_type))
+                                                    height=400,
 
-                            target_index += 1
+                                                    uirevision='drug-net'
 
-                else:
+                                                )
 
-                    # Target-centered view: position drugs around target
+                                                
 
-                    target_x, target_y = 0, 0  # Target is at center
+                                                st.plotly_chart(fig, use_container_width=False, config={'displayModeBar': False})
 
-                    drug_x, drug_y = 0, 0  # Target is at center (alias for compatibility)
+                                                
 
-                    drug_positions = []
+                                            except Exception as e:
 
-                    
+                                                st.info("Network visualization not available (missing dependencies)")
 
-                    # Initialize drug classification lists
+                                            
 
-                    primary_drugs = []
+                                            if target_details['classification_stats']['total'] > 10:
 
-                    secondary_drugs = []
+                                                st.info(f"Showing top 10 of {target_details['classification_stats']['total']} drugs targeting {target}")
 
-                    unknown_drugs = []
+                                        
 
-                    unclassified_drugs = []
+                                        # Add classification button for this target
 
-                    
+                                        unclassified_count = target_details['classification_stats']['total'] - target_details['classification_stats']['classified']
 
-                    # Classify drugs based on their relationship to the centered target
+                                        if unclassified_count > 0 and app.classifier:
 
-                    if network_data and 'drugs' in network_data:
+                                            if st.button(f"🔬 Classify All {unclassified_count} Unclassified Drugs for {target}", key=f"classify_all_{target}_{selected_drug}"):
 
-                        for drug_info in network_data['drugs']:
+                                                with st.spinner(f"Classifying {unclassified_count} drugs for {target}..."):
 
-                            drug_name = drug_info.get('drug', '')
+                                                    success_count = 0
 
-                            mech_info = target_mechanisms.get(drug_name, {})
+                                                    error_count = 0
 
-                            rel_type = mech_info.get('relationship_type', 'Unclassified')
 
-                            
 
-                            if rel_type == 'Primary/On-Target':
+                                                    # The displayed list is capped, so classify against the full drug set
 
-                                primary_drugs.append(drug_name)
 
-                            elif rel_type == 'Secondary/Off-Target':
 
-                                secondary_drugs.append(drug_name)
+                                                    full_details = app.get_target_details(target)
 
-                            elif rel_type == 'Unknown':
 
-                                unknown_drugs.append(drug_name)
 
-                            else:
+                                                    pending = [drug['drug_name'] for drug in (full_details['drugs'] if full_details else []) if not drug['is_classified']]
 
-                                unclassified_drugs.append(drug_name)
 
-                    
 
-                    # Group all drugs by type for intelligent positioning
+                                                    pairs = [(drug_name, target) for drug_name in pending]
 
-                    all_drug_groups = [
 
-                        (primary_drugs, 'primary'),
 
-                        (secondary_drugs, 'secondary'), 
+                                                    for _, classification, error in classify_pairs_concurrently(app, pairs):
 
-                        (unknown_drugs, 'unknown'),
 
-                        (unclassified_drugs, 'unclassified')
 
-                    ]
+                                                        if classification:
 
-                    
 
-                    # Calculate dramatic circular layout for maximum visual impact
 
-                    total_drugs = len(network_data['drugs']) if network_data else 0
+                                                            success_count += 1
 
 
 
-                    if total_drugs <= 8:
+                                                        else:
 
-                        # Single ring layout for few drugs
 
-                        radius = 6
 
-                    else:
+                                                            error_count += 1
 
-                        # Multi-ring layout for many drugs
+                                                    
 
-                        inner_radius = 5
+                                                    st.success(f"✅ Classified {success_count} drugs for {target}")
 
-                        outer_radius = 9
+                                                    if error_count > 0:
 
-                        drugs_per_ring = min(10, total_drugs // 2)
+                                                        st.warning(f"⚠️ {error_count} drugs failed to classify")
 
+                                    else:
 
+                                        st.info(f"No drugs found targeting {target}")
 
-                    drug_index = 0
+                                except Exception as e:
 
+                                    st.error(f"Error loading target details: {e}")
 
+                        
 
-                    for drug_group, group_type in all_drug_groups:
+                        # Check for existing classification
 
-                        for drug in drug_group:
 
-                            if total_drugs <= 8:
 
-                                # Single ring layout
+                        if app.classifier:
 
-                                angle = 2 * math.pi * drug_index / total_drugs
 
-                                x = radius * math.cos(angle)
 
-                                y = radius * math.sin(angle)
+                            existing_classification = existing_map.get(target)
 
-                            else:
 
-                                # Multi-ring layout
 
-                                if drug_index < drugs_per_ring:
+                            
 
-                                    # Inner ring
 
-                                    angle = 2 * math.pi * drug_index / drugs_per_ring
 
-                                    x = inner_radius * math.cos(angle)
+                            if existing_classification:
 
-                                    y = inner_radius * math.sin(angle)
 
-                                else:
 
-                                    # Outer ring
+                                st.success("✅ **Classification Available:**")
 
-                                    outer_index = drug_index - drugs_per_ring
 
-                                    remaining_drugs = total_drugs - drugs_per_ring
 
-                                    angle = 2 * math.pi * outer_index / remaining_drugs
+                                
 
-                                    x = outer_radius * math.cos(angle)
 
-                                    y = outer_radius * math.sin(angle)
 
-                            
+                                # Display classification in a nice format
 
-                            drug_positions.append((x, y, drug, group_type))
 
-                            drug_index += 1
 
+                                col_a, col_b = st.columns(2)
 
 
-                # Create the VIVID, dramatic plot
 
+                                with col_a:
 
 
-                fig = go.Figure()
 
+                                    st.metric("🔗 Relationship Type", existing_classification['relationship_type'])
 
 
-                
 
+                                    st.metric("🧬 Target Class", existing_classification['target_class'])
 
 
-                # Add dramatic connection lines with glow effects
 
+                                with col_b:
 
 
-                edge_traces = {}  # Group edges by type for legend
 
+                                    st.metric("⚙️ Mechanism", existing_classification['mechanism'])
 
 
-                
 
-                # Create edges based on current view
+                                    st.metric("🎯 Confidence", f"{existing_classification['confidence']:.1%}")
 
-                if center_node == selected_drug:
 
-                    # Drug-centered view: create edges from drug to targets
 
-                    
+                                
 
-                    for x, y, target, ring_type in target_positions:
 
-                        # Get comprehensive mechanism info for this target
 
-                        mech_info = target_mechanisms.get(target, {})
+                                st.markdown("**📝 Scientific Reasoning**")
 
-                        mechanism = mech_info.get('mechanism', 'Under Analysis') or 'Under Analysis'
+                                st.write(existing_classification['reasoning'])
 
-                        if not mechanism or mechanism.strip() == '':
+                                st.caption(f"Source: {existing_classification['source']} | {existing_classification['timestamp'][:10]}")
 
-                            mechanism = 'Under Analysis'
+                                
 
-                        
+                                # Add feedback mechanism
 
-                        try:
+                                st.markdown("---")
 
-                            rel_type = mech_info.get('relationship_type', 'Unclassified')
+                                st.markdown("**📝 Is this classification accurate?**")
 
-                            target_class = mech_info.get('target_class', 'Unknown')
+                                feedback_col1, feedback_col2, feedback_col3 = st.columns([1, 1, 2])
 
-                            target_subclass = mech_info.get('target_subclass', 'Unknown')
+                                
 
-                            confidence = mech_info.get('confidence', 0)
+                                with feedback_col1:
 
-                            reasoning = mech_info.get('reasoning', 'No details available')
+                                    if st.button("✅ Correct", key=f"feedback_correct_{selected_drug}_{target}", type="primary"):
 
-                            classified = mech_info.get('classified', False)
+                                        # Store positive feedback
 
-                            
+                                        feedback_key = f"feedback_{selected_drug}_{target}"
 
+                                        if 'classification_feedback' not in st.session_state:
 
+                                            st.session_state['classification_feedback'] = {}
 
-                            # Clean, professional color scheme
+                                        feedback_data = {
 
-                            if rel_type == 'Primary/On-Target':
+                                            'drug': selected_drug,
 
-                                edge_color = '#27AE60'  # Professional green
+                                            'target': target,
 
-                                edge_width = 4
+                                            'feedback': 'correct',
 
-                                priority = 'Primary Effect'
+                                            'timestamp': str(pd.Timestamp.now()),
 
-                                node_color = '#2ECC71'  # Emerald green
+                                            'user': st.session_state.get('current_user', 'anonymous'),
 
-                                glow_color = 'rgba(46, 204, 113, 0.2)'
+                                            'classification': existing_classification
 
-                            elif rel_type == 'Secondary/Off-Target':
+                                        }
 
-                                edge_color = '#E67E22'  # Professional orange
+                                        st.session_state['classification_feedback'][feedback_key] = feedback_data
 
-                                edge_width = 3
+                                        # Save to file for analysis
 
-                                priority = 'Secondary Effect'
+                                        save_feedback_to_file(feedback_data)
 
-                                node_color = '#F39C12'  # Orange
+                                        st.success("👍 Thank you! Feedback recorded as CORRECT")
 
-                                glow_color = 'rgba(243, 156, 18, 0.2)'
+                                
 
-                            else:  # Unknown or Unclassified
+                                with feedback_col2:
 
-                                edge_color = '#7F8C8D'  # Professional gray
+                                    if st.button("❌ Incorrect", key=f"feedback_incorrect_{selected_drug}_{target}", type="secondary"):
 
-                                edge_width = 2
+                                        # Store negative feedback
 
-                                priority = 'Under Analysis'
+                                        feedback_key = f"feedback_{selected_drug}_{target}"
 
-                                node_color = '#95A5A6'  # Light gray
+                                        if 'classification_feedback' not in st.session_state:
 
-                                glow_color = 'rgba(149, 165, 166, 0.2)'
+                                            st.session_state['classification_feedback'] = {}
 
+                                        feedback_data = {
 
+                                            'drug': selected_drug,
 
-                            # Enhanced hover information with rich formatting
+                                            'target': target,
 
-                            hover_text = f"""
+                                            'feedback': 'incorrect',
 
-                            <b style="font-size:16px; color:{edge_color}">{target}</b><br>
+                                            'timestamp': str(pd.Timestamp.now()),
 
-                            <b>Effect Type:</b> <span style="color:{edge_color}">{priority}</span><br>
+                                            'user': st.session_state.get('current_user', 'anonymous'),
 
-                            <b>Mechanism:</b> <span style="color:white">{mechanism}</span><br>
+                                            'classification': existing_classification
 
-                            <b>Confidence:</b> <span style="color:gold">{confidence:.0%}</span><br>
+                                        }
 
-                            <b>Target Class:</b> <span style="color:lightblue">{target_class}</span>
+                                        st.session_state['classification_feedback'][feedback_key] = feedback_data
 
-                            """
+                                        # Save to file for analysis
 
-                            
+                                        save_feedback_to_file(feedback_data)
 
-                            # Add subtle glow effect - much more minimal
+                                        st.error("👎 Thank you! Feedback recorded as INCORRECT")
 
-                            fig.add_trace(go.Scatter(
+                                
 
-                                x=[drug_x, x], y=[drug_y, y],
+                                with feedback_col3:
 
-                                mode='lines',
+                                    # Show current feedback status
 
-                                line=dict(color=glow_color, width=edge_width + 2),
+                                    feedback_key = f"feedback_{selected_drug}_{target}"
 
-                                showlegend=False,
+                                    if 'classification_feedback' in st.session_state and feedback_key in st.session_state['classification_feedback']:
 
-                                hoverinfo='skip'
+                                        feedback = st.session_state['classification_feedback'][feedback_key]
 
-                            ))
+                                        if feedback['feedback'] == 'correct':
 
+                                            st.success(f"✅ Marked as correct by {feedback['user']}")
 
+                                        else:
 
-                            # Main connection line with VIVID colors
+                                            st.error(f"❌ Marked as incorrect by {feedback['user']}")
 
-                            fig.add_trace(go.Scatter(
+                                    else:
 
-                                x=[drug_x, x], y=[drug_y, y],
+                                        st.info("⏳ No feedback yet")
 
-                                mode='lines',
 
-                                line=dict(color=edge_color, width=edge_width),
 
-                                name=priority if priority not in edge_traces else '',
+                            else:
 
-                                showlegend=priority not in edge_traces,
 
-                                legendgroup=priority,
 
-                                hovertemplate=hover_text + '<extra></extra>',
+                                st.info("ℹ️ No classification available yet")
 
-                                hoverinfo='text'
 
-                            ))
 
-                            edge_traces[priority] = True
+                    
 
-                            
 
-                        except Exception as e:
 
-                            continue
+                    with col2:
 
 
 
-                    # Add clean mechanism labels - only for primary effects to reduce clutter
+                        if app.classifier:
 
 
 
-                    if mechanism not in ['Under Analysis', 'Unknown'] and rel_type == 'Primary/On-Target':
+                            if st.button(f"🔬 Classify Mechanism", key=f"classify_{selected_drug}_{target}"):
 
-                        mid_x = (drug_x + x) / 2
 
-                        mid_y = (drug_y + y) / 2
 
-                        
+                                with st.spinner(f"Classifying {selected_drug} → {target}..."):
 
-                        # Enhanced mechanism text display with better visibility
 
-                        display_mechanism = mechanism
 
-                        if len(mechanism) > 15:
+                                    classification = app.get_drug_target_classification(selected_drug, target)
 
-                            display_mechanism = mechanism[:12] + "..."
 
-                        
 
-                        # Enhanced background for text readability
+                                    
 
-                        fig.add_trace(go.Scatter(
 
-                            x=[mid_x], y=[mid_y],
 
-                            mode='markers',
+                                    if classification:
 
-                            marker=dict(size=50, color='rgba(255,255,255,0.95)', opacity=0.9, 
 
-                                       line=dict(color=edge_color, width=2)),
 
-                            showlegend=False,
+                                        st.success("✅ Classification completed!")
 
-                            hoverinfo='skip'
 
-                        ))
 
-                        
+                                        st.rerun()  # Refresh to show new classification
 
-                        fig.add_trace(go.Scatter(
 
-                            x=[mid_x], y=[mid_y],
 
-                            mode='text',
+                                    else:
 
-                            text=[display_mechanism],
 
 
+                                        st.error("❌ Classification failed. Check logs for details.")
 
-                            textfont=dict(size=11, color='black', family='Arial'),
 
-                            textposition='middle center',
 
-                            showlegend=False,
+                        else:
 
 
 
-                            hovertemplate=f'<b>Mechanism:</b> {mechanism}<br><b>Effect:</b> {priority}<br><b>Confidence:</b> {confidence:.0%}<extra></extra>',
+                            st.info("🔧 Set GEMINI_API_KEY to enable classification")
 
-                            hoverinfo='text'
 
 
+            
 
-                        ))
 
-                else:
 
-                    # Target-centered view: create edges from target to drugs
+        else:
 
-                    target_x, target_y = 0, 0  # Target is at center
 
-                    for x, y, drug, ring_type in drug_positions:
 
-                        # Get drug info
+            st.warning("No biological targets found in database")
 
-                        drug_info = next((d for d in network_data['drugs'] if d['drug'] == drug), {})
 
-                        moa = drug_info.get('moa', 'Unknown')
 
-                        phase = drug_info.get('phase', 'Unknown')
+                    
 
-                        
 
-                        # Get mechanism info for this drug-target pair
 
-                        mech_info = app.get_cached_classification(drug, center_node)
+        # Only show additional details if drug_details is available
 
-                        if not mech_info:
 
-                            # If not cached, force immediate classification
 
-                            try:
+        if drug_details:
 
-                                mech_info = app.get_drug_target_classification(drug, center_node)
 
-                                if mech_info:
 
-                                    # Cache the result
+            # Disease Areas and Indications
 
-                                    cache_key = f"{drug}_{center_node}"
 
-                                    app._classification_cache[cache_key] = mech_info
 
-                                    persistent_key = get_cache_key(drug, center_node)
+            col1, col2 = st.columns(2)
 
-                                    save_to_cache(persistent_key, mech_info)
 
-                            except Exception as e:
 
-                                st.error(f"Classification error for {drug}-{center_node}: {e}")
+            with col1:
 
-                                mech_info = {}
 
-                        
 
-                        # Extract classification results
+                st.markdown("### 🏥 **Disease Areas**")
 
-                        mechanism = mech_info.get('mechanism', 'Under Analysis')
 
-                        if not mechanism or mechanism.strip() == '':
 
-                            mechanism = 'Under Analysis'
+                if drug_details.get('disease_areas'):
 
-                        rel_type = mech_info.get('relationship_type', 'Unclassified')
 
-                        confidence = mech_info.get('confidence', 0)
 
-                        
+                    for da in drug_details['disease_areas']:
 
-                        # Simple classification based on phase and mechanism
 
-                        if rel_type == 'Primary/On-Target':
 
-                            edge_color = '#27AE60'  # Professional green
+                        st.markdown(f"🏥 {da}")
 
-                            edge_width = 4
 
-                            priority = 'Primary Effect'
 
-                            node_color = '#2ECC71'  # Emerald green
+                else:
 
-                            glow_color = 'rgba(46, 204, 113, 0.2)'
 
-                        elif rel_type == 'Secondary/Off-Target':
 
-                            edge_color = '#E67E22'  # Professional orange
+                    st.info("No specific disease areas listed")
 
-                            edge_width = 3
 
-                            priority = 'Secondary Effect'
 
-                            node_color = '#F39C12'  # Orange
+        
 
-                            glow_color = 'rgba(243, 156, 18, 0.2)'
 
-                        else:
 
-                            edge_color = '#7F8C8D'  # Professional gray
+            with col2:
 
-                            edge_width = 2
 
-                            priority = 'Under Analysis'
 
-                            node_color = '#95A5A6'  # Light gray
+                st.markdown("### 💊 **Medical Indications**")
 
-                            glow_color = 'rgba(149, 165, 166, 0.2)'
 
-                        
 
-                        # Enhanced hover information
+                if drug_details.get('indications'):
 
-                        hover_text = f"""
 
-                        <b style="font-size:16px; color:{edge_color}">{drug}</b><br>
 
-                        <b>Effect Type:</b> <span style="color:{edge_color}">{priority}</span><br>
+                    for indication in drug_details['indications']:
 
-                        <b>MOA:</b> <span style="color:white">{moa}</span><br>
 
-                        <b>Phase:</b> <span style="color:gold">{phase}</span><br>
 
-                        <b>Confidence:</b> <span style="color:gold">{confidence:.0%}</span>
+                        st.markdown(f"💊 {indication}")
 
-                        """
 
-                        
 
-                        # Add subtle glow effect
+                else:
 
-                        fig.add_trace(go.Scatter(
 
-                            x=[target_x, x], y=[target_y, y],
 
-                            mode='lines',
+                    st.info("No specific indications listed")
 
-                            line=dict(color=glow_color, width=edge_width + 2),
 
-                            showlegend=False,
 
-                            hoverinfo='skip'
+        
 
-                        ))
 
-                        
 
-                        # Main connection line
+            # Vendor Information
 
-                        fig.add_trace(go.Scatter(
 
-                            x=[target_x, x], y=[target_y, y],
 
-                            mode='lines',
+            st.markdown("### 🏪 **Supplier/Vendor Information**")
 
-                            line=dict(color=edge_color, width=edge_width),
 
-                            name=priority if priority not in edge_traces else '',
 
-                            showlegend=priority not in edge_traces,
+            if drug_details.get('vendors'):
 
-                            legendgroup=priority,
 
-                            hovertemplate=hover_text + '<extra></extra>',
 
-                            hoverinfo='text'
+                st.info(f"Available from: **{', '.join(drug_details['vendors'])}**")
 
-                        ))
 
-                        edge_traces[priority] = True
 
-                    
+            else:
 
 
 
-                # Enhanced VIVID nodes with dramatic glow effects
+                st.info("No vendor information available")
 
-                # Initialize annotations list for both views
 
-                annotations = []
 
-                
+                    
 
-                if center_node == selected_drug:
 
-                    # Drug-centered view: show target nodes
 
-                    
+            # Enhanced Visual Network Graph with Mechanism Labels
 
-                    for i, (x, y, target, ring_type) in enumerate(target_positions):
 
-                        try:
 
-                            # Drug-centered view: use target_mechanisms as before
+            st.markdown("### 🌐 Drug-Target Network")
 
-                            mech_info = target_mechanisms.get(target, {})
 
-                            
 
-                            rel_type = mech_info.get('relationship_type', 'Unclassified')
+            if drug_details.get('targets'):
 
-                            mechanism = mech_info.get('mechanism', 'Under Analysis')
 
-                            if not mechanism or mechanism.strip() == '':
 
-                                mechanism = 'Under Analysis'
+                col_net1, col_net2 = st.columns([3, 1])
 
-                            confidence = mech_info.get('confidence', 0)
 
 
+                with col_net1:
 
-                            # Clean color scheme matching edges
 
-                            if rel_type == 'Primary/On-Target':
 
-                                node_color = '#2ECC71'  # Emerald green
+                    st.info("🎯 **How to read:** Green = Primary effects, Orange = Side effects, Gray = Under analysis. Hover over nodes for details.")
 
-                                border_color = '#27AE60'  # Professional green
 
-                                text_color = 'white'
 
-                                glow_color = 'rgba(46, 204, 113, 0.3)'
+                with col_net2:
 
-                            elif rel_type == 'Secondary/Off-Target':
 
-                                node_color = '#F39C12'  # Orange
 
-                                border_color = '#E67E22'  # Professional orange
+                    if st.button("🔄 Refresh", help="Reload network data"):
 
-                                text_color = 'white'
 
-                                glow_color = 'rgba(243, 156, 18, 0.3)'
 
-                            else:
+                        st.rerun()
 
-                                node_color = '#95A5A6'  # Light gray
 
-                                border_color = '#7F8C8D'  # Professional gray
 
-                                text_color = 'white'
+            
 
-                                glow_color = 'rgba(149, 165, 166, 0.3)'
 
 
+            # Get comprehensive mechanism information for each target
 
-                            # Simple, working hover info
 
-                            mechanism_text = mech_info.get('mechanism', 'Under Analysis')
 
-                            if not mechanism_text:
+            target_mechanisms = {}
 
-                                mechanism_text = 'Under Analysis'
 
-                            
 
-                            target_hover = f"{target}<br>Effect Type: {rel_type}<br>Mechanism: {mechanism_text}<br>Confidence: {confidence:.0%}<br>Target Class: {mech_info.get('target_class', 'Unknown')}"
+            classification_summary = {
 
-                            
 
-                            # Add subtle glow effect for nodes - single layer
 
-                            fig.add_trace(go.Scatter(
+                'Primary/On-Target': 0,
 
-                                x=[x], y=[y],
 
-                                mode='markers',
 
-                                marker=dict(size=65, color=glow_color, opacity=0.4),
+                'Secondary/Off-Target': 0, 
 
-                                showlegend=False,
 
-                                hoverinfo='skip'
 
-                            ))
+                'Unknown': 0,
 
 
 
-                            # Main target node with clean styling
+                'Unclassified': 0
 
-                            fig.add_trace(go.Scatter(
 
-                                x=[x], y=[y],
 
-                                mode='markers',
+            }
 
-                                marker=dict(size=55, color=node_color, 
 
-                                           line=dict(color=border_color, width=3),
 
-                                           opacity=0.9),
+            
 
-                                showlegend=False,
 
-                                hovertemplate=target_hover + '<extra></extra>',
 
-                                hoverinfo='text'
+            if app.classifier:
 
-                            ))
 
-                            
 
-                            # Collect annotation for this target
+                target_mechanisms, classification_summary = cached_target_mechanisms(app.classifier, app.connection_key, selected_drug, tuple(drug_details['targets']), classification_store_version())
 
-                            annotation = dict(
 
-                                x=x, y=y,
 
-                                text=target.upper(),
+            
 
-                                showarrow=False,
 
-                                font=dict(size=14, color='white', family='Arial'),
 
-                                bgcolor='rgba(0,0,0,0.7)',
+            # Show classification summary
 
-                                bordercolor='white',
 
-                                borderwidth=1,
 
-                                xref='x', yref='y'
+            col1, col2, col3, col4 = st.columns(4)
 
-                            )
 
-                            annotations.append(annotation)
 
-                        except Exception as e:
+            with col1:
 
-                            # If there's an error, still create the annotation
 
-                            annotation = dict(
 
-                                x=x, y=y,
+                st.metric("🟢 Primary Effects", classification_summary['Primary/On-Target'])
 
-                                text=target.upper(),
 
-                                showarrow=False,
 
-                                font=dict(size=14, color='white', family='Arial'),
+            with col2:
 
-                                bgcolor='rgba(0,0,0,0.7)',
 
-                                bordercolor='white',
 
-                                borderwidth=1,
+                st.metric("🟠 Secondary Effects", classification_summary['Secondary/Off-Target'])
 
-                                xref='x', yref='y'
 
-                            )
 
-                            annotations.append(annotation)
+            with col3:
 
-                    
 
-                    # Add all annotations at once after the loop
 
-                    # MOVED OUTSIDE LOOP - this was the bug!
+                st.metric("⚪ Unknown Type", classification_summary['Unknown'])
 
-                    
 
-                    # Store annotations to be added in the final layout update
 
-                    # (Don't call update_layout here - it gets overwritten later)
+            with col4:
 
-                else:
 
-                    # Target-centered view: show drug nodes around the target
 
-                    for x, y, drug, ring_type in drug_positions:
+                st.metric("⚫ Unclassified", classification_summary['Unclassified'])
 
-                        # Get drug info
 
-                        drug_info = next((d for d in network_data['drugs'] if d['drug'] == drug), {})
 
-                        moa = drug_info.get('moa', 'Unknown')
+            
 
-                        phase = drug_info.get('phase', 'Unknown')
 
-                        
 
-                        # Get mechanism info for this drug-target pair
+            # Create enhanced 3D-style network visualization
 
-                        mech_info = app.get_cached_classification(drug, center_node)
 
-                        if not mech_info:
 
-                            # If not cached, use a simple classification based on drug info
+            # Interactive network with reorientation capability
 
-                            if phase in ['Approved', 'Phase 4']:
+            # Check if a target was clicked to center the network
 
-                                rel_type = 'Primary/On-Target'
+            center_key = f'interactive_network_center_{selected_drug}'
 
-                            elif phase in ['Phase 1', 'Phase 2', 'Phase 3']:
+            center_node = st.session_state.get(center_key, selected_drug)
+            
+            # Get network data for vis.js visualization (works for drug-centered view)
+            visjs_network_data = None
+            if center_node == selected_drug:
+                # Get network data for the selected drug
+                cache_key_visjs = f"drug_network_visjs_{selected_drug}"
+                visjs_network_data = st.session_state.get(cache_key_visjs)
+                if visjs_network_data is None:
+                    visjs_network_data = app.get_drug_network(selected_drug)
+                    if visjs_network_data:
+                        st.session_state[cache_key_visjs] = visjs_network_data
 
-                                rel_type = 'Secondary/Off-Target'
+            
 
-                            else:
+            # Store original selected drug for fallback (read once, reused below)
 
-                                rel_type = 'Unclassified'
+            original_selected_drug = st.session_state.setdefault('original_selected_drug', selected_drug)
 
-                        else:
+            
 
-                            rel_type = mech_info.get('relationship_type', 'Unclassified')
+            # Start background classification for all targets (only if not already cached)
 
-                        
+            uncached_targets = [t for t in drug_details['targets'] if not app.is_cached(selected_drug, t)]
 
-                        # Color scheme for drugs
+            if uncached_targets:
 
-                        if rel_type == 'Primary/On-Target':
+                app.background_classify_targets(selected_drug, uncached_targets)
 
-                            node_color = '#2ECC71'  # Emerald green
+            
 
-                            border_color = '#27AE60'  # Professional green
+            if center_node == selected_drug:
 
-                            glow_color = 'rgba(46, 204, 113, 0.3)'
+                # Drug-centered view: show drug in center with its targets
 
-                        elif rel_type == 'Secondary/Off-Target':
+                targets = drug_details['targets']  # Show ALL targets
 
-                            node_color = '#F39C12'  # Orange
+                network_data = None
 
-                            border_color = '#E67E22'  # Professional orange
+            else:
 
-                            glow_color = 'rgba(243, 156, 18, 0.3)'
+                # Check if center_node is a drug (from target-centered view drug selection)
 
-                        else:
+                # First get network_data if we don't have it
 
-                            node_color = '#95A5A6'  # Light gray
+                if 'network_data' not in locals() or network_data is None:
 
-                            border_color = '#7F8C8D'  # Professional gray
+                    cache_key = f"target_network_{center_node}"
 
-                            glow_color = 'rgba(149, 165, 166, 0.3)'
+                    if cache_key in st.session_state:
 
-                        
+                        network_data = st.session_state[cache_key]
 
-                        # Drug hover info
+                    else:
 
-                        drug_hover = f"""
+                        network_data = app.get_target_network_data(center_node)
 
-                        <b style="font-size:18px; color:{border_color}">{drug}</b><br>
+                        if network_data:
 
-                        <b>MOA:</b> <span style="color:white">{moa}</span><br>
+                            st.session_state[cache_key] = network_data
 
-                        <b>Phase:</b> <span style="color:gold">{phase}</span><br>
+                
 
-                        <b>Effect Type:</b> <span style="color:{border_color}">{rel_type}</span>
+                
 
-                        """
+                if network_data and center_node in [d['drug'] for d in network_data.get('drugs', [])]:
 
-                        
+                    # Switch to drug-centered view for the selected drug
 
-                        # Add subtle glow effect for drug nodes
+                    new_selected_drug = center_node
 
-                        fig.add_trace(go.Scatter(
+                    # Get drug details for the new selected drug
 
-                            x=[x], y=[y],
+                    new_drug_details = cached_drug_details(app, app.connection_key, new_selected_drug)
 
-                            mode='markers',
+                    if new_drug_details:
 
-                            marker=dict(size=65, color=glow_color, opacity=0.4),
+                        # Update session state to reflect the new drug
 
-                            showlegend=False,
+                        st.session_state['selected_drug'] = new_selected_drug
 
-                            hoverinfo='skip'
+                        # Update the center key to point to the new drug
 
-                        ))
+                        st.session_state[center_key] = new_selected_drug
 
                         
 
-                        # Main drug node
-
-                        fig.add_trace(go.Scatter(
+                        # Add the new drug to search results if not already present
 
-                            x=[x], y=[y],
+                        search_results = st.session_state.get('search_results')
 
-                            mode='markers+text',
+                        if search_results is not None:
 
-                            marker=dict(size=55, color=node_color, 
+                            existing_drugs = [r['drug'] for r in search_results]
 
-                                       line=dict(color=border_color, width=3),
+                            if new_selected_drug not in existing_drugs:
 
-                                       opacity=0.9),
+                                # Add the new drug to search results
 
-                            text=[drug],
+                                new_drug_result = {
 
-                            textposition='middle center',
+                                    'drug': new_selected_drug,
 
-                            textfont=dict(size=12, color='white', family='Arial Black'),
+                                    'moa': new_drug_details.get('moa', 'Unknown'),
 
-                            showlegend=False,
+                                    'phase': new_drug_details.get('phase', 'Unknown')
 
-                            hovertemplate=drug_hover + '<extra></extra>',
+                                }
 
-                            hoverinfo='text'
+                                search_results.append(new_drug_result)
 
-                        ))
+                        
 
-                    
+                        # Update local variables
 
-                    # Central target node
+                        selected_drug = new_selected_drug
 
-                    target_hover = f"""
+                        drug_details = new_drug_details
 
-                    <b style="font-size:22px; color:#FF1493">{center_node}</b><br>
+                        targets = drug_details['targets']
 
-                    <b>Total Drugs:</b> <span style="color:gold">{len(network_data['drugs']) if network_data else 0}</span><br>
+                        center_node = new_selected_drug
 
-                    <b>Target Type:</b> <span style="color:lightgreen">Protein</span>
+                        network_data = None
 
-                    """
+                        # Show success message
 
-                    
+                        st.success(f"🔄 Switched to drug-centered view for **{new_selected_drug}**")
 
-                    # Target node subtle glow effect
+                        # Don't rerun - let the UI naturally update
 
-                    fig.add_trace(go.Scatter(
+                    else:
 
-                        x=[target_x], y=[target_y],
+                        # Fallback to original drug
 
-                        mode='markers',
+                        selected_drug = original_selected_drug
 
-                        marker=dict(size=85, color='rgba(231, 76, 60, 0.3)', opacity=0.5),
+                        targets = drug_details['targets']
 
-                        showlegend=False,
+                        network_data = None
 
-                        hoverinfo='skip'
+                else:
 
-                    ))
+                    # Target-centered view: show target in center with all drugs targeting it
 
-                    
+                    # Use cached network data for faster reorientation
 
-                    # Main target node
+                    cache_key = f"target_network_{center_node}"
 
-                    fig.add_trace(go.Scatter(
+                    if cache_key in st.session_state:
 
-                        x=[target_x], y=[target_y],
+                        network_data = st.session_state[cache_key]
 
-                        mode='markers+text',
+                    else:
 
-                        marker=dict(size=70, color='#E74C3C',  # Red for target
+                        network_data = app.get_target_network_data(center_node)
 
-                                   line=dict(color='#C0392B', width=4),
+                        if network_data:
 
-                                   opacity=0.9),
+                            st.session_state[cache_key] = network_data
 
-                        text=[center_node.upper()],
+                    
 
-                        textposition='middle center',
+                    if network_data:
 
-                        textfont=dict(size=14, color='white', family='Arial'),
+                        targets = [center_node]  # The centered target
 
-                        name='🎯 Target',
+                        
 
-                        showlegend=True,
+                        # Populate target_mechanisms for target-centered view
 
-                        hovertemplate=target_hover + '<extra></extra>',
+                        # In target-centered view, we need to get the mechanism for the specific drug being hovered
 
-                        hoverinfo='text'
+                        # This will be populated in the hover logic based on the selected drug
 
-                    ))
+                        target_mechanisms = {}
 
+                    else:
 
+                        targets = drug_details['targets']  # Fallback to drug view
 
-                # Enhanced CENTRAL drug node with MASSIVE dramatic effect (only for drug-centered view)
+                        center_node = selected_drug
 
-                if center_node == selected_drug:
+                    st.session_state[center_key] = selected_drug
 
-                    drug_hover = f"""
 
-                    <b style="font-size:22px; color:#FF1493">{selected_drug}</b><br>
 
-                    <b>Total Targets:</b> <span style="color:gold">{len(drug_details['targets'])}</span><br>
+            if targets:
 
-                    <b>MOA:</b> <span style="color:lightgreen">{drug_details['drug_info'].get('moa', 'Unknown')}</span><br>
 
-                    <b>Indication:</b> <span style="color:lightblue">{drug_details['drug_info'].get('indication', 'Unknown')}</span>
 
-                    """
+                # Classify the drugs around a centred target here, in this session, so the cached
 
-                    
 
-                    # Drug node subtle glow effect - single layer
 
-                    fig.add_trace(go.Scatter(
+                # figure below only has to draw them
 
-                        x=[drug_x], y=[drug_y],
 
-                        mode='markers',
 
-                        marker=dict(size=85, color='rgba(52, 152, 219, 0.3)', opacity=0.5),
+                ring_mechanisms = {}
 
-                        showlegend=False,
 
-                        hoverinfo='skip'
 
-                    ))
+                if center_node != selected_drug and network_data:
 
 
 
-                    # Main drug node - prominent but not overwhelming
+                    ring_drugs = [d.get('drug', '') for d in network_data.get('drugs', [])]
 
-                    fig.add_trace(go.Scatter(
 
-                        x=[drug_x], y=[drug_y],
 
-                        mode='markers+text',
+                    ring_mechanisms = app.get_cached_classifications(ring_drugs, center_node)
 
-                        marker=dict(size=70, color='#3498DB',  # Professional blue
 
-                                   line=dict(color='#2980B9', width=4),  # Darker blue border
 
-                                   opacity=0.9),
+                    for drug in ring_drugs:
 
-                        text=[selected_drug.upper()],
 
-                        textposition='middle center',
 
-                        textfont=dict(size=14, color='white', family='Arial'),
+                        if ring_mechanisms.get(drug):
 
-                        name='💊 Drug',
 
-                        showlegend=True,
 
-                        hovertemplate=drug_hover + '<extra></extra>',
+                            continue
 
-                        hoverinfo='text'
 
-                    ))
 
+                        # If not cached, force immediate classification
 
 
-                # Clean, professional layout
 
-                # Include annotations in the final layout update
+                        try:
 
-                layout_kwargs = {
 
-                    'title': dict(
 
-                        text=f"Drug-Target Network: {selected_drug}",
+                            mech_info = app.get_drug_target_classification(drug, center_node)
 
-                        font=dict(size=20, color='#2C3E50', family='Arial'),
 
-                        x=0.5
 
-                    ),
+                            if mech_info:
 
-                    'height': 700,  # Reasonable size
 
-                    'showlegend': True,
 
-                    'legend': dict(
+                                # Cache the result
 
-                        x=0.02, y=0.98,
 
-                        bgcolor='rgba(255,255,255,0.95)',
 
-                        bordercolor='#BDC3C7',
+                                app._classification_cache[f"{drug}_{center_node}"] = mech_info
 
-                        borderwidth=1,
 
-                        font=dict(size=12, color='#2C3E50', family='Arial')
 
-                    ),
+                                ring_mechanisms[drug] = mech_info
 
-                    'plot_bgcolor': '#F8F9FA',  # Light gray background
 
-                    'paper_bgcolor': 'white',  # White paper
 
-                    'margin': dict(l=50, r=50, t=80, b=50),
+                                save_to_cache(get_cache_key(drug, center_node), mech_info)
 
-                    'xaxis': dict(
 
-                        showgrid=False,
 
-                        zeroline=False, 
+                        except Exception as e:
 
-                        showticklabels=False,
 
-                        range=[-12, 12],  # Appropriate range
 
-                        scaleratio=1
+                            st.error(f"Classification error for {drug}-{center_node}: {e}")
 
-                    ),
 
-                    'yaxis': dict(
 
-                        showgrid=False,
+                # Build (or reuse) the cached figure for this drug/center pair
 
-                        zeroline=False, 
 
-                        showticklabels=False,
 
-                        range=[-10, 10]  # Appropriate range
+                fig = build_drug_network_figure(app.database, selected_drug, center_node, tuple(targets),
 
-                    )
 
-                }
 
-                
+                                                target_mechanisms, drug_details['drug_info'],
 
-                # Add annotations if they exist (for drug-centered view)
 
-                if center_node == selected_drug and 'annotations' in locals():
 
-                    layout_kwargs['annotations'] = annotations
+                                                tuple(network_data['drugs']) if network_data and 'drugs' in network_data else (),
 
 
 
-                fig.update_layout(**layout_kwargs)
+                                                ring_mechanisms, classification_store_version())
 
 
 
@@ -14063,7 +14199,6 @@ def show_drug_search(app):
                         try:
                             visjs_html = create_visjs_network_component(selected_drug, visjs_network_data, height=800)
                             # Use components.v1.html for better compatibility across Streamlit versions
-                            import streamlit.components.v1 as components
                             components.html(visjs_html, height=820, scrolling=False)
                         except Exception as e:
                             st.error(f"Error rendering vis.js network: {e}")
@@ -14089,25 +14224,19 @@ def show_drug_search(app):
 
                 if center_node == selected_drug:
 
-                    # Drug-centered view: show target buttons
-
-                    st.markdown("**🎯 Click a target below to center the network on it:**")
+                    # Drug-centered view: pick a target to center on (one widget instead of a button per target)
 
                     if targets:
 
-                        target_cols = st.columns(min(4, len(targets)))
-
-                        for i, target in enumerate(targets):
+                        with st.form(key=f"center_target_form_{selected_drug}"):
 
-                            with target_cols[i % len(target_cols)]:
+                            choice = st.selectbox("🎯 Center the network on target:", targets)
 
-                                if st.button(f"🎯 {target}", key=f"center_target_{selected_drug}_{target}_{i}"):
+                            if st.form_submit_button("🎯 Center"):
 
-                                    st.session_state[center_key] = target
+                                st.session_state[center_key] = choice
 
-                                    st.success(f"🎯 Centering network on target: {target}")
-
-                                    st.rerun()
+                                st.rerun()
 
                     else:
 
@@ -14115,43 +14244,37 @@ def show_drug_search(app):
 
                 else:
 
-                    # Target-centered view: show drug buttons
+                    # Target-centered view: pick a drug to center on
 
                     st.markdown(f"**🎯 Currently centered on: {center_node}**")
 
-                    st.markdown("**💊 Click a drug below to center the network on it:**")
-
                     if network_data and network_data['drugs']:
 
-                        drug_cols = st.columns(min(4, len(network_data['drugs'])))
-
-                        for i, drug in enumerate(network_data['drugs']):
+                        with st.form(key=f"center_drug_form_{center_node}_{selected_drug}"):
 
-                            with drug_cols[i % len(drug_cols)]:
+                            choice = st.selectbox(
 
-                                drug_name = drug['drug']
+                                "💊 Center the network on drug:", [drug['drug'] for drug in network_data['drugs']],
 
-                                button_text = f"💊 {drug_name}" if drug_name != selected_drug else f"⭐ {drug_name} (Original)"
+                                format_func=lambda d: f"⭐ {d} (Original)" if d == selected_drug else d
 
-                                button_key = f"target_view_drug_{center_node}_{drug_name}_{i}"
-
-                                if st.button(button_text, key=button_key):
+                            )
 
-                                    # Immediately update all necessary session state
+                            if st.form_submit_button("💊 Center"):
 
-                                    st.session_state['selected_drug'] = drug_name
+                                # Immediately update all necessary session state
 
-                                    st.session_state[center_key] = drug_name
+                                st.session_state['selected_drug'] = choice
 
-                                    # Force the selectbox to update by clearing any conflicting state
+                                st.session_state[center_key] = choice
 
-                                    if 'drug_selectbox' in st.session_state:
+                                # Force the selectbox to update by clearing any conflicting state
 
-                                        del st.session_state['drug_selectbox']
+                                if 'drug_selectbox' in st.session_state:
 
-                                    st.success(f"✅ Switched to {drug_name}!")
+                                    del st.session_state['drug_selectbox']
 
-                                    st.rerun()
+                                st.rerun()
 
                     else:
 
@@ -14363,85 +14486,31 @@ def show_drug_search(app):
 
 
 
-                # Use st.table() which should work without styling conflicts
-
-
-
-                st.table(similar_df)
-
-
-
-                
-
-
-
-                # Alternative: Display as formatted text table if st.table still has issues
-
-
-
-                st.markdown("---")
-
-
-
-                st.markdown("### 📊 **Similar Drugs Details:**")
-
-
-
-                
-
-
-
-                for idx, row in similar_df.iterrows():
-
-
-
-                    st.markdown(f"#### 💊 **{row['Drug Name']}** - {row['Shared Targets']} shared targets")
-
-                    col1, col2 = st.columns(2)
-
-                    with col1:
-
-                        st.markdown(f"**Drug:** {row['Drug Name']}")
-
-                        st.markdown(f"**Mechanism:** {row['Mechanism of Action']}")
-
-                    with col2:
-
-                        st.markdown(f"**Phase:** {row['Development Phase']}")
-
-                        st.markdown(f"**Shared Targets:** {row['Shared Targets']}")
-
-
-
-                        # Add visual indicator for similarity strength
-
-
-
-                        shared_count = int(row['Shared Targets'])
-
-
-
-                        if shared_count >= 4:
-
-
+                # Visual indicator for similarity strength, worked out for every row at once
 
-                            st.success("🔥 **High Similarity** - Many shared targets")
+                shared = similar_df['Shared Targets'].astype(int)
 
+                badges = np.select([shared >= 4, shared >= 3],
 
+                                   ["🔥 **High Similarity** - Many shared targets", "⭐ **Good Similarity** - Several shared targets"],
 
-                        elif shared_count >= 3:
+                                   default="💡 **Moderate Similarity** - Some shared targets")
 
+                # One markdown write for all rows instead of several widgets per drug
 
+                st.markdown("\n\n".join(
 
-                            st.info("⭐ **Good Similarity** - Several shared targets")
+                    f"#### 💊 **{name}** - {count} shared targets\n\n"
 
+                    f"**Mechanism:** {moa} | **Phase:** {phase}\n\n"
 
+                    f"{badge}"
 
-                        else:
-
+                    for name, moa, phase, count, badge in zip(similar_df['Drug Name'], similar_df['Mechanism of Action'],
 
+                                                              similar_df['Development Phase'], shared, badges)
 
-                            st.warning("💡 **Moderate Similarity** - Some shared targets")
+                ))
 
 
 
@@ -14775,7 +14844,7 @@ def show_target_search(app):
 
                     # Debug: Show what we found
 
-                    st.info(f"Debug: Found {len(target_details['drugs'])} drugs for target {selected_target}")
+                    logger.debug(f"Found {len(target_details['drugs'])} drugs for target {selected_target}")
 
                     
 
@@ -14811,35 +14880,27 @@ def show_target_search(app):
 
                                     
 
-                                    for i, drug in enumerate(unclassified_drugs):
-
-                                        status_text.text(f"Classifying {drug['drug_name']} → {selected_target} ({i+1}/{len(unclassified_drugs)})")
+                                    def show_progress(done, total, pair):
 
-                                        
-
-                                        try:
+                                        status_text.text(f"Classifying {pair[0]} → {pair[1]} ({done}/{total})")
 
-                                            classification = app.get_drug_target_classification(drug['drug_name'], selected_target)
+                                        progress_bar.progress(done / total)
 
-                                            if classification:
+                                    pairs = [(drug['drug_name'], selected_target) for drug in unclassified_drugs]
 
-                                                success_count += 1
+                                    for (drug_name, _), classification, error in classify_pairs_concurrently(app, pairs, show_progress):
 
-                                            else:
+                                        if classification:
 
-                                                error_count += 1
+                                            success_count += 1
 
-                                        except Exception as e:
+                                        else:
 
                                             error_count += 1
 
-                                            st.error(f"Error classifying {drug['drug_name']}: {e}")
-
-                                        
-
-                                        # Update progress
+                                            if error:
 
-                                        progress_bar.progress((i + 1) / len(unclassified_drugs))
+                                                st.error(f"Error classifying {drug_name}: {error}")
 
                                     
 
@@ -15049,7 +15110,7 @@ def show_target_search(app):
 
                                                 # Get detailed drug information
 
-                                                drug_details = app.get_drug_details(drug['drug_name'])
+                                                drug_details = cached_drug_details(app, app.connection_key, drug['drug_name'])
 
                                                 if drug_details:
 
@@ -15115,10 +15176,6 @@ def show_target_search(app):
 
                             import networkx as nx
 
-                            import plotly.graph_objects as go
-
-                            
-
                             # Check if a node was clicked to center the network
 
                             center_key = f'target_network_center_{selected_target}'
@@ -15129,7 +15186,7 @@ def show_target_search(app):
 
                             # Debug information
 
-                            st.caption(f"🔍 Debug: Center key = '{center_key}', Center node = '{center_node}'")
+                            logger.debug(f"Center key = '{center_key}', Center node = '{center_node}'")
 
                             
 
@@ -19161,8 +19218,6 @@ def show_feedback_review(app):
 
     # Convert to DataFrame
 
-    import pandas as pd
-
     df = pd.DataFrame(feedback_data)
 
     